@@ -0,0 +1,347 @@
+"""
+Lightweight event-driven backtester
+Replays historical candles through the Twin Range Filter with the same
+entry, flattening, position cap, sizing and SL/TP rules as LiteMobileBot
+"""
+
+import sys
+import json
+import bisect
+from array import array
+
+from twin_range_filter_lite import calculate_signal_series
+from risk_lite import (
+    MAX_ACTIVE_POSITIONS, DEFAULT_LEVERAGE,
+    position_size_usd, stop_loss_take_profit_prices, position_roi
+)
+
+DEFAULT_FEE_RATE = 0.00055  # Bybit taker fee for linear perpetuals
+
+
+def candles_to_columns(candles):
+    """Convert [[timestamp, open, high, low, close, volume], ...] to compact columns"""
+    return {
+        'timestamp': array('q', (int(c[0]) for c in candles)),
+        'open': array('d', (float(c[1]) for c in candles)),
+        'high': array('d', (float(c[2]) for c in candles)),
+        'low': array('d', (float(c[3]) for c in candles)),
+        'close': array('d', (float(c[4]) for c in candles)),
+        'volume': array('d', (float(c[5]) for c in candles))
+    }
+
+
+def _flag_indices(flags):
+    """Indices of set entries in a 0/1 flag array (array('B') or numpy bool)"""
+    if hasattr(flags, 'tobytes') and flags.itemsize == 1:
+        raw = flags.tobytes()
+    else:
+        raw = bytes(bool(f) for f in flags)
+    i = raw.find(1)
+    while i != -1:
+        yield i
+        i = raw.find(1, i + 1)
+
+
+class _Position:
+    """Open simulated position"""
+
+    __slots__ = ('symbol', 'side', 'qty', 'entry', 'leverage', 'margin',
+                 'stop_loss', 'take_profit', 'entry_time', 'index', 'fees')
+
+    def __init__(self, symbol, side, qty, entry, leverage, margin, entry_time, index):
+        self.symbol = symbol
+        self.side = side
+        self.qty = qty
+        self.entry = entry
+        self.leverage = leverage
+        self.margin = margin
+        self.stop_loss = None
+        self.take_profit = None
+        self.entry_time = entry_time
+        self.index = index    # Index of the last bar this position has seen
+        self.fees = 0.0
+
+    def pnl(self, price):
+        if self.side == 'Buy':
+            return (price - self.entry) * self.qty
+        return (self.entry - price) * self.qty
+
+
+class Backtester:
+    """
+    Event-driven backtester for the Twin Range Filter bot
+
+    Live rules reproduced per bar:
+        - SL/TP are checked first, against the bar's low/high (exchange-side
+          SL/TP orders). If both are hit in the same bar the stop loss wins.
+        - A long (short) signal on a closed bar first closes every short (long)
+          across all pairs, then opens at the bar close unless
+          MAX_ACTIVE_POSITIONS are already open.
+        - Margin is position_size_percent of the realised wallet balance, as in
+          LiteMobileBot.calc_size. Entries the account cannot margin are skipped.
+        - Symbols with a bar at the same timestamp are processed in data order,
+          like the bot walking self.pairs.
+    """
+
+    def __init__(self, config, initial_balance=1000.0, fee_rate=DEFAULT_FEE_RATE, slippage=0.0):
+        """
+        Args:
+            config: Bot config dict (mobile_config.json format)
+            initial_balance: Starting USDT wallet balance
+            fee_rate: Fee per side as a fraction of notional
+            slippage: Adverse price move per fill as a fraction of price
+        """
+        self.config = config
+        self.initial_balance = initial_balance
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+
+    def _signal_params(self):
+        return (
+            self.config.get('twin_range_fast_period', 27),
+            self.config.get('twin_range_fast_range', 1.6),
+            self.config.get('twin_range_slow_period', 55),
+            self.config.get('twin_range_slow_range', 2.0)
+        )
+
+    def run(self, data, series=None):
+        """
+        Run the backtest
+
+        Args:
+            data: {symbol: candles} where candles are [[timestamp, open, high, low,
+                close, volume], ...] or a dict of columns as returned by
+                candles_to_columns, oldest first
+            series: Optional {symbol: calculate_signal_series result} to reuse
+                precomputed signals
+
+        Returns:
+            dict with 'trades', 'equity_time', 'equity' and 'stats'
+        """
+        columns = {}
+        for symbol, candles in data.items():
+            columns[symbol] = candles if isinstance(candles, dict) else candles_to_columns(candles)
+
+        params = self._signal_params()
+        if series is None:
+            series = {s: calculate_signal_series(c['close'], *params) for s, c in columns.items()}
+
+        # Signal events keyed by timestamp, in symbol order
+        order = list(columns)
+        events = {}
+        for rank, symbol in enumerate(order):
+            ts = columns[symbol]['timestamp']
+            sig = series[symbol]
+            for side, flags in (('Buy', sig['long_entry']), ('Sell', sig['short_entry'])):
+                for i in _flag_indices(flags):
+                    events.setdefault(ts[i], []).append((rank, symbol, side, i))
+        for bucket in events.values():
+            bucket.sort()
+
+        # Master timeline: shared timestamps if aligned, otherwise the sorted union
+        stamps = [columns[s]['timestamp'] for s in order]
+        if all(len(t) == len(stamps[0]) and t == stamps[0] for t in stamps[1:]):
+            timeline = stamps[0]
+        else:
+            timeline = sorted(set().union(*stamps))
+
+        self._columns = columns
+        self._wallet = self.initial_balance
+        self._positions = {}
+        self._trades = []
+        equity_time = array('q')
+        equity = array('d')
+
+        for now in timeline:
+            # 1. Exchange-side SL/TP on bars that include this timestamp
+            for position in list(self._positions.values()):
+                col = columns[position.symbol]
+                ts = col['timestamp']
+                i = position.index + 1
+                if i >= len(ts) or ts[i] != now:
+                    continue
+                position.index = i
+                self._check_exit(position, col['high'][i], col['low'][i], now)
+
+            # 2. Signals on the bar that just closed
+            for _, symbol, side, i in events.get(now, ()):
+                self._on_signal(symbol, side, i, now)
+
+            # 3. Mark-to-market equity
+            value = self._wallet
+            for position in self._positions.values():
+                value += position.pnl(self._price(position.symbol, now))
+            equity_time.append(now)
+            equity.append(value)
+
+        # Close whatever is still open at the last available price
+        if timeline:
+            for symbol in list(self._positions):
+                self._close(symbol, self._price(symbol, timeline[-1]), timeline[-1], 'end_of_data')
+
+        return {
+            'trades': self._trades,
+            'equity_time': equity_time,
+            'equity': equity,
+            'stats': self._stats(equity)
+        }
+
+    def _price(self, symbol, now):
+        """Close of the latest bar at or before now"""
+        col = self._columns[symbol]
+        position = self._positions.get(symbol)
+        ts = col['timestamp']
+        if position is not None and position.index < len(ts) and ts[position.index] == now:
+            return col['close'][position.index]
+        i = bisect.bisect_right(ts, now) - 1
+        return col['close'][max(i, 0)]
+
+    def _check_exit(self, position, high, low, now):
+        """Exchange-side SL/TP fill within a bar"""
+        if position.side == 'Buy':
+            if position.stop_loss is not None and low <= position.stop_loss:
+                self._close(position.symbol, position.stop_loss, now, 'stop_loss')
+            elif position.take_profit is not None and high >= position.take_profit:
+                self._close(position.symbol, position.take_profit, now, 'take_profit')
+        else:
+            if position.stop_loss is not None and high >= position.stop_loss:
+                self._close(position.symbol, position.stop_loss, now, 'stop_loss')
+            elif position.take_profit is not None and low <= position.take_profit:
+                self._close(position.symbol, position.take_profit, now, 'take_profit')
+
+    def _fill_price(self, price, side):
+        """Apply slippage against the order side"""
+        if side == 'Buy':
+            return price * (1 + self.slippage)
+        return price * (1 - self.slippage)
+
+    def _close(self, symbol, price, now, reason):
+        position = self._positions.pop(symbol)
+        exit_side = 'Sell' if position.side == 'Buy' else 'Buy'
+        # Stop/TP triggers fill at the trigger price, slippage applies to market closes
+        fill = price if reason in ('stop_loss', 'take_profit') else self._fill_price(price, exit_side)
+        fee = fill * position.qty * self.fee_rate
+        pnl = position.pnl(fill)
+        self._wallet += pnl - fee
+        position.fees += fee
+        self._trades.append({
+            'symbol': symbol,
+            'side': position.side,
+            'qty': position.qty,
+            'leverage': position.leverage,
+            'entry_time': position.entry_time,
+            'entry_price': position.entry,
+            'exit_time': now,
+            'exit_price': fill,
+            'pnl': pnl - position.fees,
+            'fees': position.fees,
+            'roi': position_roi(position.side, position.entry, fill, position.leverage),
+            'reason': reason
+        })
+
+    def _on_signal(self, symbol, side, i, now):
+        """Same sequence as LiteMobileBot.check_signals -> open_long / open_short"""
+        if len(self._positions) >= MAX_ACTIVE_POSITIONS:
+            return
+
+        # Close every opposite position across all pairs first
+        opposite = 'Sell' if side == 'Buy' else 'Buy'
+        for sym in list(self._positions):
+            position = self._positions[sym]
+            if position.side == opposite:
+                self._close(sym, self._price(sym, now), now, 'flip')
+
+        if len(self._positions) >= MAX_ACTIVE_POSITIONS:
+            return
+
+        price = self._columns[symbol]['close'][i]
+        if price <= 0:
+            return
+
+        usd = position_size_usd(self._wallet, self.config)
+        lev = self.config['leverage'].get(symbol, DEFAULT_LEVERAGE)
+
+        # Skip entries the account could not margin
+        used_margin = sum(p.margin for p in self._positions.values())
+        if usd <= 0 or used_margin + usd > self._wallet:
+            return
+
+        fill = self._fill_price(price, side)
+        qty = (usd * lev) / price
+        if qty <= 0:
+            return
+        fee = fill * qty * self.fee_rate
+        self._wallet -= fee
+
+        position = self._positions.get(symbol)
+        if position is None:
+            position = _Position(symbol, side, qty, fill, lev, usd, now, i)
+            self._positions[symbol] = position
+        else:
+            # Same-side order adds to the one-way position at the average price
+            total = position.qty + qty
+            position.entry = (position.entry * position.qty + fill * qty) / total
+            position.qty = total
+            position.margin += usd
+        position.fees += fee
+
+        # SL/TP follow the latest order's reference price, as set_trading_stop does
+        position.stop_loss, position.take_profit = stop_loss_take_profit_prices(side, price, lev, self.config)
+
+    def _stats(self, equity):
+        trades = self._trades
+        wins = [t['pnl'] for t in trades if t['pnl'] > 0]
+        losses = [t['pnl'] for t in trades if t['pnl'] <= 0]
+
+        peak = self.initial_balance
+        max_drawdown = 0.0
+        for value in equity:
+            if value > peak:
+                peak = value
+            elif peak > 0:
+                drawdown = (peak - value) / peak
+                if drawdown > max_drawdown:
+                    max_drawdown = drawdown
+
+        reasons = {}
+        for t in trades:
+            reasons[t['reason']] = reasons.get(t['reason'], 0) + 1
+
+        gross_profit = sum(wins)
+        gross_loss = -sum(losses)
+        if gross_loss > 0:
+            profit_factor = gross_profit / gross_loss
+        else:
+            profit_factor = float('inf') if wins else 0.0
+
+        return {
+            'initial_balance': self.initial_balance,
+            'final_balance': self._wallet,
+            'total_return_percent': (self._wallet / self.initial_balance - 1) * 100,
+            'max_drawdown_percent': max_drawdown * 100,
+            'trades': len(trades),
+            'win_rate_percent': (len(wins) / len(trades) * 100) if trades else 0.0,
+            'profit_factor': profit_factor,
+            'total_fees': sum(t['fees'] for t in trades),
+            'exits': reasons
+        }
+
+
+def main():
+    """Usage: python backtest_lite.py candles.json [mobile_config.json]"""
+    if len(sys.argv) < 2:
+        print(main.__doc__)
+        return
+
+    with open(sys.argv[1], 'r') as f:
+        data = json.load(f)
+    with open(sys.argv[2] if len(sys.argv) > 2 else 'mobile_config.json', 'r') as f:
+        config = json.load(f)
+
+    result = Backtester(config).run(data)
+    for key, value in result['stats'].items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
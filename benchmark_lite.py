@@ -0,0 +1,227 @@
+"""
+Benchmark suite for the Twin Range Filter hot path
+Seeded synthetic candles, ops/sec and peak memory per function,
+JSON baselines and regression checks
+
+Usage:
+    python benchmark_lite.py --save baseline.json
+    python benchmark_lite.py --compare baseline.json --threshold 0.10
+"""
+
+import sys
+import time
+import json
+import random
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+from functools import partial
+
+from twin_range_filter_lite import (
+    ema, smooth_range, range_filter, calculate_signals,
+    calculate_signal_series, TwinRangeFilterState
+)
+
+try:
+    import numpy as np
+    from twin_range_filter_batch import calculate_signals_batch, calculate_signals_many
+except ImportError:
+    np = None
+
+BAR_SIZES = [200, 10000, 1000000]
+SYMBOL_COUNTS = [1, 10, 200]
+DEFAULT_THRESHOLD = 0.10
+
+
+def generate_candles(bars, seed=42, start_price=100.0, volatility=0.002, interval_ms=60000):
+    """
+    Seeded random-walk candles [[timestamp, open, high, low, close, volume], ...]
+
+    Roughly 5% of bars repeat the previous close so flat-filter branches are hit.
+    """
+    rng = random.Random(seed)
+    candles = []
+    price = start_price
+    for i in range(bars):
+        open_price = price
+        if rng.random() >= 0.05:
+            price = round(price * (1 + rng.gauss(0, volatility)), 4)
+        high = max(open_price, price) * (1 + abs(rng.gauss(0, volatility / 2)))
+        low = min(open_price, price) * (1 - abs(rng.gauss(0, volatility / 2)))
+        candles.append([i * interval_ms, open_price, high, low, price, rng.uniform(1, 1000)])
+    return candles
+
+
+def _closes(candles):
+    return [c[4] for c in candles]
+
+
+def _smrng(closes):
+    smrng1 = smooth_range(closes, 27, 1.6)
+    smrng2 = smooth_range(closes, 55, 2.0)
+    return [(a + b) / 2 for a, b in zip(smrng1, smrng2)]
+
+
+def _state_stream(candles):
+    state = TwinRangeFilterState()
+    for candle in candles[:-1]:
+        state.update(candle)
+    return state.peek(candles[-1])
+
+
+def _state_peek(data):
+    states = {s: TwinRangeFilterState.from_candles(c[:-1]) for s, c in data.items()}
+    return lambda: {s: states[s].peek(c[-1]) for s, c in data.items()}
+
+
+def _case(name, make, bars, symbols=None):
+    """
+    Build a (name, setup) case
+
+    setup() generates the seeded input and returns the callable to time, so
+    data generation stays outside the timed region. make receives one candle
+    list, or {symbol: candles} when symbols is given.
+    """
+    def setup():
+        if symbols is None:
+            return make(generate_candles(bars))
+        return make({f"SYM{i}USDT": generate_candles(bars, seed=i) for i in range(symbols)})
+
+    label = f"{name}[{bars}]" if symbols is None else f"{name}[{bars}x{symbols}]"
+    return label, setup
+
+
+def build_cases(bar_sizes=BAR_SIZES, symbol_counts=SYMBOL_COUNTS):
+    """Return [(name, setup)] for every function, bar size and symbol count"""
+    cases = []
+
+    for bars in bar_sizes:
+        cases += [
+            _case('ema', lambda c: partial(ema, _closes(c), 27), bars),
+            _case('smooth_range', lambda c: partial(smooth_range, _closes(c), 27, 1.6), bars),
+            _case('range_filter', lambda c: partial(range_filter, _closes(c), _smrng(_closes(c))), bars),
+            _case('calculate_signals', lambda c: partial(calculate_signals, c), bars),
+            _case('calculate_signal_series', lambda c: partial(calculate_signal_series, _closes(c)), bars),
+            _case('state_stream', lambda c: partial(_state_stream, c), bars)
+        ]
+
+    # Live-bot shape: 200 candles per symbol, many symbols
+    for symbols in symbol_counts:
+        cases += [
+            _case('calculate_signals_per_symbol',
+                  lambda d: lambda: {s: calculate_signals(c) for s, c in d.items()}, 200, symbols),
+            _case('state_peek_per_symbol', _state_peek, 200, symbols)
+        ]
+        if np is not None:
+            cases += [
+                _case('calculate_signals_batch',
+                      lambda d: partial(calculate_signals_batch, np.array([_closes(c) for c in d.values()])),
+                      200, symbols),
+                _case('calculate_signals_many', lambda d: partial(calculate_signals_many, d), 200, symbols)
+            ]
+
+    return cases
+
+
+def measure(fn, min_time=0.5):
+    """Return (ops_per_sec, peak_bytes) for a callable"""
+    # Timing run without tracemalloc overhead
+    runs = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while runs == 0 or elapsed < min_time:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+    ops_per_sec = runs / elapsed
+
+    # Separate run for peak memory
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return ops_per_sec, peak
+
+
+def run_benchmarks(cases, min_time=0.5, name_filter=None, log=print):
+    """Run every case and return {name: {'ops_per_sec', 'peak_bytes'}}"""
+    results = {}
+    for name, setup in cases:
+        if name_filter and name_filter not in name:
+            continue
+        fn = setup()
+        ops_per_sec, peak = measure(fn, min_time)
+        results[name] = {'ops_per_sec': ops_per_sec, 'peak_bytes': peak}
+        log(f"{name:<48} {ops_per_sec:>14.2f} ops/s {peak / 1024:>12.1f} KiB")
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results against a baseline
+
+    Returns:
+        list of regression messages (ops/sec dropped or peak memory grew by
+        more than threshold)
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+
+        if current['ops_per_sec'] < previous['ops_per_sec'] * (1 - threshold):
+            change = (1 - current['ops_per_sec'] / previous['ops_per_sec']) * 100
+            regressions.append(f"{name}: ops/sec -{change:.1f}% "
+                               f"({previous['ops_per_sec']:.2f} -> {current['ops_per_sec']:.2f})")
+
+        if previous['peak_bytes'] and current['peak_bytes'] > previous['peak_bytes'] * (1 + threshold):
+            change = (current['peak_bytes'] / previous['peak_bytes'] - 1) * 100
+            regressions.append(f"{name}: peak memory +{change:.1f}% "
+                               f"({previous['peak_bytes']} -> {current['peak_bytes']} bytes)")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Twin Range Filter benchmarks")
+    parser.add_argument('--save', help="Write results to this JSON baseline")
+    parser.add_argument('--compare', help="Compare against this JSON baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown / memory growth as a fraction (default 0.10)")
+    parser.add_argument('--filter', help="Only run cases whose name contains this text")
+    parser.add_argument('--quick', action='store_true', help="Skip the 1M-bar cases")
+    parser.add_argument('--min-time', type=float, default=0.5, help="Minimum seconds per case")
+    args = parser.parse_args()
+
+    bar_sizes = [b for b in BAR_SIZES if not (args.quick and b >= 1000000)]
+    results = run_benchmarks(build_cases(bar_sizes), args.min_time, args.filter)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'time': datetime.now().isoformat(),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'results': results
+            }, f, indent=4)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,14 @@ import os
 import sys
 
 from bybit_client_lite import BybitClientLite
-from twin_range_filter_lite import calculate_signals
+from bybit_async_lite import AsyncBybitClient
+from bybit_stream_lite import MarketDataStream, PrivateStream
+from kline_cache_lite import KlineCache
+from twin_range_filter_lite import TwinRangeFilterState
+from risk_lite import (
+    MAX_ACTIVE_POSITIONS, DEFAULT_LEVERAGE, DEFAULT_STOP_LOSS_PERCENT, DEFAULT_TAKE_PROFIT_PERCENT,
+    position_size_usd, stop_loss_take_profit_prices, position_roi, roi_exit_reason
+)
 
 stop_flag = False
 
@@ -35,8 +42,11 @@ class LiteMobileBot:
     """Ultra-lightweight mobile trading bot"""
     
     # Default risk management values
-    DEFAULT_STOP_LOSS_PERCENT = 37
-    DEFAULT_TAKE_PROFIT_PERCENT = 150
+    DEFAULT_STOP_LOSS_PERCENT = DEFAULT_STOP_LOSS_PERCENT
+    DEFAULT_TAKE_PROFIT_PERCENT = DEFAULT_TAKE_PROFIT_PERCENT
+    
+    # Candles fetched to (re)build a symbol's filter state
+    WARMUP_CANDLES = 200
     
     def __init__(self):
         """Initialize bot"""
@@ -46,10 +56,24 @@ class LiteMobileBot:
         self.client = BybitClientLite(
             api_key=self.config['api_key'],
             api_secret=self.config['api_secret'],
-            testnet=self.config['testnet']
+            testnet=self.config['testnet'],
+            pool_size=self.config.get('http_pool_size', 10),
+            ticker_max_age=self.config.get('ticker_max_age', 2.0),
+            instrument_ttl=self.config.get('instrument_ttl', 21600),
+            instrument_cache=os.path.join(user_data_dir, 'instruments.json'),
+            base_url=self.config.get('rest_url')
+        )
+        # Concurrent per-symbol requests over the client's connection pool
+        self.aclient = AsyncBybitClient(
+            self.client,
+            concurrency=self.config.get('max_concurrent_requests', 8)
         )
         self.pairs = self.config['trading_pairs']
         self.last_signals = {pair: 'none' for pair in self.pairs}
+        self.filter_states = {}  # symbol -> TwinRangeFilterState (closed candles only)
+        self.klines = KlineCache(self.client, capacity=self.WARMUP_CANDLES)  # REST candle windows
+        self.feed = None  # MarketDataStream when use_websocket is on
+        self.private_stream = None  # PrivateStream when use_websocket is on
         self.running = False
         self.wallet = 0.0
         # Ensure ZECUSDT leverage is set to 20x
@@ -124,30 +148,27 @@ class LiteMobileBot:
         return config
     
     def save_state(self):
-        """Save state"""
+        """Save state (signals + per-symbol indicator checkpoints)"""
+        indicators = {symbol: state.to_dict() for symbol, state in self.filter_states.items()}
         with open(self.state_file, 'w') as f:
-            json.dump({'signals': self.last_signals, 'time': datetime.now().isoformat()}, f)
+            json.dump({
+                'signals': self.last_signals,
+                'indicators': indicators,
+                'timeframe': self.config['timeframe'],
+                'time': datetime.now().isoformat()
+            }, f)
     
     def has_any_position(self):
         """Check if ANY position is open"""
-        for symbol in self.pairs:
-            pos = self.get_position(symbol)
-            if pos['size'] > 0:
-                return True
-        return False
+        return self.get_active_positions_count() > 0
     
     def get_active_positions_count(self):
         """Return the number of currently open positions across all pairs"""
-        count = 0
-        for symbol in self.pairs:
-            pos = self.get_position(symbol)
-            if pos['size'] > 0:
-                count += 1
-        return count
+        return self.client.positions.count(self.pairs)
     
     def has_position_limit(self):
         """Return True if the number of active positions is at or above the limit (3)"""
-        return self.get_active_positions_count() >= 3
+        return self.get_active_positions_count() >= MAX_ACTIVE_POSITIONS
     
     def load_state(self):
         """Load state"""
@@ -156,9 +177,29 @@ class LiteMobileBot:
                 with open(self.state_file, 'r') as f:
                     state = json.load(f)
                     self.last_signals = state.get('signals', self.last_signals)
+                    self.load_indicator_states(state)
             except:
                 pass
     
+    def load_indicator_states(self, state):
+        """Resume per-symbol filter states saved with the same timeframe and parameters"""
+        if state.get('timeframe') != self.config['timeframe']:
+            return
+        
+        params = self.filter_params()
+        for symbol, data in state.get('indicators', {}).items():
+            if symbol not in self.pairs:
+                continue
+            try:
+                restored = TwinRangeFilterState.from_dict(data)
+            except (KeyError, TypeError):
+                continue
+            if restored.params() == params:
+                self.filter_states[symbol] = restored
+        
+        if self.filter_states:
+            logger.info(f"♻️ Resumed indicator state for {len(self.filter_states)} pairs")
+    
     def setup_leverage(self):
         """Setup leverage"""
         for symbol in self.pairs:
@@ -172,6 +213,11 @@ class LiteMobileBot:
             # Simulate wallet balance for demo
             self.wallet = 85.0  # Demo balance
             return self.wallet
+        if self.private_stream is not None and self.private_stream.is_healthy():
+            balance = self.private_stream.balance('USDT')
+            if balance is not None:
+                self.wallet = balance
+                return self.wallet
         bal = self.client.get_wallet_balance()
         if bal:
             for coin in bal.get('list', [{}])[0].get('coin', []):
@@ -183,11 +229,24 @@ class LiteMobileBot:
     def calc_size(self, symbol):
         """Calculate position size"""
         self.update_wallet()
-        return self.wallet * (self.config['position_size_percent'] / 100)
+        return position_size_usd(self.wallet, self.config)
+    
+    def refresh_positions(self):
+        """Reload the position book on next read, unless the private stream keeps it current"""
+        if self.private_stream is None or not self.private_stream.is_healthy():
+            self.client.positions.invalidate()
+    
+    def get_positions(self):
+        """Get positions for all pairs (served from the account-wide position book)"""
+        return {symbol: self.get_position(symbol) for symbol in self.pairs}
+    
+    def get_tickers(self):
+        """Get tickers for all pairs (served from one all-symbol snapshot)"""
+        return {symbol: self.client.get_ticker(symbol) for symbol in self.pairs}
     
     def get_position(self, symbol):
         """Get position"""
-        pos = self.client.get_position(symbol)
+        pos = self.client.positions.get(symbol)
         if not pos:
             return {'side': 'None', 'size': 0, 'entry': 0, 'pnl': 0}
         
@@ -219,18 +278,45 @@ class LiteMobileBot:
             return True  # Simulate success
         
         resp = self.client.place_order(symbol, side, pos['size'], reduce_only=True)
+        self.refresh_positions()
         return resp.get('retCode') == 0
     
+    def close_side(self, side, reason):
+        """
+        Close every position on one side with a single batch of reduce-only orders
+        Returns: True if every close was accepted
+        """
+        positions = {sym: pos for sym, pos in self.get_positions().items()
+                     if pos['side'] == side and pos['size'] > 0}
+        if not positions:
+            return True
+        
+        label = 'LONG' if side == 'Buy' else 'SHORT'
+        for sym in positions:
+            logger.info(f"Closing {label} position on {sym} before {reason}")
+        
+        if self.config.get('demo', False):
+            logger.info(f"🎭 DEMO MODE: Would close {len(positions)} {label} positions")
+            return True  # Simulate success
+        
+        close_side = 'Sell' if side == 'Buy' else 'Buy'
+        results = self.client.place_orders([
+            {'symbol': sym, 'side': close_side, 'qty': pos['size'], 'reduce_only': True}
+            for sym, pos in positions.items()
+        ])
+        self.refresh_positions()
+        
+        failed = [r for r in results if r['retCode'] != 0]
+        for result in failed:
+            logger.error(f"Failed to close {label.lower()} position on {result['symbol']}: {result['retMsg']}")
+        return not failed
+    
     def open_long(self, symbol):
         """Open long"""
-        # Close all short positions across all pairs first
-        for sym in self.pairs:
-            pos = self.get_position(sym)
-            if pos['side'] == 'Sell' and pos['size'] > 0:
-                logger.info(f"Closing SHORT position on {sym} before opening LONG on {symbol}")
-                if not self.close_pos(sym):
-                    logger.error(f"Failed to close short position on {sym}")
-                time.sleep(1)
+        # Close all short positions across all pairs first (one batch)
+        if not self.close_side('Sell', f"opening LONG on {symbol}"):
+            logger.error(f"❌ Short positions not closed, skipping LONG on {symbol}")
+            return False
         
         # Only allow up to 3 positions at a time (across all pairs)
         if self.has_position_limit():
@@ -238,7 +324,7 @@ class LiteMobileBot:
             return False
         
         usd = self.calc_size(symbol)
-        lev = self.config['leverage'].get(symbol, 35)
+        lev = self.config['leverage'].get(symbol, DEFAULT_LEVERAGE)
         
         # Set leverage
         if not self.client.set_leverage(symbol, lev):
@@ -262,22 +348,10 @@ class LiteMobileBot:
             logger.error(f"Invalid price for {symbol}")
             return False
         
-        # Calculate stop loss and take profit prices for LONG
-        # IMPORTANT: Account for leverage! With 35x leverage, 1% price move = 35% ROI
-        stop_loss_price = None
-        take_profit_price = None
-        
-        if self.config.get('enable_stop_loss', True):
-            sl_percent = self.config.get('stop_loss_percent', self.DEFAULT_STOP_LOSS_PERCENT)
-            # Price move needed = ROI% / leverage
-            price_move_percent = sl_percent / lev
-            stop_loss_price = entry_price * (1 - price_move_percent / 100)
-        
-        if self.config.get('enable_take_profit', True):
-            tp_percent = self.config.get('take_profit_percent', self.DEFAULT_TAKE_PROFIT_PERCENT)
-            # Price move needed = ROI% / leverage
-            price_move_percent = tp_percent / lev
-            take_profit_price = entry_price * (1 + price_move_percent / 100)
+        # Calculate stop loss and take profit prices for LONG (leverage-scaled ROI)
+        stop_loss_price, take_profit_price = stop_loss_take_profit_prices('Buy', entry_price, lev, self.config)
+        sl_percent = self.config.get('stop_loss_percent', self.DEFAULT_STOP_LOSS_PERCENT)
+        tp_percent = self.config.get('take_profit_percent', self.DEFAULT_TAKE_PROFIT_PERCENT)
         
         logger.info(f"🟢 LONG {symbol} ${usd:.2f} @ ${entry_price:.2f} | {lev}x")
         if stop_loss_price:
@@ -292,18 +366,15 @@ class LiteMobileBot:
             return True  # Simulate success
         
         resp = self.client.place_order(symbol, 'Buy', qty, stop_loss=stop_loss_price, take_profit=take_profit_price)
+        self.refresh_positions()
         return resp.get('retCode') == 0
     
     def open_short(self, symbol):
         """Open short"""
-        # Close all long positions across all pairs first
-        for sym in self.pairs:
-            pos = self.get_position(sym)
-            if pos['side'] == 'Buy' and pos['size'] > 0:
-                logger.info(f"Closing LONG position on {sym} before opening SHORT on {symbol}")
-                if not self.close_pos(sym):
-                    logger.error(f"Failed to close long position on {sym}")
-                time.sleep(1)
+        # Close all long positions across all pairs first (one batch)
+        if not self.close_side('Buy', f"opening SHORT on {symbol}"):
+            logger.error(f"❌ Long positions not closed, skipping SHORT on {symbol}")
+            return False
         
         # Only allow up to 3 positions at a time (across all pairs)
         if self.has_position_limit():
@@ -311,7 +382,7 @@ class LiteMobileBot:
             return False
         
         usd = self.calc_size(symbol)
-        lev = self.config['leverage'].get(symbol, 35)
+        lev = self.config['leverage'].get(symbol, DEFAULT_LEVERAGE)
         
         # Set leverage
         if not self.client.set_leverage(symbol, lev):
@@ -335,24 +406,10 @@ class LiteMobileBot:
             logger.error(f"Invalid price for {symbol}")
             return False
         
-        # Calculate stop loss and take profit prices for SHORT
-        # IMPORTANT: Account for leverage! With 35x leverage, 1% price move = 35% ROI
-        stop_loss_price = None
-        take_profit_price = None
-        
-        if self.config.get('enable_stop_loss', True):
-            sl_percent = self.config.get('stop_loss_percent', self.DEFAULT_STOP_LOSS_PERCENT)
-            # For SHORT: stop loss is ABOVE entry price (price goes up = loss)
-            # Price move needed = ROI% / leverage
-            price_move_percent = sl_percent / lev
-            stop_loss_price = entry_price * (1 + price_move_percent / 100)
-        
-        if self.config.get('enable_take_profit', True):
-            tp_percent = self.config.get('take_profit_percent', self.DEFAULT_TAKE_PROFIT_PERCENT)
-            # For SHORT: take profit is BELOW entry price (price goes down = profit)
-            # Price move needed = ROI% / leverage
-            price_move_percent = tp_percent / lev
-            take_profit_price = entry_price * (1 - price_move_percent / 100)
+        # Calculate stop loss and take profit prices for SHORT (leverage-scaled ROI)
+        stop_loss_price, take_profit_price = stop_loss_take_profit_prices('Sell', entry_price, lev, self.config)
+        sl_percent = self.config.get('stop_loss_percent', self.DEFAULT_STOP_LOSS_PERCENT)
+        tp_percent = self.config.get('take_profit_percent', self.DEFAULT_TAKE_PROFIT_PERCENT)
         
         logger.info(f"🔴 SHORT {symbol} ${usd:.2f} @ ${entry_price:.2f} | {lev}x")
         if stop_loss_price:
@@ -367,6 +424,7 @@ class LiteMobileBot:
             return True  # Simulate success
         
         resp = self.client.place_order(symbol, 'Sell', qty, stop_loss=stop_loss_price, take_profit=take_profit_price)
+        self.refresh_positions()
         return resp.get('retCode') == 0
     
     def check_stop_loss_take_profit(self):
@@ -374,12 +432,12 @@ class LiteMobileBot:
         if not self.config.get('enable_stop_loss', True) and not self.config.get('enable_take_profit', True):
             return
         
-        for symbol in self.pairs:
+        positions = self.get_positions()
+        open_symbols = [symbol for symbol, pos in positions.items() if pos['size'] > 0]
+        
+        for symbol in open_symbols:
             try:
-                pos = self.get_position(symbol)
-                if pos['size'] == 0:
-                    continue
-                
+                pos = positions[symbol]
                 ticker = self.client.get_ticker(symbol)
                 if not ticker:
                     continue
@@ -389,48 +447,183 @@ class LiteMobileBot:
                     continue
                 
                 # Calculate ROI (Return on Investment) percentage
-                if pos['side'] == 'Buy':
-                    roi = ((price - pos['entry']) / pos['entry']) * pos['leverage'] * 100
-                else:
-                    roi = ((pos['entry'] - price) / pos['entry']) * pos['leverage'] * 100
+                roi = position_roi(pos['side'], pos['entry'], price, pos['leverage'])
                 
-                # Check Stop Loss
-                if self.config.get('enable_stop_loss', True):
-                    stop_loss_percent = self.config.get('stop_loss_percent', self.DEFAULT_STOP_LOSS_PERCENT)
-                    if roi <= -stop_loss_percent:
-                        logger.warning(f"🛑 STOP LOSS {symbol} - ROI: {roi:.2f}%")
-                        self.close_pos(symbol)
-                        continue
-                
-                # Check Take Profit
-                if self.config.get('enable_take_profit', True):
-                    take_profit_percent = self.config.get('take_profit_percent', self.DEFAULT_TAKE_PROFIT_PERCENT)
-                    if roi >= take_profit_percent:
-                        logger.info(f"💰 TAKE PROFIT {symbol} - ROI: {roi:.2f}%")
-                        self.close_pos(symbol)
+                # Check Stop Loss / Take Profit
+                reason = roi_exit_reason(roi, self.config)
+                if reason == 'stop_loss':
+                    logger.warning(f"🛑 STOP LOSS {symbol} - ROI: {roi:.2f}%")
+                    self.close_pos(symbol)
+                elif reason == 'take_profit':
+                    logger.info(f"💰 TAKE PROFIT {symbol} - ROI: {roi:.2f}%")
+                    self.close_pos(symbol)
                         
             except Exception as e:
                 logger.error(f"SL/TP error {symbol}: {e}")
     
+    def filter_params(self):
+        """Twin Range Filter parameters from config"""
+        return (
+            self.config.get('twin_range_fast_period', 27),
+            self.config.get('twin_range_fast_range', 1.6),
+            self.config.get('twin_range_slow_period', 55),
+            self.config.get('twin_range_slow_range', 2.0)
+        )
+    
+    def start_feed(self):
+        """Start the WebSocket kline/ticker feed (REST polling stays the fallback)"""
+        if not self.config.get('use_websocket', True):
+            return
+        self.feed = MarketDataStream(
+            self.client, self.pairs, self.config['timeframe'],
+            history=self.WARMUP_CANDLES,
+            testnet=self.config['testnet'],
+            url=self.config.get('websocket_public_url')
+        ).start()
+    
+    def start_metrics(self):
+        """Export per-endpoint request metrics (Prometheus endpoint and/or JSON snapshots)"""
+        port = self.config.get('metrics_port')
+        if port:
+            try:
+                self.client.metrics.serve(port)
+            except OSError as e:
+                logger.warning(f"⚠️ Metrics endpoint not started: {e}")
+        snapshot_file = self.config.get('metrics_file')
+        if snapshot_file:
+            self.client.metrics.start_snapshots(
+                os.path.join(user_data_dir, snapshot_file),
+                self.config.get('metrics_interval', 60)
+            )
+    
+    def start_private_stream(self):
+        """Start the position/order/wallet stream (REST reloads stay the fallback)"""
+        if not self.config.get('use_websocket', True):
+            return
+        self.private_stream = PrivateStream(
+            self.client,
+            testnet=self.config['testnet'],
+            url=self.config.get('websocket_private_url')
+        ).start()
+        self.client.private_stream = self.private_stream
+    
+    def stored_klines(self, symbol, candles, last_closed):
+        """
+        (kline_request, candles) for evaluate_symbol from a candle store
+        
+        Only the candles from the state's last committed one on when the
+        filter state can be continued, otherwise the whole window. The
+        request's 'closed' is the store's newest closed timestamp.
+        
+        Args:
+            candles: candles(since=None) of the store, oldest first
+            last_closed: last_closed() of the store
+        """
+        state = self.filter_states.get(symbol)
+        if state is not None and state.last_timestamp is not None:
+            recent = candles(state.last_timestamp)
+            if recent and recent[0][0] == state.last_timestamp:
+                return {'start': state.last_timestamp, 'closed': last_closed()}, recent
+        
+        window = candles(None)
+        return ({'limit': self.WARMUP_CANDLES, 'closed': last_closed()}, window) if window else None
+    
+    def feed_klines(self, symbol):
+        """(kline_request, candles) from the WebSocket feed, None when it is not live"""
+        if self.feed is None or not self.feed.is_live(symbol):
+            return None
+        return self.stored_klines(symbol, lambda since: self.feed.candles(symbol, since=since),
+                                  lambda: self.feed.last_closed(symbol))
+    
+    def cached_klines(self, symbol):
+        """(kline_request, candles) from the REST kline cache, None when it is empty"""
+        timeframe = self.config['timeframe']
+        return self.stored_klines(symbol, lambda since: self.klines.candles(symbol, timeframe, since=since),
+                                  lambda: self.klines.last_closed(symbol, timeframe))
+    
+    def evaluate_symbol(self, symbol, prefetched=None):
+        """
+        Bring the symbol's filter state up to date and evaluate the forming candle
+        
+        Closed candles are committed to the state; when the newest one has
+        just closed (a confirmed stream bar) it is committed too and its
+        close stands in for the next forming candle, so its signal is seen
+        right away. The state is rebuilt from a fresh window when there is
+        none, or when the incremental candles do not line up.
+        
+        Args:
+            prefetched: Optional (kline_request, candles) from stored_klines
+        
+        Returns:
+            calculate_signals-style dict, or None if no candles are available
+        """
+        timeframe = self.config['timeframe']
+        if prefetched is None:
+            self.klines.sync(symbol, timeframe)
+            prefetched = self.cached_klines(symbol)
+            if prefetched is None:
+                return None
+        request, candles = prefetched
+        
+        if not candles:
+            return None
+        
+        # Without a known close time the last candle is taken as forming
+        if request.get('closed') is not None:
+            closed = [candle for candle in candles if candle[0] <= request['closed']]
+        elif 'closed' in request:
+            closed = []
+        else:
+            closed = candles[:-1]
+        
+        if 'start' in request:
+            state = self.filter_states[symbol]
+            if candles[0][0] == state.last_timestamp:
+                for candle in closed[1:]:
+                    state.update(candle)
+                return state.peek(candles[-1])
+            
+            logger.info(f"{symbol}: indicator state out of sync, rebuilding")
+            candles = self.client.get_klines(symbol, timeframe, limit=self.WARMUP_CANDLES)
+            if not candles:
+                return None
+            closed = candles[:-1]
+        
+        # Commit only the closed candles; peek at the forming one
+        state = TwinRangeFilterState.from_candles(closed, *self.filter_params())
+        self.filter_states[symbol] = state
+        return state.peek(candles[-1])
+    
     def check_signals(self):
         """Check signals"""
+        # Streamed candles where the feed is live, otherwise sync the kline
+        # cache for the remaining pairs concurrently; then evaluate in pair order
+        timeframe = self.config['timeframe']
+        prefetched = {}
+        if self.feed is not None:
+            for symbol in self.pairs:
+                streamed = self.feed_klines(symbol)
+                if streamed is not None:
+                    prefetched[symbol] = streamed
+        
+        polled = [symbol for symbol in self.pairs if symbol not in prefetched]
+        if polled:
+            # Only the forming candle and any new ones are downloaded
+            self.aclient.run_all({
+                symbol: (self.klines.sync, (symbol, timeframe), {})
+                for symbol in polled
+            })
+            for symbol in polled:
+                prefetched[symbol] = self.cached_klines(symbol) or ({}, [])
+        
         for symbol in self.pairs:
             try:
-                # Get klines (already returns list of lists)
-                candles = self.client.get_klines(symbol, self.config['timeframe'], limit=200)
+                # Calculate Twin Range Filter signals from the incremental state
+                result = self.evaluate_symbol(symbol, prefetched[symbol])
                 
-                if not candles:
+                if result is None:
                     continue
                 
-                # Calculate Twin Range Filter signals
-                result = calculate_signals(
-                    candles,
-                    fast_period=self.config.get('twin_range_fast_period', 27),
-                    fast_range=self.config.get('twin_range_fast_range', 1.6),
-                    slow_period=self.config.get('twin_range_slow_period', 55),
-                    slow_range=self.config.get('twin_range_slow_range', 2.0)
-                )
-                
                 # Determine signal
                 if result['long_signal']:
                     signal = 'long'
@@ -457,6 +650,9 @@ class LiteMobileBot:
                 
             except Exception as e:
                 logger.error(f"{symbol}: {e}")
+        
+        # Checkpoint indicator state every cycle for warm restarts
+        self.save_state()
     
     def status(self):
         """Print status"""
@@ -466,10 +662,12 @@ class LiteMobileBot:
         
         total_pnl = 0
         active = 0
+        positions = self.get_positions()
+        tickers = self.get_tickers()
         
         for symbol in self.pairs:
-            pos = self.get_position(symbol)
-            ticker = self.client.get_ticker(symbol)
+            pos = positions[symbol]
+            ticker = tickers[symbol]
             price = float(ticker.get('lastPrice', 0)) if ticker else 0
             
             if pos['size'] > 0:
@@ -489,7 +687,10 @@ class LiteMobileBot:
         logger.info("=" * 40)
         
         self.load_state()
+        self.start_metrics()
         self.setup_leverage()
+        self.start_feed()
+        self.start_private_stream()
         self.status()
         self.running = True
         
@@ -503,6 +704,8 @@ class LiteMobileBot:
                 if stop_flag:
                     logger.info("Stop flag detected, stopping bot...")
                     break
+                # Reload the position book once per cycle (one request for all pairs)
+                self.refresh_positions()
                 self.check_stop_loss_take_profit()
                 self.check_signals()
                 
@@ -515,7 +718,12 @@ class LiteMobileBot:
                     if stop_flag:
                         logger.info("Stop flag detected during sleep, stopping bot...")
                         break
-                    time.sleep(1)
+                    if self.feed is not None:
+                        # Wake up as soon as a streamed candle closes
+                        if self.feed.wait_for_close(1):
+                            break
+                    else:
+                        time.sleep(1)
                 if stop_flag:
                     break
         
@@ -526,8 +734,14 @@ class LiteMobileBot:
             logger.error(f"Error: {e}")
             self.running = False
         
+        if self.feed is not None:
+            self.feed.stop()
+        if self.private_stream is not None:
+            self.client.private_stream = None
+            self.private_stream.stop()
         self.save_state()
         self.status()
+        self.client.metrics.stop()
         logger.info("✓ Stopped")
 
 
@@ -540,13 +754,10 @@ def main():
     
     # Test public endpoint first (doesn't need auth)
     logger.info("Step 1: Testing market data (no auth)...")
-    for i in range(3):
-        ticker = bot.client.get_ticker('BTCUSDT')
-        if ticker and ticker.get('lastPrice'):
-            logger.info(f"✅ Market data OK - BTC: ${ticker.get('lastPrice')}")
-            break
-        logger.warning(f"Retry {i+1}/3...")
-        time.sleep(2)
+    price = bot.client.retry['read'].until(
+        lambda: (bot.client.get_ticker('BTCUSDT') or {}).get('lastPrice'), "Market data check")
+    if price:
+        logger.info(f"✅ Market data OK - BTC: ${price}")
     else:
         logger.error("❌ Cannot reach Bybit API")
         logger.info("Check your internet connection")
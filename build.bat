@@ -8,7 +8,16 @@ echo Copying data files...
 copy mobile_config.json dist\launcher\
 copy bot_mobile_lite.py dist\launcher\
 copy bybit_client_lite.py dist\launcher\
+copy rate_limiter_lite.py dist\launcher\
+copy retry_policy_lite.py dist\launcher\
+copy metrics_lite.py dist\launcher\
+copy bybit_async_lite.py dist\launcher\
+copy bybit_stream_lite.py dist\launcher\
+copy websocket_lite.py dist\launcher\
+copy candle_buffer_lite.py dist\launcher\
+copy kline_cache_lite.py dist\launcher\
 copy twin_range_filter_lite.py dist\launcher\
+copy risk_lite.py dist\launcher\
 copy bot_state.json dist\launcher\
 copy requirements.txt dist\launcher\
 echo Build complete. Run dist\launcher\launcher.exe
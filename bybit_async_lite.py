@@ -0,0 +1,109 @@
+"""
+Lightweight asyncio Bybit client - No extra dependencies
+Async facade over BybitClientLite for concurrent per-symbol requests
+"""
+
+import asyncio
+import logging
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+# BybitClientLite methods exposed as coroutines with the same signatures
+ASYNC_METHODS = (
+    'get_klines', 'fetch_klines_into', 'get_position', 'get_all_positions', 'get_ticker',
+    'get_instrument_info', 'get_max_leverage', 'calculate_qty', 'get_wallet_balance',
+    'set_position_mode', 'set_leverage', 'place_order', 'place_orders', 'cancel_orders',
+    'set_trading_stop', 'close_position'
+)
+
+
+class AsyncBybitClient:
+    """
+    asyncio client with the BybitClientLite method surface
+
+    Every call runs the blocking BybitClientLite method on a small worker pool
+    that shares the client's keep-alive session, so requests for different
+    symbols overlap on the wire instead of running one after another. The
+    pool size is the concurrency limit; keep it at or below the client's HTTP
+    pool size so every worker gets a warm connection.
+
+    Usage:
+        aclient = AsyncBybitClient(client, concurrency=8)
+        ticker = await aclient.get_ticker('BTCUSDT')
+        candles = await aclient.map_symbols('get_klines', pairs, '60', limit=200)
+    """
+
+    def __init__(self, client, concurrency: int = 8):
+        self.client = client
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bybit')
+
+    async def call(self, func: Callable, *args, **kwargs):
+        """Run any blocking callable on the request pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def map_symbols(self, method: str, symbols: Iterable[str], *args, **kwargs) -> Dict:
+        """
+        Call one client method for every symbol concurrently
+        Returns: {symbol: result}; a failed call is logged and maps to None
+        """
+        symbols = list(symbols)
+        func = getattr(self.client, method)
+        results = await asyncio.gather(
+            *(self.call(func, symbol, *args, **kwargs) for symbol in symbols),
+            return_exceptions=True
+        )
+        mapped = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"{method} {symbol}: {result}")
+                result = None
+            mapped[symbol] = result
+        return mapped
+
+    def fetch_all(self, method: str, symbols: Iterable[str], *args, **kwargs) -> Dict:
+        """Blocking wrapper around map_symbols for synchronous callers like the bot loop"""
+        return asyncio.run(self.map_symbols(method, symbols, *args, **kwargs))
+
+    def run_all(self, calls: Dict) -> Dict:
+        """
+        Run {key: (callable, args, kwargs)} concurrently from synchronous code
+        Returns: {key: result}; a failed call is logged and maps to None
+        """
+        async def gather():
+            keys = list(calls)
+            results = await asyncio.gather(
+                *(self.call(func, *args, **kwargs) for func, args, kwargs in calls.values()),
+                return_exceptions=True
+            )
+            mapped = {}
+            for key, result in zip(keys, results):
+                if isinstance(result, Exception):
+                    logger.error(f"{key}: {result}")
+                    result = None
+                mapped[key] = result
+            return mapped
+
+        return asyncio.run(gather())
+
+    def close(self):
+        """Stop the worker pool (the underlying client stays open)"""
+        self._executor.shutdown(wait=False)
+
+
+def _async_method(name):
+    async def method(self, *args, **kwargs):
+        return await self.call(getattr(self.client, name), *args, **kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"AsyncBybitClient.{name}"
+    method.__doc__ = f"Async BybitClientLite.{name}"
+    return method
+
+
+for _name in ASYNC_METHODS:
+    setattr(AsyncBybitClient, _name, _async_method(_name))
@@ -3,14 +3,26 @@ Lightweight Bybit Client - No pandas required
 Uses only requests and built-in Python
 """
 
+import os
+import json
 import time
 import hmac
+import uuid
 import hashlib
+import threading
 import requests
+from decimal import Decimal, InvalidOperation
+from urllib.parse import unquote
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 import logging
 import urllib3
+from urllib3.util.retry import Retry
+
+from rate_limiter_lite import RateLimiter
+from metrics_lite import RequestMetrics, time_connections, take_connect_time
+from retry_policy_lite import RetryPolicy, DEFAULT_POLICIES, budget, remaining
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -18,6 +30,448 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Kline interval lengths in milliseconds (monthly candles vary in length)
+INTERVAL_MS = {
+    '1': 60000, '3': 180000, '5': 300000, '15': 900000, '30': 1800000,
+    '60': 3600000, '120': 7200000, '240': 14400000, '360': 21600000, '720': 43200000,
+    'D': 86400000, 'W': 604800000
+}
+
+
+def interval_to_ms(interval: str) -> Optional[int]:
+    """Length of a kline interval in milliseconds, None if it is not fixed"""
+    return INTERVAL_MS.get(str(interval))
+
+
+class ServerClock:
+    """
+    Cached estimate of Bybit server time
+    
+    Samples /v5/market/time a few times per sync, keeps the lowest-RTT sample
+    and uses the midpoint of the round trip as the local time of the server
+    reading. Signed requests are stamped from the cached offset; a resync
+    happens every resync_interval seconds or when forced after the server
+    rejects a timestamp. Drift is estimated from nanosecond-precision samples
+    only (timeSecond readings are too coarse for it).
+    """
+    
+    FAILED_SYNC_BACKOFF = 10.0  # seconds before retrying a failed sync
+    MAX_DRIFT = 1.0             # ms of offset change per second, clamp
+    
+    def __init__(self, fetch_server_time, resync_interval: float = 300.0, samples: int = 3, history: int = 8):
+        """
+        Args:
+            fetch_server_time: Callable returning (server_ms, precise) or None
+            resync_interval: Seconds between periodic syncs
+            samples: Time requests per sync, the fastest one is kept
+            history: Precise syncs kept for drift estimation
+        """
+        self._fetch = fetch_server_time
+        self.resync_interval = resync_interval
+        self.samples = samples
+        self.history = history
+        self.offset_ms = 0.0
+        self.drift = 0.0
+        self.rtt_ms = None
+        self.synced_at = None   # local ms of the last successful sync
+        self._points = []       # (local_ms, offset_ms) of precise syncs
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+    
+    def sync(self) -> bool:
+        """Resample server time now"""
+        with self._lock:
+            best = None
+            for _ in range(self.samples):
+                t0 = time.time() * 1000
+                sample = self._fetch()
+                t1 = time.time() * 1000
+                if not sample:
+                    continue
+                server_ms, precise = sample
+                rtt = t1 - t0
+                if best is None or rtt < best[0]:
+                    best = (rtt, server_ms - (t0 + t1) / 2, (t0 + t1) / 2, precise)
+            
+            if best is None:
+                self._next_sync = time.time() + self.FAILED_SYNC_BACKOFF
+                logger.warning("Server time sync failed, using last known offset")
+                return False
+            
+            self.rtt_ms, self.offset_ms, self.synced_at, precise = best
+            self._next_sync = time.time() + self.resync_interval
+            if precise:
+                self._points = (self._points + [(self.synced_at, self.offset_ms)])[-self.history:]
+                self.drift = self._estimate_drift()
+            logger.debug(f"Server clock offset {self.offset_ms:.1f}ms (RTT {self.rtt_ms:.1f}ms, drift {self.drift:.4f}ms/s)")
+            return True
+    
+    def _estimate_drift(self) -> float:
+        """Least-squares slope of offset against local time, in ms per second"""
+        if len(self._points) < 2:
+            return 0.0
+        n = len(self._points)
+        mean_t = sum(p[0] for p in self._points) / n
+        mean_o = sum(p[1] for p in self._points) / n
+        var = sum((p[0] - mean_t) ** 2 for p in self._points)
+        if var == 0:
+            return 0.0
+        slope = sum((p[0] - mean_t) * (p[1] - mean_o) for p in self._points) / var * 1000
+        return max(-self.MAX_DRIFT, min(self.MAX_DRIFT, slope))
+    
+    def now(self) -> int:
+        """Current server time estimate in ms, syncing when due"""
+        if time.time() >= self._next_sync:
+            self.sync()
+        local = time.time() * 1000
+        if self.synced_at is None:
+            return int(local)
+        return int(local + self.offset_ms + self.drift * (local - self.synced_at) / 1000)
+
+
+class TickerSnapshot:
+    """
+    In-memory snapshot of every linear ticker
+    
+    One /v5/market/tickers?category=linear request returns all symbols; it is
+    indexed by symbol and reused until it is older than max_age seconds.
+    Concurrent readers of a stale snapshot share a single refresh, and after
+    a failed one reads return None for FAILED_REFRESH_BACKOFF seconds
+    instead of each sending the bulk request again. Tickers pushed by a
+    stream with apply() are served on their own timestamps.
+    """
+    
+    FAILED_REFRESH_BACKOFF = 1.0  # seconds before retrying a failed refresh
+    
+    def __init__(self, fetch_all, max_age: float = 2.0):
+        """
+        Args:
+            fetch_all: Callable returning the ticker list, or None on failure
+            max_age: Seconds a snapshot may be served before refreshing
+        """
+        self._fetch_all = fetch_all
+        self.max_age = max_age
+        self.tickers = {}
+        self.updated_at = None
+        self.pushed_at = {}     # symbol -> monotonic time of the last pushed ticker
+        self._retry_at = 0.0    # monotonic time before which a failed refresh is not retried
+        self._lock = threading.Lock()
+    
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful refresh, None if never loaded"""
+        return None if self.updated_at is None else time.monotonic() - self.updated_at
+    
+    def is_fresh(self) -> bool:
+        age = self.age()
+        return age is not None and age <= self.max_age
+    
+    def refresh(self) -> bool:
+        """Reload every ticker in one request"""
+        tickers = self._fetch_all()
+        if tickers is None:
+            self._retry_at = time.monotonic() + self.FAILED_REFRESH_BACKOFF
+            return False
+        self.tickers = {t['symbol']: t for t in tickers if t.get('symbol')}
+        self.updated_at = time.monotonic()
+        return True
+    
+    def apply(self, ticker: Dict):
+        """Store one pushed ticker (e.g. from MarketDataStream), served while younger than max_age"""
+        symbol = ticker.get('symbol')
+        if symbol:
+            self.tickers[symbol] = ticker
+            self.pushed_at[symbol] = time.monotonic()
+    
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Ticker for symbol within the staleness bound, None if unavailable"""
+        pushed_at = self.pushed_at.get(symbol)
+        if pushed_at is not None and time.monotonic() - pushed_at <= self.max_age:
+            return self.tickers.get(symbol)
+        if not self.is_fresh() and time.monotonic() >= self._retry_at:
+            with self._lock:
+                # Another thread may have refreshed (or failed to) while we waited
+                if not self.is_fresh() and time.monotonic() >= self._retry_at:
+                    self.refresh()
+        if not self.is_fresh():
+            return None
+        return self.tickers.get(symbol)
+
+
+class PositionBook:
+    """
+    In-memory book of every open USDT-settled linear position
+    
+    One paginated /v5/position/list?settleCoin=USDT request loads the whole
+    account. The book is reloaded lazily after invalidate() (once per bot
+    cycle, and after our own orders) and can also be patched position by
+    position from a push feed with apply(). Count, side and exposure queries
+    never touch the network once the book is loaded; after a failed reload
+    they serve the last known positions for FAILED_REFRESH_BACKOFF seconds
+    (or until the next invalidate()) before trying again.
+    """
+    
+    FAILED_REFRESH_BACKOFF = 5.0  # seconds before retrying a failed reload
+    
+    def __init__(self, fetch_all):
+        """
+        Args:
+            fetch_all: Callable returning the raw position list, or None on failure
+        """
+        self._fetch_all = fetch_all
+        self.positions = {}     # symbol -> raw position dict, open positions only
+        self.updated_at = None
+        self.stale = True
+        self._retry_at = 0.0    # monotonic time before which a failed reload is not retried
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _size(position: Dict) -> float:
+        try:
+            return float(position.get('size') or 0)
+        except (TypeError, ValueError):
+            return 0.0
+    
+    def refresh(self) -> bool:
+        """Reload every position in one (paginated) request"""
+        positions = self._fetch_all()
+        if positions is None:
+            logger.warning("Position refresh failed, keeping last known positions")
+            self._retry_at = time.monotonic() + self.FAILED_REFRESH_BACKOFF
+            return False
+        self.positions = {p['symbol']: p for p in positions if p.get('symbol') and self._size(p) > 0}
+        self.updated_at = time.monotonic()
+        self.stale = False
+        return True
+    
+    def invalidate(self):
+        """Reload on the next read"""
+        self.stale = True
+        self._retry_at = 0.0
+    
+    def _ensure(self):
+        if self.stale and time.monotonic() >= self._retry_at:
+            with self._lock:
+                # Another thread may have refreshed (or failed to) while we waited
+                if self.stale and time.monotonic() >= self._retry_at:
+                    self.refresh()
+    
+    def apply(self, position: Dict):
+        """Patch one raw position (e.g. from a private stream update)"""
+        symbol = position.get('symbol')
+        if not symbol:
+            return
+        if 'avgPrice' not in position and 'entryPrice' in position:
+            # Stream pushes name the entry price differently from /v5/position/list
+            position = dict(position, avgPrice=position['entryPrice'])
+        if self._size(position) > 0:
+            self.positions[symbol] = position
+        else:
+            self.positions.pop(symbol, None)
+    
+    def get(self, symbol: str) -> Dict:
+        """Raw position for symbol, {} when flat"""
+        self._ensure()
+        return self.positions.get(symbol, {})
+    
+    def open_positions(self, symbols=None) -> Dict[str, Dict]:
+        """{symbol: raw position} for open positions, optionally limited to symbols"""
+        self._ensure()
+        if symbols is None:
+            return dict(self.positions)
+        return {s: self.positions[s] for s in symbols if s in self.positions}
+    
+    def count(self, symbols=None) -> int:
+        """Number of open positions"""
+        return len(self.open_positions(symbols))
+    
+    def side(self, symbol: str) -> str:
+        """'Buy', 'Sell' or 'None'"""
+        return self.get(symbol).get('side') or 'None'
+    
+    def exposure(self, symbols=None, side: str = None) -> float:
+        """Total position value in USDT, optionally for one side"""
+        total = 0.0
+        for position in self.open_positions(symbols).values():
+            if side is None or position.get('side') == side:
+                try:
+                    total += float(position.get('positionValue') or 0)
+                except (TypeError, ValueError):
+                    pass
+        return total
+
+
+def _decimals(step: str) -> int:
+    """Decimal places of a step/tick string such as '0.001' or '1e-05'"""
+    try:
+        return max(0, -Decimal(str(step)).normalize().as_tuple().exponent)
+    except (InvalidOperation, TypeError):
+        return 0
+
+
+def instrument_spec(instrument: Dict) -> Dict:
+    """Precompute rounding scales and limits from one instruments-info entry"""
+    lot_size = instrument.get('lotSizeFilter', {})
+    price_filter = instrument.get('priceFilter', {})
+    leverage_filter = instrument.get('leverageFilter', {})
+    qty_step = lot_size.get('qtyStep') or '0.001'
+    tick_size = price_filter.get('tickSize') or '0.0001'
+    return {
+        'qty_step': float(qty_step),
+        'qty_decimals': _decimals(qty_step),
+        'min_qty': float(lot_size.get('minOrderQty') or 0.001),
+        'max_qty': float(lot_size.get('maxOrderQty') or 0),
+        'min_notional': float(lot_size.get('minNotionalValue') or 0),
+        'tick_size': float(tick_size),
+        'price_decimals': _decimals(tick_size),
+        'max_leverage': int(float(leverage_filter.get('maxLeverage') or 10))
+    }
+
+
+def order_qty(spec: Dict, price: float, usd_amount: float, leverage: int = 1) -> float:
+    """Order quantity for a USD margin at price, rounded to the instrument's qty step"""
+    if not spec or not price:
+        return 0
+    
+    qty_step = spec['qty_step']
+    raw_qty = (usd_amount * leverage) / price
+    qty = round(raw_qty / qty_step) * qty_step
+    qty = max(qty, spec['min_qty'])
+    return round(qty, spec['qty_decimals'])
+
+
+class InstrumentRegistry:
+    """
+    TTL cache of every linear instrument's lot size, tick size and leverage
+    
+    The whole category is loaded with paginated /v5/market/instruments-info
+    requests and kept as precomputed specs (see instrument_spec). It reloads
+    after ttl seconds or after invalidate() (e.g. an order rejected for its
+    qty/price), and is persisted to cache_file so a restart needs no request
+    while the file is younger than ttl. A failed reload keeps serving the
+    last known specs and is retried after FAILED_REFRESH_BACKOFF seconds.
+    A symbol the registry does not know (listed after the last reload) is
+    fetched on its own with fetch_one, at most once per
+    MISSING_SYMBOL_BACKOFF seconds while the exchange does not know it either.
+    """
+    
+    FAILED_REFRESH_BACKOFF = 10.0   # seconds before retrying a failed reload
+    MISSING_SYMBOL_BACKOFF = 60.0   # seconds before looking up an unknown symbol again
+    
+    def __init__(self, fetch_all, ttl: float = 21600.0, cache_file: str = None, fetch_one=None):
+        """
+        Args:
+            fetch_all: Callable returning the raw instrument list, or None on failure
+            ttl: Seconds before the registry is reloaded
+            cache_file: JSON file to persist specs in (None to disable)
+            fetch_one: Callable returning one raw instrument by symbol ({} when unknown)
+        """
+        self._fetch_all = fetch_all
+        self._fetch_one = fetch_one
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self.specs = {}
+        self.loaded_at = None   # wall-clock seconds, survives restarts via cache_file
+        self._retry_at = 0.0    # monotonic time before which a failed reload is not retried
+        self._missing = {}      # symbol -> monotonic time before which it is not looked up again
+        self._lock = threading.Lock()
+        self.load_file()
+    
+    def load_file(self) -> bool:
+        """Load persisted specs"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return False
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            self.specs = data['instruments']
+            self.loaded_at = float(data['time'])
+            return True
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring instrument cache {self.cache_file}: {e}")
+            return False
+    
+    def save_file(self):
+        """Persist specs (written to a temp file, then swapped in)"""
+        if not self.cache_file or self.loaded_at is None:
+            return
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({'time': self.loaded_at, 'instruments': self.specs}, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Could not save instrument cache: {e}")
+    
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and time.time() - self.loaded_at <= self.ttl
+    
+    def refresh(self) -> bool:
+        """Reload every instrument"""
+        instruments = self._fetch_all()
+        if not instruments:
+            logger.warning("Instrument refresh failed, keeping last known specs")
+            self._retry_at = time.monotonic() + self.FAILED_REFRESH_BACKOFF
+            return False
+        specs = {}
+        for instrument in instruments:
+            try:
+                specs[instrument['symbol']] = instrument_spec(instrument)
+            except (KeyError, TypeError, ValueError):
+                continue
+        self.specs = specs
+        self.loaded_at = time.time()
+        self._missing.clear()
+        self.save_file()
+        logger.info(f"Loaded {len(specs)} instruments")
+        return True
+    
+    def invalidate(self):
+        """Reload on the next lookup"""
+        self.loaded_at = None
+        self._retry_at = 0.0
+    
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Spec for symbol, None if unknown"""
+        if not self.is_fresh() and time.monotonic() >= self._retry_at:
+            with self._lock:
+                # Another thread may have refreshed (or failed to) while we waited
+                if not self.is_fresh() and time.monotonic() >= self._retry_at:
+                    self.refresh()
+        spec = self.specs.get(symbol)
+        if spec is None:
+            spec = self._lookup(symbol)
+        return spec
+    
+    def _lookup(self, symbol: str) -> Optional[Dict]:
+        """Fetch one symbol missing from the registry"""
+        if self._fetch_one is None or time.monotonic() < self._missing.get(symbol, 0.0):
+            return None
+        with self._lock:
+            if symbol in self.specs:
+                return self.specs[symbol]
+            instrument = self._fetch_one(symbol)
+            spec = None
+            if instrument and instrument.get('symbol') == symbol:
+                try:
+                    spec = instrument_spec(instrument)
+                except (TypeError, ValueError):
+                    pass
+            if spec is None:
+                self._missing[symbol] = time.monotonic() + self.MISSING_SYMBOL_BACKOFF
+                return None
+            self.specs[symbol] = spec
+            self.save_file()
+            logger.info(f"Loaded instrument {symbol}")
+            return spec
+    
+    def round_price(self, symbol: str, price: float) -> float:
+        """Round a price to the nearest tick (4 decimals when the symbol is unknown)"""
+        spec = self.get(symbol)
+        if not spec:
+            return round(price, 4)
+        tick_size = spec['tick_size']
+        return round(round(price / tick_size) * tick_size, spec['price_decimals'])
+
 
 class BybitClientLite:
     """Lightweight Bybit API Client"""
@@ -25,12 +479,143 @@ class BybitClientLite:
     MAINNET_URL = "https://api.bybit.com"
     TESTNET_URL = "https://api-testnet.bybit.com"
     
-    def __init__(self, api_key: str, api_secret: str, testnet: bool = True):
+    # Safety caps for cursor pagination (positions: 200 per page, instruments: 1000)
+    MAX_POSITION_PAGES = 20
+    MAX_INSTRUMENT_PAGES = 10
+    
+    # Order rejections that may mean our cached lot size / tick size is outdated
+    INSTRUMENT_REJECT_CODES = (10001, 110003, 110094)
+    
+    # Seconds to wait for a fill to show up on the private stream
+    FILL_TIMEOUT = 5.0
+    
+    # Request timeout, cut to what is left of a retry policy's budget;
+    # with less than MIN_REQUEST_TIMEOUT left the request is not sent
+    REQUEST_TIMEOUT = 10.0
+    MIN_REQUEST_TIMEOUT = 0.1
+    
+    # Create-order rejections caused by the attached SL/TP; the generic 10001
+    # params error only counts when its message names the SL/TP
+    TPSL_REJECT_CODES = (110092, 110093)
+    TPSL_PARAM_WORDS = ('stoploss', 'takeprofit')
+    
+    # Orders per create-batch / cancel-batch request (linear)
+    BATCH_LIMIT = 10
+    
+    DEFAULT_HEADERS = {
+        'User-Agent': 'TwinRangeFilterBot/lite',
+        'Accept': 'application/json',
+        'Connection': 'keep-alive'
+    }
+    
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = True,
+                 pool_size: int = 10, max_retries: int = 0, ticker_max_age: float = 2.0,
+                 instrument_ttl: float = 21600.0, instrument_cache: str = None, base_url: str = None):
+        """
+        max_retries: Transport-level retries of 429/5xx GET responses (retrying is left to self.retry)
+        base_url: Optional REST root overriding mainnet/testnet, e.g. a local fake_bybit_lite server
+        """
         self.api_key = api_key
         self.api_secret = api_secret
-        self.base_url = self.TESTNET_URL if testnet else self.MAINNET_URL
+        self.base_url = base_url or (self.TESTNET_URL if testnet else self.MAINNET_URL)
         self.recv_window = 60000  # Increased from 20000 to 60000ms (60 seconds) for better timestamp tolerance
+        self.session = self._create_session(pool_size, max_retries)
+        self.clock = ServerClock(self._fetch_server_time)
+        self.tickers = TickerSnapshot(self.get_all_tickers, max_age=ticker_max_age)
+        self.positions = PositionBook(self.get_all_positions)
+        self.instruments = InstrumentRegistry(self.get_all_instruments, ttl=instrument_ttl,
+                                              cache_file=instrument_cache,
+                                              fetch_one=self.get_instrument_info)
+        self.private_stream = None  # PrivateStream, attached by the caller when running
+        self.limiter = RateLimiter()
+        self.metrics = RequestMetrics()
+        self.retry = {name: RetryPolicy(name, **options) for name, options in DEFAULT_POLICIES.items()}
+    
+    def _create_session(self, pool_size: int, max_retries: int) -> requests.Session:
+        """
+        Pooled keep-alive session shared by every request
+        
+        Connections to the API host are reused instead of doing a TCP + TLS
+        handshake per call. Connection and read failures are not retried
+        here: the retry policies do that within their deadline, and a second
+        retry layer would multiply the time one call can take. 5xx/429
+        responses are only retried (max_retries) for GET.
+        """
+        retry = Retry(
+            total=max_retries,
+            connect=0,
+            read=0,
+            other=0,
+            status=max_retries,
+            backoff_factor=0.3,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        time_connections(adapter)
         
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(self.DEFAULT_HEADERS)
+        session.verify = False
+        return session
+    
+    def connection_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Connection reuse per host pool
+        Returns: {host: {'connections_opened', 'requests', 'reused'}}
+        """
+        stats = {}
+        for adapter in set(self.session.adapters.values()):
+            pools = getattr(adapter, 'poolmanager', None)
+            if pools is None:
+                continue
+            for key in pools.pools.keys():
+                pool = pools.pools[key]
+                host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                opened = pool.num_connections
+                sent = pool.num_requests
+                stats[host] = {
+                    'connections_opened': opened,
+                    'requests': sent,
+                    'reused': max(0, sent - opened)
+                }
+        return stats
+    
+    def rate_limit_stats(self) -> Dict:
+        """Queue depth and wait time per priority lane, tokens per endpoint group"""
+        return self.limiter.stats()
+    
+    def request_stats(self) -> Dict:
+        """Requests, errors, bytes and p50/p95/p99 time per phase for every endpoint"""
+        return self.metrics.snapshot()
+    
+    def _update_rate_limit(self, endpoint: str, response, ret_code=None):
+        """Feed X-Bapi-Limit-* headers and throttling errors back into the limiter"""
+        headers = response.headers
+        reset_in = None
+        reset = headers.get('X-Bapi-Limit-Reset-Timestamp')
+        if reset:
+            server_now = time.time() * 1000 + self.clock.offset_ms
+            reset_in = (int(reset) - server_now) / 1000
+        throttled = response.status_code in (403, 429) or ret_code == 10006
+        if throttled:
+            logger.warning(f"⚠️ Rate limited on {endpoint}, backing off")
+        self.limiter.update(
+            endpoint,
+            remaining=headers.get('X-Bapi-Limit-Status'),
+            limit=headers.get('X-Bapi-Limit'),
+            reset_in=reset_in,
+            throttled=throttled
+        )
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+    
     def _generate_signature(self, params: Dict[str, Any]) -> str:
         """Generate HMAC signature"""
         param_str = '&'.join([f"{k}={v}" for k, v in sorted(params.items())])
@@ -44,25 +629,82 @@ class BybitClientLite:
         """Get current timestamp in milliseconds"""
         return int(time.time() * 1000)
     
-    def _get_server_time(self) -> int:
-        """Get server timestamp from Bybit API"""
+    def _record_request(self, endpoint: str, method: str, signed: bool, response, ret_code,
+                        start: float, http_time: float, parse_time: float = None, queued: float = None):
+        """Record one request in self.metrics (start is its perf_counter send time)"""
+        connect_time = take_connect_time()
+        self.metrics.record(
+            endpoint, method, signed,
+            status=response.status_code if response is not None else 0,
+            ret_code=ret_code,
+            sent=len(response.request.url) + len(response.request.body or b'') if response is not None else 0,
+            received=len(response.content) if response is not None else 0,
+            timings={
+                'total': (queued or 0.0) + time.perf_counter() - start,
+                'queue': queued,
+                'connect': connect_time,
+                'server': http_time - (connect_time or 0.0),
+                'parse': parse_time
+            }
+        )
+    
+    def _fetch_server_time(self):
+        """
+        One server time sample from Bybit API
+        Returns: (server_ms, precise) or None; precise when timeNano was provided
+        Sent directly (no limiter queue, which would skew the RTT) but recorded in self.metrics
+        """
+        timeout = 5.0
+        if remaining() is not None:
+            timeout = min(timeout, remaining())
+        if timeout < self.MIN_REQUEST_TIMEOUT:
+            return None
+        
+        endpoint = "/v5/market/time"
+        response = None
+        ret_code = -1
+        parse_time = None
+        sample = None
+        take_connect_time()
+        start = time.perf_counter()
         try:
-            url = f"{self.base_url}/v5/market/time"
-            response = requests.get(url, timeout=5, verify=False)
+            response = self.session.get(f"{self.base_url}{endpoint}", timeout=timeout)
+            http_time = time.perf_counter() - start
             if response.status_code == 200:
                 data = response.json()
-                if data.get('retCode') == 0:
-                    server_time = int(data['result']['timeSecond']) * 1000
-                    return server_time
+                parse_time = time.perf_counter() - start - http_time
+                ret_code = data.get('retCode')
+                if ret_code == 0:
+                    result = data['result']
+                    if result.get('timeNano'):
+                        sample = int(result['timeNano']) / 1e6, True
+                    else:
+                        # Second precision: the true time is somewhere in that second
+                        sample = int(result['timeSecond']) * 1000 + 500, False
         except Exception as e:
+            http_time = time.perf_counter() - start
             logger.warning(f"Failed to get server time: {e}")
-        # Fallback to local time if server time fails
-        return self._get_timestamp()
+        
+        self._record_request(endpoint, 'GET', False, response, ret_code, start, http_time, parse_time)
+        return sample
+    
+    def _get_server_time(self) -> int:
+        """Get server timestamp (cached offset, falls back to local time if never synced)"""
+        return self.clock.now()
     
-    def _request_v5(self, method: str, endpoint: str, params: Dict = None, signed: bool = False) -> Dict:
-        """Make V5 API request"""
+    def _request_v5(self, method: str, endpoint: str, params: Dict = None, signed: bool = False,
+                    lane: int = None, _resynced: bool = False) -> Dict:
+        """
+        Make V5 API request
+        lane: Rate limiter priority lane (default from the endpoint, see rate_limiter_lite)
+        Every call is recorded in self.metrics (status, retCode, bytes, time per phase)
+        Inside a retry policy the limiter wait and the timeout are cut to its remaining budget
+        """
+        wait_start = time.perf_counter()
+        queued = self.limiter.acquire(endpoint, lane, timeout=remaining())
         url = f"{self.base_url}{endpoint}"
         params = params or {}
+        query = params
         headers = {}
         
         if signed:
@@ -71,8 +713,10 @@ class BybitClientLite:
             if method == 'GET':
                 param_str = '&'.join([f"{k}={v}" for k, v in sorted(params.items())])
                 sign_str = f"{timestamp}{self.api_key}{self.recv_window}{param_str}"
+                # Send exactly the query string that was signed (cursors are pre-encoded)
+                url = f"{url}?{param_str}"
+                query = None
             else:
-                import json
                 param_str = json.dumps(params)
                 sign_str = f"{timestamp}{self.api_key}{self.recv_window}{param_str}"
             
@@ -90,40 +734,79 @@ class BybitClientLite:
                 'Content-Type': 'application/json'
             }
         
+        # Signing may have resynced the clock: take the budget left now
+        timeout = self.REQUEST_TIMEOUT
+        if remaining() is not None:
+            timeout = min(timeout, remaining())
+        if queued is None or timeout < self.MIN_REQUEST_TIMEOUT:
+            waited = time.perf_counter() - wait_start
+            logger.warning(f"⏱️ {endpoint}: retry budget used up, request not sent")
+            self.metrics.record(endpoint, method, signed, status=0, ret_code=-1,
+                                timings={'total': waited, 'queue': queued})
+            return {'retCode': -1, 'retMsg': 'Retry budget exhausted'}
+        
+        response = None
+        parse_time = None
+        client_error = True
+        take_connect_time()
+        start = time.perf_counter()
         try:
             if method == 'GET':
-                response = requests.get(url, params=params, headers=headers, timeout=10, verify=False)
+                response = self.session.get(url, params=query, headers=headers, timeout=timeout)
             else:
-                response = requests.post(url, json=params, headers=headers, timeout=10, verify=False)
+                response = self.session.post(url, json=params, headers=headers, timeout=timeout)
+            http_time = time.perf_counter() - start
             
             # Check if response is empty
             if not response.text:
+                self._update_rate_limit(endpoint, response)
                 logger.error(f"Empty response from {url}")
-                return {'retCode': -1, 'retMsg': 'Empty response'}
-            
-            # Try to parse JSON
-            try:
-                data = response.json()
-            except ValueError as e:
-                logger.error(f"Invalid JSON response: {response.text[:200]}")
-                return {'retCode': -1, 'retMsg': f'Invalid JSON: {str(e)}'}
-            
-            if data.get('retCode') != 0 and data.get('retCode') != 110043:
-                logger.error(f"API Error: {data.get('retMsg')} (Code: {data.get('retCode')})")
-            
-            return data
+                data = {'retCode': -1, 'retMsg': 'Empty response'}
+            else:
+                # Try to parse JSON
+                try:
+                    data = response.json()
+                    parse_time = time.perf_counter() - start - http_time
+                    client_error = False
+                    self._update_rate_limit(endpoint, response, data.get('retCode'))
+                except ValueError as e:
+                    self._update_rate_limit(endpoint, response)
+                    logger.error(f"Invalid JSON response: {response.text[:200]}")
+                    data = {'retCode': -1, 'retMsg': f'Invalid JSON: {str(e)}'}
         except requests.exceptions.RequestException as e:
+            http_time = time.perf_counter() - start
             logger.error(f"Network error: {e}")
-            return {'retCode': -1, 'retMsg': f'Network error: {str(e)}'}
+            data = {'retCode': -1, 'retMsg': f'Network error: {str(e)}'}
         except Exception as e:
+            http_time = time.perf_counter() - start
             logger.error(f"Request failed: {e}")
-            return {'retCode': -1, 'retMsg': str(e)}
+            data = {'retCode': -1, 'retMsg': str(e)}
+        
+        self._record_request(endpoint, method, signed, response, data.get('retCode'),
+                             start, http_time, parse_time, queued)
+        
+        if client_error:
+            return data
+        
+        # Timestamp rejected: resync the clock once and resend
+        if signed and data.get('retCode') == 10002 and not _resynced:
+            logger.warning(f"Timestamp rejected ({data.get('retMsg')}), resyncing server clock")
+            self.clock.sync()
+            return self._request_v5(method, endpoint, params, signed, lane, _resynced=True)
+        
+        if data.get('retCode') != 0 and data.get('retCode') != 110043:
+            logger.error(f"API Error: {data.get('retMsg')} (Code: {data.get('retCode')})")
+        
+        return data
     
-    def get_klines(self, symbol: str, interval: str, limit: int = 200) -> List[List]:
-        """
-        Get candlestick data as list of lists
-        Returns: [[timestamp, open, high, low, close, volume], ...]
-        """
+    def _live_private_stream(self):
+        """The attached private stream if it is connected and current, else None"""
+        stream = self.private_stream
+        return stream if stream is not None and stream.is_healthy() else None
+    
+    def _get_kline_rows(self, symbol: str, interval: str, limit: int, start: int = None,
+                        end: int = None) -> List[List]:
+        """Raw kline rows as returned by the API (strings, newest first)"""
         endpoint = "/v5/market/kline"
         params = {
             'category': 'linear',
@@ -131,6 +814,10 @@ class BybitClientLite:
             'interval': interval,
             'limit': limit
         }
+        if start is not None:
+            params['start'] = int(start)
+        if end is not None:
+            params['end'] = int(end)
         
         response = self._request_v5('GET', endpoint, params)
         
@@ -138,7 +825,17 @@ class BybitClientLite:
             logger.error(f"Failed to get klines: {response.get('retMsg')}")
             return []
         
-        data = response.get('result', {}).get('list', [])
+        return response.get('result', {}).get('list', [])
+    
+    def get_klines(self, symbol: str, interval: str, limit: int = 200, start: int = None,
+                   end: int = None) -> List[List]:
+        """
+        Get candlestick data as list of lists
+        start: Optional start timestamp (ms) to fetch only candles from that time on
+        end: Optional timestamp (ms) of the newest candle to fetch
+        Returns: [[timestamp, open, high, low, close, volume], ...]
+        """
+        data = self._get_kline_rows(symbol, interval, limit, start, end)
         
         if not data:
             return []
@@ -157,6 +854,22 @@ class BybitClientLite:
         
         return klines
     
+    def fetch_klines_into(self, buffer, symbol: str, interval: str, limit: int = 200, start: int = None,
+                          end: int = None) -> int:
+        """
+        Fetch klines straight into a CandleBuffer (no intermediate list of lists)
+        The newest candle overwrites the buffer's forming bar if timestamps match
+        Returns: number of candles that changed the buffer
+        """
+        data = self._get_kline_rows(symbol, interval, limit, start, end)
+        
+        changed = 0
+        for candle in reversed(data):  # Reverse because API returns newest first
+            if buffer.push(candle):
+                changed += 1
+        
+        return changed
+    
     def get_position(self, symbol: str) -> Dict:
         """Get current position"""
         endpoint = "/v5/position/list"
@@ -173,6 +886,35 @@ class BybitClientLite:
         positions = response.get('result', {}).get('list', [])
         return positions[0] if positions else {}
     
+    def get_all_positions(self, settle_coin: str = 'USDT') -> Optional[List[Dict]]:
+        """Get every linear position settled in settle_coin, following cursors (None on failure)"""
+        endpoint = "/v5/position/list"
+        positions = []
+        cursor = None
+        
+        for _ in range(self.MAX_POSITION_PAGES):
+            params = {
+                'category': 'linear',
+                'settleCoin': settle_coin,
+                'limit': 200
+            }
+            if cursor:
+                params['cursor'] = cursor
+            
+            response = self._request_v5('GET', endpoint, params, signed=True)
+            
+            if response.get('retCode') != 0:
+                return None
+            
+            result = response.get('result', {})
+            positions.extend(result.get('list', []))
+            cursor = result.get('nextPageCursor')
+            if not cursor:
+                return positions
+        
+        logger.warning(f"Position list still paging after {self.MAX_POSITION_PAGES} pages")
+        return positions
+    
     def set_position_mode(self, mode: int = 0) -> bool:
         """
         Set position mode
@@ -186,7 +928,8 @@ class BybitClientLite:
             'mode': mode
         }
         
-        response = self._request_v5('POST', endpoint, params, signed=True)
+        response = self.retry['position'].run(
+            lambda: self._request_v5('POST', endpoint, params, signed=True), "set_position_mode")
         
         if response.get('retCode') == 0:
             mode_name = "One-Way Mode" if mode == 0 else "Hedge Mode"
@@ -200,42 +943,53 @@ class BybitClientLite:
             return False
     
     def set_leverage(self, symbol: str, leverage: int) -> bool:
-        """Set leverage for One-Way Mode with automatic fallback"""
-        max_attempts = 5
+        """
+        Set leverage for One-Way Mode with automatic fallback
+        Transient errors are retried by the 'position' policy; on insufficient
+        margin the leverage is halved until it fits. All steps share the
+        policy's one deadline.
+        """
         current_leverage = leverage
         
-        for attempt in range(max_attempts):
-            endpoint = "/v5/position/set-leverage"
-            params = {
-                'category': 'linear',
-                'symbol': symbol,
-                'buyLeverage': str(current_leverage),
-                'sellLeverage': str(current_leverage),
-                'positionIdx': 0  # 0 = One-Way Mode
-            }
-            
-            response = self._request_v5('POST', endpoint, params, signed=True)
-            
-            if response.get('retCode') == 0:
-                logger.info(f"✅ Leverage set to {current_leverage}x for {symbol}")
-                return True
-            elif response.get('retCode') == 110043:
-                logger.debug(f"Leverage already set for {symbol}")
-                return True
-            elif response.get('retCode') == 110012:  # Not enough for new leverage
-                if current_leverage > 1:
-                    current_leverage = max(1, current_leverage // 2)
-                    logger.warning(f"⚠️ Insufficient margin for {leverage}x leverage on {symbol}, trying {current_leverage}x")
-                    continue
+        with budget(self.retry['position'].deadline):
+            while True:
+                endpoint = "/v5/position/set-leverage"
+                params = {
+                    'category': 'linear',
+                    'symbol': symbol,
+                    'buyLeverage': str(current_leverage),
+                    'sellLeverage': str(current_leverage),
+                    'positionIdx': 0  # 0 = One-Way Mode
+                }
+                
+                response = self.retry['position'].run(
+                    lambda: self._request_v5('POST', endpoint, params, signed=True), f"set_leverage {symbol}")
+                
+                if response.get('retCode') == 0:
+                    logger.info(f"✅ Leverage set to {current_leverage}x for {symbol}")
+                    return True
+                elif response.get('retCode') == 110043:
+                    logger.debug(f"Leverage already set for {symbol}")
+                    return True
+                elif response.get('retCode') == 110012:  # Not enough for new leverage
+                    if current_leverage > 1:
+                        current_leverage = max(1, current_leverage // 2)
+                        logger.warning(f"⚠️ Insufficient margin for {leverage}x leverage on {symbol}, trying {current_leverage}x")
+                        continue
+                    else:
+                        logger.error(f"❌ Failed to set leverage: Even 1x leverage not supported for {symbol}")
+                        return False
                 else:
-                    logger.error(f"❌ Failed to set leverage: Even 1x leverage not supported for {symbol}")
+                    logger.error(f"❌ Failed to set leverage: {response.get('retMsg')} (Code: {response.get('retCode')})")
                     return False
-            else:
-                logger.error(f"❌ Failed to set leverage: {response.get('retMsg')} (Code: {response.get('retCode')})")
-                return False
-        
-        logger.error(f"❌ Failed to set leverage after {max_attempts} attempts for {symbol}")
-        return False
+    
+    def _tpsl_rejected(self, response: Dict) -> bool:
+        """True if a create-order response rejected the attached SL/TP"""
+        ret_code = response.get('retCode')
+        if ret_code in self.TPSL_REJECT_CODES:
+            return True
+        message = str(response.get('retMsg', '')).lower().replace(' ', '')
+        return ret_code == 10001 and any(word in message for word in self.TPSL_PARAM_WORDS)
     
     def place_order(
         self,
@@ -245,10 +999,20 @@ class BybitClientLite:
         order_type: str = 'Market',
         reduce_only: bool = False,
         stop_loss: float = None,
-        take_profit: float = None
+        take_profit: float = None,
+        tpsl_trigger_by: str = 'LastPrice',
+        tpsl_mode: str = 'Full'
     ) -> Dict:
-        """Place order and set SL/TP separately"""
-        endpoint = "/v5/order/create"
+        """
+        Place order with SL/TP attached
+        
+        The position is protected as soon as the order is accepted. If the
+        exchange rejects the order with SL/TP attached, it is placed without
+        them and SL/TP is set with the trading-stop call instead.
+        
+        Returns: the create response, plus 'latency_ms' {'order', 'protected'}
+        on success ('protected' is None if SL/TP could not be set)
+        """
         params = {
             'category': 'linear',
             'symbol': symbol,
@@ -257,27 +1021,179 @@ class BybitClientLite:
             'qty': str(qty),
             'timeInForce': 'GTC',
             'positionIdx': 0,  # 0 = One-Way Mode
-            'reduceOnly': reduce_only
+            'reduceOnly': reduce_only,
+            # Makes resends safe: a duplicate is rejected with 110072
+            'orderLinkId': uuid.uuid4().hex
         }
         
-        # NOTE: Do NOT add stopLoss/takeProfit here for market orders
-        # Bybit doesn't support SL/TP in market order creation
-        # We'll set them separately using set_trading_stop
+        protect = bool(stop_loss or take_profit)
+        if protect:
+            params['tpslMode'] = tpsl_mode
+            if stop_loss:
+                params['stopLoss'] = str(self.instruments.round_price(symbol, stop_loss))
+                params['slTriggerBy'] = tpsl_trigger_by
+            if take_profit:
+                params['takeProfit'] = str(self.instruments.round_price(symbol, take_profit))
+                params['tpTriggerBy'] = tpsl_trigger_by
+        
+        stream = self._live_private_stream()
+        seq = stream.position_seq.get(symbol, 0) if stream else None
         
-        response = self._request_v5('POST', endpoint, params, signed=True)
+        start = time.monotonic()
+        response = self._create_order(params)
+        attached = protect
+        
+        if protect and self._tpsl_rejected(response):
+            logger.warning(f"⚠️ Order with SL/TP rejected ({response.get('retMsg')}), placing it without SL/TP")
+            for key in ('tpslMode', 'stopLoss', 'slTriggerBy', 'takeProfit', 'tpTriggerBy'):
+                params.pop(key, None)
+            params['orderLinkId'] = uuid.uuid4().hex
+            response = self._create_order(params)
+            attached = False
         
         if response.get('retCode') == 0:
+            order_ms = (time.monotonic() - start) * 1000
             logger.info(f"✅ Order placed: {side} {qty} {symbol}")
+            if attached:
+                if stop_loss:
+                    logger.info(f"  ⛔ SL attached: ${stop_loss:.4f}")
+                if take_profit:
+                    logger.info(f"  🎯 TP attached: ${take_profit:.4f}")
+            
+            if stream:
+                # Return once the fill has reached the position book
+                if not stream.wait_for_position(symbol, seq, timeout=self.FILL_TIMEOUT):
+                    logger.warning(f"⚠️ No position update for {symbol} after {self.FILL_TIMEOUT}s")
+            
+            protected_ms = order_ms
+            if protect and not attached:
+                # Fallback: trading-stop endpoint (retried until the position is visible)
+                if self.set_trading_stop(symbol, stop_loss, take_profit):
+                    protected_ms = (time.monotonic() - start) * 1000
+                else:
+                    protected_ms = None
             
-            # Now set SL/TP using trading-stop endpoint
-            if stop_loss or take_profit:
-                time.sleep(0.5)  # Small delay to ensure position is open
-                self.set_trading_stop(symbol, stop_loss, take_profit)
+            response['latency_ms'] = {'order': order_ms, 'protected': protected_ms if protect else None}
+            if protect and protected_ms is not None:
+                logger.info(f"⏱️ {symbol} order accepted in {order_ms:.0f} ms, protected after {protected_ms:.0f} ms")
+            else:
+                logger.info(f"⏱️ {symbol} order accepted in {order_ms:.0f} ms")
         else:
             logger.error(f"❌ Order failed: {response.get('retMsg')}")
+            if response.get('retCode') in self.INSTRUMENT_REJECT_CODES:
+                self.instruments.invalidate()
+        
+        return response
+    
+    def _create_order(self, params: Dict) -> Dict:
+        """Send /v5/order/create under the 'order' retry policy"""
+        response = self.retry['order'].run(
+            lambda: self._request_v5('POST', "/v5/order/create", params, signed=True),
+            f"place_order {params['symbol']}")
+        
+        if response.get('retCode') == 110072:
+            # An earlier attempt reached Bybit although its response was lost
+            logger.warning(f"⚠️ Order {params['orderLinkId']} was already placed by an earlier attempt")
+            response = {'retCode': 0, 'retMsg': 'OK', 'result': {'orderLinkId': params['orderLinkId']}}
         
         return response
     
+    def place_orders(self, orders: List[Dict]) -> List[Dict]:
+        """
+        Place several orders with /v5/order/create-batch (BATCH_LIMIT per request)
+        orders: [{'symbol', 'side', 'qty', 'order_type': 'Market', 'reduce_only': False}]
+        Returns: one {'symbol', 'retCode', 'retMsg', 'orderId', 'orderLinkId'} per order, in order
+        """
+        items = [{
+            'symbol': order['symbol'],
+            'side': order['side'],
+            'orderType': order.get('order_type', 'Market'),
+            'qty': str(order['qty']),
+            'timeInForce': 'GTC',
+            'positionIdx': 0,  # 0 = One-Way Mode
+            'reduceOnly': order.get('reduce_only', False),
+            'orderLinkId': uuid.uuid4().hex
+        } for order in orders]
+        
+        stream = self._live_private_stream()
+        seqs = {item['symbol']: stream.position_seq.get(item['symbol'], 0) for item in items} if stream else {}
+        
+        results = []
+        for i in range(0, len(items), self.BATCH_LIMIT):
+            results += self._send_batch("/v5/order/create-batch", items[i:i + self.BATCH_LIMIT], "place_orders")
+        
+        for result in results:
+            if result['retCode'] == 110072:
+                # Placed by an earlier attempt whose response was lost
+                result['retCode'], result['retMsg'] = 0, 'OK'
+            if result['retCode'] == 0:
+                logger.info(f"✅ Order placed: {result['symbol']} ({result['orderLinkId']})")
+            else:
+                logger.error(f"❌ Order failed: {result['symbol']}: {result['retMsg']} (Code: {result['retCode']})")
+        
+        if stream:
+            # Return once every fill has reached the position book
+            deadline = time.monotonic() + self.FILL_TIMEOUT
+            for result in results:
+                if result['retCode'] == 0:
+                    symbol = result['symbol']
+                    stream.wait_for_position(symbol, seqs[symbol], timeout=max(0.0, deadline - time.monotonic()))
+        
+        return results
+    
+    def cancel_orders(self, orders: List[Dict]) -> List[Dict]:
+        """
+        Cancel several orders with /v5/order/cancel-batch (BATCH_LIMIT per request)
+        orders: [{'symbol', 'order_id'} or {'symbol', 'order_link_id'}]
+        Returns: one {'symbol', 'retCode', 'retMsg', 'orderId', 'orderLinkId'} per order, in order
+        """
+        items = []
+        for order in orders:
+            item = {'symbol': order['symbol']}
+            if order.get('order_id'):
+                item['orderId'] = order['order_id']
+            else:
+                item['orderLinkId'] = order['order_link_id']
+            items.append(item)
+        
+        results = []
+        for i in range(0, len(items), self.BATCH_LIMIT):
+            results += self._send_batch("/v5/order/cancel-batch", items[i:i + self.BATCH_LIMIT], "cancel_orders")
+        return results
+    
+    def _send_batch(self, endpoint: str, items: List[Dict], description: str) -> List[Dict]:
+        """One batch request; per-order results come from result.list and retExtInfo.list"""
+        params = {
+            'category': 'linear',
+            'request': items
+        }
+        response = self.retry['order'].run(
+            lambda: self._request_v5('POST', endpoint, params, signed=True), description)
+        
+        if response.get('retCode') != 0:
+            return [{
+                'symbol': item['symbol'],
+                'retCode': response.get('retCode'),
+                'retMsg': response.get('retMsg'),
+                'orderId': item.get('orderId'),
+                'orderLinkId': item.get('orderLinkId')
+            } for item in items]
+        
+        listed = response.get('result', {}).get('list', [])
+        infos = (response.get('retExtInfo') or {}).get('list', [])
+        results = []
+        for k, item in enumerate(items):
+            entry = listed[k] if k < len(listed) else {}
+            info = infos[k] if k < len(infos) else {}
+            results.append({
+                'symbol': item['symbol'],
+                'retCode': info.get('code', 0),
+                'retMsg': info.get('msg', 'OK'),
+                'orderId': entry.get('orderId') or item.get('orderId'),
+                'orderLinkId': entry.get('orderLinkId') or item.get('orderLinkId')
+            })
+        return results
+    
     def set_trading_stop(self, symbol: str, stop_loss: float = None, take_profit: float = None) -> bool:
         """Set stop loss and take profit for an open position"""
         if not stop_loss and not take_profit:
@@ -292,22 +1208,33 @@ class BybitClientLite:
         }
         
         if stop_loss:
-            params['stopLoss'] = str(round(stop_loss, 4))
+            params['stopLoss'] = str(self.instruments.round_price(symbol, stop_loss))
             logger.info(f"  ⛔ SL set: ${stop_loss:.4f}")
         
         if take_profit:
-            params['takeProfit'] = str(round(take_profit, 4))
+            params['takeProfit'] = str(self.instruments.round_price(symbol, take_profit))
             logger.info(f"  🎯 TP set: ${take_profit:.4f}")
         
-        response = self._request_v5('POST', endpoint, params, signed=True)
+        # 110001 (position not visible yet) is retried with backoff; with a
+        # live private stream the wait ends early on a position update that
+        # arrived after the failed attempt was sent
+        stream = self._live_private_stream()
+        seen = {}
+        
+        def call():
+            if stream:
+                seen['seq'] = stream.position_seq.get(symbol, 0)
+            return self._request_v5('POST', endpoint, params, signed=True)
+        
+        wait = None
+        if stream:
+            wait = lambda delay: stream.wait_for_position(symbol, seen['seq'], timeout=delay)
+        
+        response = self.retry['trading_stop'].run(call, f"set_trading_stop {symbol}", wait)
         
         if response.get('retCode') == 0:
             logger.info(f"✅ SL/TP configured successfully for {symbol}")
             return True
-        elif response.get('retCode') == 110001:  # Position not exist
-            logger.warning(f"⚠️ Position not yet available, retrying in 2 seconds...")
-            time.sleep(2)
-            return self.set_trading_stop(symbol, stop_loss, take_profit)
         else:
             logger.error(f"❌ Failed to set SL/TP: {response.get('retMsg')} (Code: {response.get('retCode')})")
             return False
@@ -337,7 +1264,11 @@ class BybitClientLite:
         )
     
     def get_ticker(self, symbol: str) -> Dict:
-        """Get ticker"""
+        """Get ticker (from the all-symbol snapshot, single request as fallback)"""
+        ticker = self.tickers.get(symbol)
+        if ticker is not None:
+            return ticker
+        
         endpoint = "/v5/market/tickers"
         params = {
             'category': 'linear',
@@ -352,6 +1283,20 @@ class BybitClientLite:
         tickers = response.get('result', {}).get('list', [])
         return tickers[0] if tickers else {}
     
+    def get_all_tickers(self) -> Optional[List[Dict]]:
+        """Get tickers for every linear symbol in one request (None on failure)"""
+        endpoint = "/v5/market/tickers"
+        params = {
+            'category': 'linear'
+        }
+        
+        response = self._request_v5('GET', endpoint, params)
+        
+        if response.get('retCode') != 0:
+            return None
+        
+        return response.get('result', {}).get('list', [])
+    
     def get_instrument_info(self, symbol: str) -> Dict:
         """Get instrument info"""
         endpoint = "/v5/market/instruments-info"
@@ -368,41 +1313,51 @@ class BybitClientLite:
         instruments = response.get('result', {}).get('list', [])
         return instruments[0] if instruments else {}
     
+    def get_all_instruments(self) -> Optional[List[Dict]]:
+        """Get every linear instrument, following cursors (None on failure)"""
+        endpoint = "/v5/market/instruments-info"
+        instruments = []
+        cursor = None
+        
+        for _ in range(self.MAX_INSTRUMENT_PAGES):
+            params = {
+                'category': 'linear',
+                'limit': 1000
+            }
+            if cursor:
+                params['cursor'] = unquote(cursor)  # requests encodes it again
+            
+            response = self._request_v5('GET', endpoint, params)
+            
+            if response.get('retCode') != 0:
+                return None
+            
+            result = response.get('result', {})
+            instruments.extend(result.get('list', []))
+            cursor = result.get('nextPageCursor')
+            if not cursor:
+                return instruments
+        
+        logger.warning(f"Instrument list still paging after {self.MAX_INSTRUMENT_PAGES} pages")
+        return instruments
+    
     def get_max_leverage(self, symbol: str) -> int:
-        """Get maximum leverage for a symbol"""
-        instrument = self.get_instrument_info(symbol)
-        if not instrument:
+        """Get maximum leverage for a symbol (from the instrument registry)"""
+        spec = self.instruments.get(symbol)
+        if not spec:
             return 10  # Default fallback
-        
-        leverage_filter = instrument.get('leverageFilter', {})
-        max_leverage = leverage_filter.get('maxLeverage', '10')
-        return int(float(max_leverage))
+        return spec['max_leverage']
     
     def calculate_qty(self, symbol: str, usd_amount: float, leverage: int = 1) -> float:
-        """Calculate order quantity"""
+        """Calculate order quantity from the cached instrument spec and ticker snapshot"""
         ticker = self.get_ticker(symbol)
-        instrument = self.get_instrument_info(symbol)
+        spec = self.instruments.get(symbol)
         
-        if not ticker or not instrument:
+        if not ticker or not spec:
             return 0
         
         price = float(ticker.get('lastPrice', 0))
-        
-        if price == 0:
-            return 0
-        
-        lot_size = instrument.get('lotSizeFilter', {})
-        min_qty = float(lot_size.get('minOrderQty', 0.001))
-        qty_step = float(lot_size.get('qtyStep', 0.001))
-        
-        raw_qty = (usd_amount * leverage) / price
-        qty = round(raw_qty / qty_step) * qty_step
-        qty = max(qty, min_qty)
-        
-        decimals = len(str(qty_step).split('.')[-1]) if '.' in str(qty_step) else 0
-        qty = round(qty, decimals)
-        
-        return qty
+        return order_qty(spec, price, usd_amount, leverage)
     
     def get_wallet_balance(self) -> Dict:
         """Get wallet balance"""
@@ -0,0 +1,451 @@
+"""
+Lightweight Bybit V5 WebSocket streams - No extra dependencies
+Reconnecting public market-data feed and authenticated account stream,
+each on a background thread
+"""
+
+import hmac
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, deque
+
+from websocket_lite import WebSocket
+from candle_buffer_lite import CandleBuffer
+from bybit_client_lite import interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_MAINNET_URL = "wss://stream.bybit.com/v5/public/linear"
+PUBLIC_TESTNET_URL = "wss://stream-testnet.bybit.com/v5/public/linear"
+PRIVATE_MAINNET_URL = "wss://stream.bybit.com/v5/private"
+PRIVATE_TESTNET_URL = "wss://stream-testnet.bybit.com/v5/private"
+
+# Order states that will not change any more
+FINAL_ORDER_STATUSES = ('Filled', 'Cancelled', 'Rejected', 'PartiallyFilledCanceled', 'Deactivated')
+
+MAX_KLINE_LIMIT = 1000
+
+
+class BybitStream:
+    """
+    Bybit V5 stream connection with heartbeat, reconnect and resubscribe
+
+    Runs on a daemon thread. Every (re)connect calls on_open() (auth for
+    private streams), subscribes every topic again and then calls
+    on_connected() so subclasses can backfill what they missed. A ping goes
+    out every ping_interval seconds; if nothing at all arrives for twice that
+    long the connection is dropped and rebuilt with exponential backoff.
+    Subclasses handle pushes in handle(message).
+    """
+
+    SUBSCRIBE_BATCH = 10  # topics per subscribe request
+
+    def __init__(self, url, topics=(), ping_interval=20.0, reconnect_delay=1.0,
+                 max_reconnect_delay=30.0, record_file=None, verify=False):
+        """
+        Args:
+            url: Stream URL (a local ReplayServer url works too)
+            topics: Topics to subscribe on every connect
+            ping_interval: Seconds between heartbeats
+            reconnect_delay: First reconnect delay, doubled up to max_reconnect_delay
+            record_file: Append every received message to this file (replayable)
+            verify: Verify TLS certificates (off like the REST session)
+        """
+        self.url = url
+        self.topics = list(topics)
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.record_file = record_file
+        self.verify = verify
+        self.connected = threading.Event()
+        self.last_message = None    # monotonic time of the last received message
+        self.reconnects = 0
+        self._ws = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Connect on a background thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def is_healthy(self) -> bool:
+        """Connected and heard from within the heartbeat window"""
+        return (self.connected.is_set() and self.last_message is not None
+                and time.monotonic() - self.last_message <= self.ping_interval * 2)
+
+    def send(self, op, args=None):
+        """Send one op request on the current connection"""
+        request = {'req_id': uuid.uuid4().hex[:16], 'op': op}
+        if args is not None:
+            request['args'] = args
+        self._ws.send_text(json.dumps(request))
+
+    def subscribe(self, topics):
+        """Add topics (sent now if connected, and again on every reconnect)"""
+        topics = [t for t in topics if t not in self.topics]
+        self.topics.extend(topics)
+        if self.connected.is_set() and topics:
+            self._subscribe(topics)
+
+    def _subscribe(self, topics):
+        for i in range(0, len(topics), self.SUBSCRIBE_BATCH):
+            self.send('subscribe', topics[i:i + self.SUBSCRIBE_BATCH])
+
+    def on_open(self):
+        """Called after each connect, before subscribing"""
+
+    def on_connected(self):
+        """Called after each (re)subscribe, before pushes are processed"""
+
+    def handle(self, message):
+        """Handle one topic push"""
+
+    def handle_op(self, message):
+        """Handle an op response (subscribe, ping, auth)"""
+        if message.get('success') is False:
+            logger.error(f"❌ Stream {message.get('op')} failed: {message.get('ret_msg')}")
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                self._ws = WebSocket.connect(self.url, verify=self.verify)
+                self.last_message = time.monotonic()
+                self.on_open()
+                self._subscribe(self.topics)
+                self.on_connected()
+                self.connected.set()
+                logger.info(f"✅ Stream connected: {self.url}")
+                delay = self.reconnect_delay
+                self._read_loop()
+            except (OSError, ConnectionError, ValueError) as e:
+                if not self._stop.is_set():
+                    logger.warning(f"⚠️ Stream error ({self.url}): {e}")
+            finally:
+                self.connected.clear()
+                if self._ws is not None:
+                    self._ws.close()
+                    self._ws = None
+
+            if self._stop.wait(delay):
+                break
+            self.reconnects += 1
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _read_loop(self):
+        ws = self._ws
+        last_ping = time.monotonic()
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now - last_ping >= self.ping_interval:
+                self.send('ping')
+                last_ping = now
+            if now - self.last_message > self.ping_interval * 2:
+                raise ConnectionError("heartbeat timeout")
+
+            raw = ws.recv(timeout=min(1.0, last_ping + self.ping_interval - now))
+            if raw is None:
+                continue
+            self.last_message = time.monotonic()
+            if self.record_file:
+                with open(self.record_file, 'a') as f:
+                    f.write(raw + '\n')
+
+            message = json.loads(raw)
+            try:
+                if 'topic' in message:
+                    self.handle(message)
+                elif 'op' in message:
+                    self.handle_op(message)
+            except Exception as e:
+                logger.error(f"Stream handler error: {e}")
+
+
+class MarketDataStream(BybitStream):
+    """
+    Public kline and ticker feed into per-symbol candle buffers
+
+    Subscribes kline.{interval}.{symbol} and tickers.{symbol}. Each symbol's
+    CandleBuffer is backfilled over REST on every (re)connect, only for the
+    bars missed while disconnected, then kept current by kline pushes: the
+    forming bar is overwritten in place and a confirmed bar wakes up
+    wait_for_close(). last_closed() tells a just-confirmed newest bar apart
+    from a forming one, so it can be evaluated right away. Ticker snapshots/deltas are merged and pushed into the
+    REST client's ticker snapshot, so get_ticker stops polling.
+    """
+
+    def __init__(self, client, symbols, interval, history=200, testnet=True, url=None, **kwargs):
+        """
+        Args:
+            client: BybitClientLite used for backfills and to receive tickers
+            symbols: Symbols to stream
+            interval: Kline interval ('1', '60', 'D', ...)
+            history: Candles kept per symbol
+            testnet: Pick the testnet stream when url is not given
+        """
+        self.client = client
+        self.symbols = list(symbols)
+        self.interval = str(interval)
+        self.interval_ms = interval_to_ms(self.interval)
+        self.history = history
+        self.buffers = {symbol: CandleBuffer(capacity=history) for symbol in self.symbols}
+        self.tickers = {}
+        self.backfilled = set()
+        self.confirmed = {}     # symbol -> timestamp of the newest confirmed bar
+        self._lock = threading.Lock()
+        self._closed = set()
+        self._closed_event = threading.Event()
+
+        topics = [f"kline.{self.interval}.{s}" for s in self.symbols] + [f"tickers.{s}" for s in self.symbols]
+        url = url or (PUBLIC_TESTNET_URL if testnet else PUBLIC_MAINNET_URL)
+        super().__init__(url, topics, **kwargs)
+
+    def on_connected(self):
+        """
+        Backfill every buffer over REST for the bars missed while disconnected
+
+        Candles are fetched into a scratch buffer without holding the lock, then
+        swapped in (full reload) or merged. The newest REST row is the forming
+        bar: it stays unconfirmed until its confirm push arrives.
+        """
+        self.backfilled.clear()
+        for symbol in self.symbols:
+            with self._lock:
+                last = self.buffers[symbol].last_timestamp
+            limit = self.history
+            if last is not None and self.interval_ms:
+                missing = (int(time.time() * 1000) - last) // self.interval_ms + 1
+                if missing < min(self.history, MAX_KLINE_LIMIT):
+                    limit = missing + 1
+            fetched = CandleBuffer(capacity=limit)
+            self.client.fetch_klines_into(fetched, symbol, self.interval, limit=limit)
+            with self._lock:
+                if limit == self.history:
+                    self.buffers[symbol] = fetched
+                else:
+                    self.buffers[symbol].extend(fetched)
+                size = len(self.buffers[symbol])
+            if size:
+                self.backfilled.add(symbol)
+            logger.debug(f"{symbol}: backfilled {len(fetched)} candles")
+
+    def handle(self, message):
+        topic = message['topic']
+        kind, _, rest = topic.partition('.')
+        if kind == 'kline':
+            symbol = rest.rpartition('.')[2]
+            self._handle_kline(symbol, message.get('data', []))
+        elif kind == 'tickers':
+            self._handle_ticker(rest, message.get('type'), message.get('data', {}))
+
+    def _handle_kline(self, symbol, bars):
+        if symbol not in self.buffers:
+            return
+        closed = False
+        with self._lock:
+            buffer = self.buffers[symbol]
+            for bar in bars:
+                start = int(bar['start'])
+                buffer.push([start, float(bar['open']), float(bar['high']),
+                             float(bar['low']), float(bar['close']), float(bar['volume'])])
+                if bar.get('confirm'):
+                    self.confirmed[symbol] = max(start, self.confirmed.get(symbol, start))
+                    closed = True
+            if closed:
+                self._closed.add(symbol)
+        if closed:
+            self._closed_event.set()
+
+    def _handle_ticker(self, symbol, kind, data):
+        if kind == 'snapshot' or symbol not in self.tickers:
+            ticker = dict(data)
+        else:
+            ticker = self.tickers[symbol]
+            ticker.update(data)
+        self.tickers[symbol] = ticker
+        self.client.tickers.apply(dict(ticker))
+
+    def is_live(self, symbol) -> bool:
+        """True when the symbol's buffer is backfilled and the stream is healthy"""
+        return symbol in self.backfilled and self.is_healthy()
+
+    def candles(self, symbol, since=None):
+        """
+        Copy of the symbol's candles, oldest first (see last_closed for the newest)
+
+        Args:
+            since: Only candles with timestamp >= since
+        """
+        with self._lock:
+            buffer = self.buffers[symbol]
+            start = bisect_left(buffer.timestamps, since) if since is not None else 0
+            return [buffer[i] for i in range(start, len(buffer))]
+
+    def last_closed(self, symbol):
+        """
+        Timestamp of the newest closed candle, None when unknown
+
+        Every bar but the newest one is closed; the newest one is closed once
+        its confirm push has been seen.
+        """
+        with self._lock:
+            buffer = self.buffers[symbol]
+            if not len(buffer):
+                return None
+            last = buffer.last_timestamp
+            if self.confirmed.get(symbol, -1) >= last:
+                return last
+            return buffer.timestamps[-2] if len(buffer) > 1 else None
+
+    def wait_for_close(self, timeout=None):
+        """
+        Wait until a candle closes on any symbol
+
+        Returns:
+            set of symbols that closed a candle since the last call (empty on timeout)
+        """
+        self._closed_event.wait(timeout)
+        with self._lock:
+            closed, self._closed = self._closed, set()
+            self._closed_event.clear()
+        return closed
+
+
+class PrivateStream(BybitStream):
+    """
+    Authenticated position, order, execution and wallet stream
+
+    Keeps the client's PositionBook and the wallet balance current from
+    pushes; both are reloaded over REST on every (re)connect to cover what
+    was missed. Order code can block on wait_for_order() or
+    wait_for_position() instead of sleeping until the exchange catches up.
+    """
+
+    AUTH_EXPIRY_MS = 10000
+    ORDER_HISTORY = 500
+
+    def __init__(self, client, testnet=True, url=None, **kwargs):
+        """
+        Args:
+            client: BybitClientLite whose keys, clock and position book are used
+            testnet: Pick the testnet stream when url is not given
+        """
+        self.client = client
+        self.balances = {}              # coin -> wallet dict from the wallet topic
+        self.orders = OrderedDict()     # orderId -> latest order update
+        self.executions = deque(maxlen=self.ORDER_HISTORY)
+        self.position_seq = {}          # symbol -> number of position updates seen
+        self._cond = threading.Condition()
+
+        url = url or (PRIVATE_TESTNET_URL if testnet else PRIVATE_MAINNET_URL)
+        super().__init__(url, ['position', 'order', 'execution', 'wallet'], **kwargs)
+
+    def on_open(self):
+        """Authenticate before subscribing"""
+        expires = self.client.clock.now() + self.AUTH_EXPIRY_MS
+        signature = hmac.new(
+            self.client.api_secret.encode('utf-8'),
+            f"GET/realtime{expires}".encode('utf-8'),
+            hashlib.sha256
+        ).hexdigest()
+        self.send('auth', [self.client.api_key, expires, signature])
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            raw = self._ws.recv(timeout=max(0.0, deadline - time.monotonic()))
+            if raw is None:
+                break
+            message = json.loads(raw)
+            if message.get('op') == 'auth':
+                if not message.get('success'):
+                    raise ConnectionError(f"auth failed: {message.get('ret_msg')}")
+                return
+        raise ConnectionError("auth timed out")
+
+    def on_connected(self):
+        """Reload positions and wallet over REST for updates missed while disconnected"""
+        self.client.positions.refresh()
+        wallet = self.client.get_wallet_balance()
+        for account in wallet.get('list', []):
+            for coin in account.get('coin', []):
+                self.balances[coin.get('coin')] = coin
+        with self._cond:
+            self._cond.notify_all()
+
+    def handle(self, message):
+        topic = message['topic']
+        data = message.get('data', [])
+        with self._cond:
+            if topic == 'position':
+                for position in data:
+                    if position.get('category', 'linear') != 'linear':
+                        continue
+                    self.client.positions.apply(position)
+                    symbol = position.get('symbol')
+                    self.position_seq[symbol] = self.position_seq.get(symbol, 0) + 1
+            elif topic == 'order':
+                for order in data:
+                    self.orders[order.get('orderId')] = order
+                    self.orders.move_to_end(order.get('orderId'))
+                while len(self.orders) > self.ORDER_HISTORY:
+                    self.orders.popitem(last=False)
+            elif topic == 'execution':
+                self.executions.extend(data)
+            elif topic == 'wallet':
+                for account in data:
+                    for coin in account.get('coin', []):
+                        self.balances[coin.get('coin')] = coin
+            self._cond.notify_all()
+
+    def balance(self, coin='USDT'):
+        """Wallet balance of coin, None if not known"""
+        wallet = self.balances.get(coin)
+        if not wallet:
+            return None
+        try:
+            return float(wallet.get('walletBalance') or 0)
+        except (TypeError, ValueError):
+            return None
+
+    def wait_for_order(self, order_id, timeout=5.0):
+        """
+        Wait for an order to reach a final status
+
+        Returns:
+            the final order update, or None on timeout
+        """
+        def final():
+            order = self.orders.get(order_id)
+            return order if order and order.get('orderStatus') in FINAL_ORDER_STATUSES else None
+
+        with self._cond:
+            self._cond.wait_for(final, timeout)
+            return final()
+
+    def wait_for_position(self, symbol, seq, timeout=5.0):
+        """
+        Wait until a position update for symbol arrives after position_seq[symbol] == seq
+
+        Returns:
+            True if one arrived within timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self.position_seq.get(symbol, 0) > seq, timeout)
@@ -0,0 +1,162 @@
+"""
+Lightweight columnar candle storage - No pandas required
+Fixed-capacity per-symbol buffer backed by array columns
+"""
+
+from array import array
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+class CandleBuffer:
+    """
+    Fixed-capacity candle buffer with one array per column
+
+    Keeps the newest `capacity` candles, oldest first. Appending a new bar or
+    overwriting the forming one is O(1) and allocates nothing. Storage has
+    some slack past the capacity: when the write position reaches the end, the
+    live window is moved back to the front in one copy. That keeps every
+    column contiguous, so column views are zero-copy memoryviews that ema,
+    smooth_range, range_filter, calculate_signal_series and calculate_signals
+    accept directly.
+
+    Views are only valid until the next append/push; take them right before
+    computing.
+    """
+
+    def __init__(self, capacity=1000, slack=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._size = capacity + (slack if slack is not None else max(1, capacity // 2))
+        self._timestamp = array('q', bytes(8 * self._size))
+        self._open = array('d', bytes(8 * self._size))
+        self._high = array('d', bytes(8 * self._size))
+        self._low = array('d', bytes(8 * self._size))
+        self._close = array('d', bytes(8 * self._size))
+        self._volume = array('d', bytes(8 * self._size))
+        self._arrays = (self._timestamp, self._open, self._high, self._low, self._close, self._volume)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __getitem__(self, index):
+        """Candle as [timestamp, open, high, low, close, volume] (copies one row)"""
+        n = self._end - self._start
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("candle index out of range")
+        i = self._start + index
+        return [self._timestamp[i], self._open[i], self._high[i],
+                self._low[i], self._close[i], self._volume[i]]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def _write(self, i, candle):
+        self._timestamp[i] = int(candle[0])
+        self._open[i] = float(candle[1])
+        self._high[i] = float(candle[2])
+        self._low[i] = float(candle[3])
+        self._close[i] = float(candle[4])
+        self._volume[i] = float(candle[5])
+
+    def _compact(self):
+        """Move the live window to the front of the storage"""
+        n = self._end - self._start
+        for column in self._arrays:
+            view = memoryview(column)
+            view[0:n] = view[self._start:self._end]
+        self._start = 0
+        self._end = n
+
+    def append(self, candle):
+        """Add a new bar, dropping the oldest one once at capacity"""
+        if self._end == self._size:
+            self._compact()
+        self._write(self._end, candle)
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+
+    def update_last(self, candle):
+        """Overwrite the newest (forming) bar in place"""
+        if self._end == self._start:
+            raise IndexError("update_last on an empty buffer")
+        self._write(self._end - 1, candle)
+
+    def push(self, candle):
+        """
+        Append or overwrite by timestamp
+
+        Same timestamp as the newest bar overwrites it (forming candle update),
+        a newer timestamp appends, an older one is ignored.
+
+        Returns:
+            True if the buffer changed
+        """
+        timestamp = int(candle[0])
+        if self._end > self._start:
+            last = self._timestamp[self._end - 1]
+            if timestamp == last:
+                self._write(self._end - 1, candle)
+                return True
+            if timestamp < last:
+                return False
+        self.append(candle)
+        return True
+
+    def extend(self, candles):
+        """push() every candle, oldest first"""
+        for candle in candles:
+            self.push(candle)
+
+    def clear(self):
+        self._start = 0
+        self._end = 0
+
+    @property
+    def last_timestamp(self):
+        """Timestamp of the newest bar, None when empty"""
+        return self._timestamp[self._end - 1] if self._end > self._start else None
+
+    def column(self, name):
+        """Zero-copy memoryview of one column, oldest first"""
+        column = self._arrays[COLUMNS.index(name)]
+        return memoryview(column)[self._start:self._end]
+
+    @property
+    def timestamps(self):
+        return self.column('timestamp')
+
+    @property
+    def opens(self):
+        return self.column('open')
+
+    @property
+    def highs(self):
+        return self.column('high')
+
+    @property
+    def lows(self):
+        return self.column('low')
+
+    @property
+    def closes(self):
+        return self.column('close')
+
+    @property
+    def volumes(self):
+        return self.column('volume')
+
+    def columns(self):
+        """All columns as zero-copy views, in the dict format backtest_lite uses"""
+        return {name: self.column(name) for name in COLUMNS}
+
+    def to_list(self):
+        """Copy out as [[timestamp, open, high, low, close, volume], ...]"""
+        return list(self)
@@ -0,0 +1,748 @@
+"""
+Lightweight local stand-in for the Bybit V5 REST API - No extra dependencies
+Serves replayed candles and simulates one unified account (orders, positions,
+SL/TP, leverage, wallet) so the client and bot run offline, in tests and
+load runs
+
+Usage:
+    python fake_bybit_lite.py [--port 8800] [--candles candles.json]
+    then point the bot at it with "rest_url": "http://127.0.0.1:8800"
+    (and "use_websocket": false)
+"""
+
+import hmac
+import json
+import time
+import uuid
+import random
+import socket
+import hashlib
+import logging
+import argparse
+import threading
+from decimal import Decimal
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+from typing import Dict, List, Optional
+
+from bybit_client_lite import interval_to_ms
+from benchmark_lite import generate_candles
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOLS = ('BTCUSDT', 'ETHUSDT', 'SOLUSDT')
+DEFAULT_START_PRICES = {'BTCUSDT': 60000.0, 'ETHUSDT': 3000.0, 'SOLUSDT': 150.0}
+TAKER_FEE_RATE = 0.00055
+RECV_WINDOW = 5000
+MAX_KLINE_LIMIT = 1000
+
+
+class ExchangeError(Exception):
+    """Rejects a request with a V5 retCode"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _fmt(value: float) -> str:
+    """Number as Bybit sends it: a string without float noise"""
+    return format(round(value, 10) + 0.0, 'f').rstrip('0').rstrip('.') or '0'
+
+
+def default_instrument(symbol: str, price: float) -> Dict:
+    """instruments-info entry with steps that suit the price level"""
+    if price >= 1000:
+        tick, step, min_qty = '0.1', '0.001', '0.001'
+    elif price >= 10:
+        tick, step, min_qty = '0.01', '0.01', '0.01'
+    elif price >= 0.1:
+        tick, step, min_qty = '0.0001', '1', '1'
+    else:
+        tick, step, min_qty = '0.000001', '100', '100'
+    return {
+        'symbol': symbol,
+        'contractType': 'LinearPerpetual',
+        'status': 'Trading',
+        'baseCoin': symbol[:-4],
+        'quoteCoin': 'USDT',
+        'settleCoin': 'USDT',
+        'priceFilter': {'minPrice': tick, 'maxPrice': '1999999', 'tickSize': tick},
+        'lotSizeFilter': {'qtyStep': step, 'minOrderQty': min_qty, 'maxOrderQty': '1000000',
+                          'minNotionalValue': '5'},
+        'leverageFilter': {'minLeverage': '1', 'maxLeverage': '50', 'leverageStep': '0.01'}
+    }
+
+
+class CandleTape:
+    """
+    One symbol's candles replayed on the wall clock
+
+    The tape is restamped so that `history` bars are closed at start and
+    bar `history` is forming now; one more bar becomes visible per interval.
+    The forming bar is served with its final values. Past the end of the
+    data the last close repeats as flat bars.
+    """
+
+    def __init__(self, candles: List[List], interval_ms: int, history: int = 200, now_ms: int = None):
+        self.candles = candles
+        self.step = interval_ms
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        self.origin = now_ms // interval_ms * interval_ms - history * interval_ms
+
+    def index_at(self, ms: int) -> int:
+        return (ms - self.origin) // self.step
+
+    def bar(self, index: int) -> List:
+        """[timestamp, open, high, low, close, volume] of bar `index`"""
+        timestamp = self.origin + index * self.step
+        if index < len(self.candles):
+            return [timestamp] + [float(v) for v in self.candles[index][1:6]]
+        close = float(self.candles[-1][4])
+        return [timestamp, close, close, close, close, 0.0]
+
+    def forming(self, now_ms: int) -> List:
+        return self.bar(self.index_at(now_ms))
+
+    def klines(self, interval_ms: int, start: int, end: int, limit: int) -> List[List]:
+        """Bars of interval_ms (a multiple of the tape's) covering [start, end], oldest first"""
+        first = max(start // interval_ms * interval_ms + (interval_ms if start % interval_ms else 0), self.origin)
+        last = end // interval_ms * interval_ms
+        first = max(first, last - (limit - 1) * interval_ms)
+        bars = []
+        for bucket in range(first, last + 1, interval_ms):
+            lo = self.index_at(bucket)
+            hi = min(self.index_at(bucket + interval_ms - 1), self.index_at(end))
+            parts = [self.bar(i) for i in range(max(lo, 0), hi + 1)]
+            if not parts:
+                continue
+            bars.append([bucket, parts[0][1], max(p[2] for p in parts), min(p[3] for p in parts),
+                         parts[-1][4], sum(p[5] for p in parts)])
+        return bars
+
+
+class FakeExchange:
+    """
+    Local Bybit V5 server with a one-account exchange model
+
+    Market orders fill at the last price (the forming bar's close) with the
+    taker fee; limit orders fill when the last price reaches them. One-way
+    positions average in, reduce, close and flip, and their SL/TP trigger on
+    the last price. Signed endpoints check the API key, the timestamp
+    against recv_window and the HMAC signature exactly like Bybit (10003,
+    10002, 10004).
+
+    Faults for tests: latency/jitter on every response, plus inject(), which
+    makes matching requests fail with a retCode, lose their response after
+    executing (after=True) or drop the connection (code=None).
+
+    Usage:
+        exchange = FakeExchange(api_key='key', api_secret='secret').start()
+        client = BybitClientLite('key', 'secret', base_url=exchange.url)
+        ...
+        exchange.stop()
+    """
+
+    SIGNED = ('/v5/position/', '/v5/order/', '/v5/account/')
+
+    def __init__(self, candles: Dict[str, List[List]] = None, interval: str = '1', history: int = 200,
+                 api_key: str = 'test', api_secret: str = 'test', balance: float = 1000.0,
+                 host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 clock_skew: float = 0.0, instruments: Dict[str, Dict] = None, seed: int = 42):
+        """
+        Args:
+            candles: {symbol: [[timestamp, open, high, low, close, volume], ...]} to
+                     replay at `interval`; seeded random walks when not given
+            history: Bars already closed at start
+            balance: Starting USDT wallet balance
+            latency/jitter: Seconds added to every response (jitter is uniform extra)
+            clock_skew: Seconds the server clock runs ahead of the local one
+            instruments: Per-symbol overrides merged into default_instrument()
+        """
+        self.interval = str(interval)
+        self.interval_ms = interval_to_ms(self.interval)
+        if not self.interval_ms:
+            raise ValueError(f"interval {interval} has no fixed length")
+        if candles is None:
+            candles = {symbol: generate_candles(history + 20000, seed=seed + i,
+                                                start_price=DEFAULT_START_PRICES.get(symbol, 100.0),
+                                                interval_ms=self.interval_ms)
+                       for i, symbol in enumerate(DEFAULT_SYMBOLS)}
+        self.clock_skew_ms = int(clock_skew * 1000)
+        now = self.now_ms()
+        self.tapes = {symbol: CandleTape(c, self.interval_ms, history, now) for symbol, c in candles.items()}
+        self.instruments = {}
+        for symbol, tape in self.tapes.items():
+            spec = default_instrument(symbol, tape.forming(now)[4])
+            for key, value in (instruments or {}).get(symbol, {}).items():
+                spec[key] = dict(spec.get(key, {}), **value) if isinstance(value, dict) else value
+            self.instruments[symbol] = spec
+
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.balance = balance
+        self.latency = latency
+        self.jitter = jitter
+        self.position_mode = 0
+        self.leverage = {symbol: 10 for symbol in self.tapes}
+        self.positions = {}     # symbol -> {'side', 'size', 'entry', 'stop_loss', 'take_profit', ...}
+        self.orders = {}        # orderId -> order dict (resting limit orders and history)
+        self.link_ids = {}      # orderLinkId -> orderId
+        self.requests = {}      # endpoint -> count
+        self._faults = []
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+
+        handler = type('Handler', (_Handler,), {'exchange': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.url = f"http://{host}:{self.port}"
+
+    # -- lifecycle -------------------------------------------------------
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def now_ms(self) -> int:
+        return int(time.time() * 1000) + self.clock_skew_ms
+
+    def inject(self, endpoint: str, code: Optional[int] = 10016, message: str = 'Injected error',
+               count: int = 1, rate: float = None, after: bool = False):
+        """
+        Make requests to endpoints starting with `endpoint` fail
+
+        Args:
+            code: retCode to answer with; None drops the connection instead
+            count: Fail this many matching requests (ignored when rate is set)
+            rate: Fail each matching request with this probability, indefinitely
+            after: Execute the request first, then fail (a lost response)
+        """
+        with self._lock:
+            self._faults.append({'endpoint': endpoint, 'code': code, 'message': message,
+                                 'count': count, 'rate': rate, 'after': after})
+
+    def _fault(self, endpoint):
+        with self._lock:
+            for fault in self._faults:
+                if not endpoint.startswith(fault['endpoint']):
+                    continue
+                if fault['rate'] is not None:
+                    if self._random.random() < fault['rate']:
+                        return fault
+                elif fault['count'] > 0:
+                    fault['count'] -= 1
+                    return fault
+        return None
+
+    # -- request handling -----------------------------------------------
+
+    def check_signature(self, headers, payload):
+        """Validate the X-BAPI-* headers of a signed request (raises ExchangeError)"""
+        if headers.get('X-BAPI-API-KEY') != self.api_key:
+            raise ExchangeError(10003, "API key is invalid.")
+        try:
+            timestamp = int(headers.get('X-BAPI-TIMESTAMP', ''))
+            recv_window = int(headers.get('X-BAPI-RECV-WINDOW') or RECV_WINDOW)
+        except ValueError:
+            raise ExchangeError(10002, "invalid request, please check your timestamp")
+        now = self.now_ms()
+        if not (now - recv_window <= timestamp < now + 1000):
+            raise ExchangeError(10002, f"invalid request, please check your server timestamp or recv_window "
+                                       f"param. req_timestamp[{timestamp}],server_timestamp[{now}],"
+                                       f"recv_window[{recv_window}]")
+        expected = hmac.new(
+            self.api_secret.encode('utf-8'),
+            f"{timestamp}{self.api_key}{recv_window}{payload}".encode('utf-8'),
+            hashlib.sha256
+        ).hexdigest()
+        if not hmac.compare_digest(expected, headers.get('X-BAPI-SIGN', '')):
+            raise ExchangeError(10004, f"error sign! origin_string[{payload}]")
+
+    def handle(self, method: str, endpoint: str, params: Dict) -> Dict:
+        """Run one API call against the exchange model"""
+        route = ROUTES.get((method, endpoint))
+        if route is None:
+            raise ExchangeError(10001, f"unknown endpoint {method} {endpoint}")
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self._match()
+            return getattr(self, route)(params)
+
+    # -- market model ----------------------------------------------------
+
+    def _tape(self, symbol):
+        tape = self.tapes.get(symbol)
+        if tape is None:
+            raise ExchangeError(10001, "params error: symbol invalid")
+        return tape
+
+    def last_price(self, symbol: str) -> float:
+        return self._tape(symbol).forming(self.now_ms())[4]
+
+    def _spec(self, symbol):
+        self._tape(symbol)
+        return self.instruments[symbol]
+
+    def _match(self):
+        """Fill resting limit orders and trigger SL/TP at the current prices"""
+        for order in list(self.orders.values()):
+            if order['orderStatus'] != 'New':
+                continue
+            price = self.last_price(order['symbol'])
+            limit = float(order['price'])
+            if (order['side'] == 'Buy' and price <= limit) or (order['side'] == 'Sell' and price >= limit):
+                self._fill(order, limit)
+        for symbol, position in list(self.positions.items()):
+            price = self.last_price(symbol)
+            long = position['side'] == 'Buy'
+            stop, take = position.get('stop_loss'), position.get('take_profit')
+            trigger = None
+            if stop and (price <= stop if long else price >= stop):
+                trigger = stop
+            elif take and (price >= take if long else price <= take):
+                trigger = take
+            if trigger is not None:
+                self._trade(symbol, 'Sell' if long else 'Buy', position['size'], trigger)
+
+    def _trade(self, symbol, side, qty, price):
+        """Apply a fill to the one-way position and the wallet"""
+        self.balance -= qty * price * TAKER_FEE_RATE
+        position = self.positions.get(symbol)
+        if position is None:
+            self.positions[symbol] = {'side': side, 'size': qty, 'entry': price,
+                                      'stop_loss': None, 'take_profit': None, 'created': self.now_ms()}
+            return
+        sign = 1 if position['side'] == 'Buy' else -1
+        if position['side'] == side:
+            total = position['size'] + qty
+            position['entry'] = (position['entry'] * position['size'] + price * qty) / total
+            position['size'] = total
+            return
+        closed = min(qty, position['size'])
+        self.balance += sign * (price - position['entry']) * closed
+        position['size'] -= closed
+        if position['size'] <= 1e-12:
+            del self.positions[symbol]
+            if qty > closed:
+                self.positions[symbol] = {'side': side, 'size': qty - closed, 'entry': price,
+                                          'stop_loss': None, 'take_profit': None, 'created': self.now_ms()}
+
+    def _used_margin(self):
+        return sum(p['size'] * p['entry'] / self.leverage.get(s, 10) for s, p in self.positions.items())
+
+    def _unrealised(self, symbol, position):
+        sign = 1 if position['side'] == 'Buy' else -1
+        return sign * (self.last_price(symbol) - position['entry']) * position['size']
+
+    def _fill(self, order, price):
+        qty = float(order['qty'])
+        position = self.positions.get(order['symbol'])
+        if order['reduceOnly']:
+            qty = min(qty, position['size']) if position and position['side'] != order['side'] else 0.0
+            if qty <= 0:
+                order['orderStatus'] = 'Cancelled'
+                return
+        self._trade(order['symbol'], order['side'], qty, price)
+        order['orderStatus'] = 'Filled'
+        order['cumExecQty'] = _fmt(qty)
+        order['avgPrice'] = _fmt(price)
+        order['updatedTime'] = str(self.now_ms())
+        stop, take = order.get('stopLoss'), order.get('takeProfit')
+        position = self.positions.get(order['symbol'])
+        if position is not None and (stop or take) and not order['reduceOnly']:
+            position['stop_loss'] = float(stop) if stop else position['stop_loss']
+            position['take_profit'] = float(take) if take else position['take_profit']
+
+    def _new_order(self, params):
+        """Validate and execute one order/create request; returns the order"""
+        symbol = params.get('symbol', '')
+        spec = self._spec(symbol)
+        side = params.get('side')
+        if side not in ('Buy', 'Sell'):
+            raise ExchangeError(10001, "params error: side invalid")
+        link_id = params.get('orderLinkId') or ''
+        if link_id and link_id in self.link_ids:
+            raise ExchangeError(110072, "OrderLinkedID is duplicate")
+        try:
+            qty = Decimal(str(params.get('qty')))
+        except ArithmeticError:
+            raise ExchangeError(10001, "params error: qty invalid")
+        lot = spec['lotSizeFilter']
+        if qty < Decimal(lot['minOrderQty']) or qty > Decimal(lot['maxOrderQty']) or qty % Decimal(lot['qtyStep']):
+            raise ExchangeError(10001, "Qty invalid")
+
+        price = self.last_price(symbol)
+        reduce_only = params.get('reduceOnly') in (True, 'true', 'True')
+        position = self.positions.get(symbol)
+        if reduce_only:
+            if position is None or position['side'] == side:
+                raise ExchangeError(110017, "current position is zero, cannot fix reduce-only order qty")
+        else:
+            if float(qty) * price < float(lot['minNotionalValue']):
+                raise ExchangeError(110094, "Order does not meet minimum order value")
+            opening = float(qty) if position is None or position['side'] == side \
+                else max(0.0, float(qty) - position['size'])
+            margin = opening * price / self.leverage.get(symbol, 10)
+            if margin + opening * price * TAKER_FEE_RATE > self.balance - self._used_margin():
+                raise ExchangeError(110007, "ab not enough for new order")
+            self._check_tpsl(side, price, params.get('stopLoss'), params.get('takeProfit'))
+
+        order_type = params.get('orderType', 'Market')
+        if order_type == 'Limit' and not params.get('price'):
+            raise ExchangeError(10001, "params error: price is required for Limit orders")
+        now = str(self.now_ms())
+        order = {
+            'orderId': str(uuid.uuid4()),
+            'orderLinkId': link_id,
+            'symbol': symbol,
+            'side': side,
+            'orderType': order_type,
+            'price': params.get('price', '0'),
+            'qty': str(qty),
+            'reduceOnly': reduce_only,
+            'stopLoss': params.get('stopLoss', ''),
+            'takeProfit': params.get('takeProfit', ''),
+            'orderStatus': 'New',
+            'cumExecQty': '0',
+            'avgPrice': '',
+            'createdTime': now,
+            'updatedTime': now
+        }
+        self.orders[order['orderId']] = order
+        if link_id:
+            self.link_ids[link_id] = order['orderId']
+        if order_type == 'Market':
+            self._fill(order, price)
+        else:
+            self._match()
+        return order
+
+    @staticmethod
+    def _check_tpsl(side, price, stop_loss, take_profit):
+        long = side == 'Buy'
+        if stop_loss and (float(stop_loss) >= price if long else float(stop_loss) <= price):
+            raise ExchangeError(110092 if long else 110093, "StopLoss price is on the wrong side of the last price")
+        if take_profit and (float(take_profit) <= price if long else float(take_profit) >= price):
+            raise ExchangeError(110093 if long else 110092, "TakeProfit price is on the wrong side of the last price")
+
+    def _position_entry(self, symbol, position):
+        """position/list entry; a flat symbol is listed with size 0"""
+        now = str(self.now_ms())
+        entry = {
+            'positionIdx': 0,
+            'symbol': symbol,
+            'side': '',
+            'size': '0',
+            'avgPrice': '0',
+            'positionValue': '0',
+            'leverage': str(self.leverage.get(symbol, 10)),
+            'markPrice': _fmt(self.last_price(symbol)),
+            'unrealisedPnl': '0',
+            'stopLoss': '',
+            'takeProfit': '',
+            'tpslMode': 'Full',
+            'positionStatus': 'Normal',
+            'createdTime': now,
+            'updatedTime': now
+        }
+        if position is not None:
+            entry.update({
+                'side': position['side'],
+                'size': _fmt(position['size']),
+                'avgPrice': _fmt(position['entry']),
+                'positionValue': _fmt(position['size'] * position['entry']),
+                'unrealisedPnl': _fmt(self._unrealised(symbol, position)),
+                'stopLoss': _fmt(position['stop_loss']) if position['stop_loss'] else '',
+                'takeProfit': _fmt(position['take_profit']) if position['take_profit'] else '',
+                'createdTime': str(position['created'])
+            })
+        return entry
+
+    @staticmethod
+    def _page(items, params, default_limit, max_limit):
+        """Cursor pagination: the cursor is the offset of the next page"""
+        limit = min(int(params.get('limit') or default_limit), max_limit)
+        offset = int(params.get('cursor') or 0)
+        end = offset + limit
+        return items[offset:end], (str(end) if end < len(items) else '')
+
+    # -- endpoints -------------------------------------------------------
+
+    def _server_time(self, params):
+        now_ns = (time.time_ns() + self.clock_skew_ms * 1000000)
+        return {'timeSecond': str(now_ns // 10 ** 9), 'timeNano': str(now_ns)}
+
+    def _kline(self, params):
+        symbol = params.get('symbol', '')
+        tape = self._tape(symbol)
+        interval = str(params.get('interval', ''))
+        interval_ms = interval_to_ms(interval)
+        if not interval_ms or interval_ms % self.interval_ms:
+            raise ExchangeError(10001, f"params error: interval {interval} is not served")
+        limit = min(int(params.get('limit') or 200), MAX_KLINE_LIMIT)
+        now = self.now_ms()
+        end = min(int(params['end']), now) if params.get('end') else now
+        start = int(params['start']) if params.get('start') else end // interval_ms * interval_ms - (limit - 1) * interval_ms
+        bars = tape.klines(interval_ms, start, end, limit)
+        rows = [[str(b[0]), _fmt(b[1]), _fmt(b[2]), _fmt(b[3]), _fmt(b[4]), _fmt(b[5]), _fmt(b[5] * b[4])]
+                for b in reversed(bars)]
+        return {'category': 'linear', 'symbol': symbol, 'list': rows}
+
+    def _tickers(self, params):
+        symbols = [params['symbol']] if params.get('symbol') else list(self.tapes)
+        now = self.now_ms()
+        tickers = []
+        for symbol in symbols:
+            tape = self._tape(symbol)
+            bar = tape.forming(now)
+            tick = float(self.instruments[symbol]['priceFilter']['tickSize'])
+            day = tape.bar(tape.index_at(now - 86400000))
+            tickers.append({
+                'symbol': symbol,
+                'lastPrice': _fmt(bar[4]),
+                'markPrice': _fmt(bar[4]),
+                'indexPrice': _fmt(bar[4]),
+                'bid1Price': _fmt(bar[4] - tick),
+                'ask1Price': _fmt(bar[4] + tick),
+                'prevPrice24h': _fmt(day[4]),
+                'price24hPcnt': _fmt(bar[4] / day[4] - 1 if day[4] else 0),
+                'volume24h': _fmt(bar[5]),
+                'fundingRate': '0.0001'
+            })
+        return {'category': 'linear', 'list': tickers}
+
+    def _instruments_info(self, params):
+        if params.get('symbol'):
+            return {'category': 'linear', 'list': [self._spec(params['symbol'])], 'nextPageCursor': ''}
+        items, cursor = self._page(list(self.instruments.values()), params, 500, 1000)
+        return {'category': 'linear', 'list': items, 'nextPageCursor': cursor}
+
+    def _position_list(self, params):
+        if params.get('symbol'):
+            symbol = params['symbol']
+            self._tape(symbol)
+            return {'category': 'linear', 'list': [self._position_entry(symbol, self.positions.get(symbol))],
+                    'nextPageCursor': ''}
+        if not params.get('settleCoin'):
+            raise ExchangeError(10001, "params error: symbol or settleCoin is required")
+        entries = [self._position_entry(s, p) for s, p in sorted(self.positions.items())]
+        items, cursor = self._page(entries, params, 20, 200)
+        return {'category': 'linear', 'list': items, 'nextPageCursor': cursor}
+
+    def _set_leverage(self, params):
+        symbol = params.get('symbol', '')
+        spec = self._spec(symbol)
+        leverage = float(params.get('buyLeverage', 0))
+        if leverage != float(params.get('sellLeverage', 0)):
+            raise ExchangeError(110027, "buy and sell leverage must be equal in one-way mode")
+        if not 1 <= leverage <= float(spec['leverageFilter']['maxLeverage']):
+            raise ExchangeError(10001, "leverage invalid")
+        if leverage == self.leverage.get(symbol):
+            raise ExchangeError(110043, "leverage not modified")
+        position = self.positions.get(symbol)
+        if position is not None:
+            margin = self._used_margin() - position['size'] * position['entry'] / self.leverage[symbol]
+            if margin + position['size'] * position['entry'] / leverage > self.balance:
+                raise ExchangeError(110012, "insufficient available balance")
+        self.leverage[symbol] = int(leverage) if leverage.is_integer() else leverage
+        return {}
+
+    def _switch_mode(self, params):
+        mode = int(params.get('mode', 0))
+        if mode == self.position_mode:
+            raise ExchangeError(110025, "Position mode is not modified")
+        if mode != 0:
+            raise ExchangeError(10001, "only one-way mode is simulated")
+        self.position_mode = mode
+        return {}
+
+    def _order_create(self, params):
+        order = self._new_order(params)
+        return {'orderId': order['orderId'], 'orderLinkId': order['orderLinkId']}
+
+    def _order_create_batch(self, params):
+        listed, infos = [], []
+        for item in params.get('request', [])[:10]:
+            try:
+                order = self._new_order(item)
+                listed.append({'symbol': order['symbol'], 'orderId': order['orderId'],
+                               'orderLinkId': order['orderLinkId'], 'createAt': order['createdTime']})
+                infos.append({'code': 0, 'msg': 'OK'})
+            except ExchangeError as e:
+                listed.append({'symbol': item.get('symbol', ''), 'orderId': '',
+                               'orderLinkId': item.get('orderLinkId', ''), 'createAt': ''})
+                infos.append({'code': e.code, 'msg': e.message})
+        return {'list': listed}, {'list': infos}
+
+    def _order_cancel_batch(self, params):
+        listed, infos = [], []
+        for item in params.get('request', [])[:10]:
+            order_id = item.get('orderId') or self.link_ids.get(item.get('orderLinkId', ''), '')
+            order = self.orders.get(order_id)
+            if order is None or order['orderStatus'] != 'New':
+                infos.append({'code': 110001, 'msg': 'order not exists or too late to cancel'})
+            else:
+                order['orderStatus'] = 'Cancelled'
+                infos.append({'code': 0, 'msg': 'OK'})
+            listed.append({'symbol': item.get('symbol', ''), 'orderId': order_id,
+                           'orderLinkId': item.get('orderLinkId', '')})
+        return {'list': listed}, {'list': infos}
+
+    def _trading_stop(self, params):
+        symbol = params.get('symbol', '')
+        self._spec(symbol)
+        position = self.positions.get(symbol)
+        if position is None:
+            raise ExchangeError(10001, "can not set tp/sl/ts for zero position")
+        self._check_tpsl(position['side'], self.last_price(symbol), params.get('stopLoss'), params.get('takeProfit'))
+        if 'stopLoss' in params:
+            position['stop_loss'] = float(params['stopLoss']) or None
+        if 'takeProfit' in params:
+            position['take_profit'] = float(params['takeProfit']) or None
+        return {}
+
+    def _wallet_balance(self, params):
+        unrealised = sum(self._unrealised(s, p) for s, p in self.positions.items())
+        margin = self._used_margin()
+        equity = self.balance + unrealised
+        coin = {
+            'coin': 'USDT',
+            'walletBalance': _fmt(self.balance),
+            'equity': _fmt(equity),
+            'usdValue': _fmt(equity),
+            'unrealisedPnl': _fmt(unrealised),
+            'totalPositionIM': _fmt(margin),
+            'availableToWithdraw': _fmt(max(0.0, self.balance - margin))
+        }
+        return {'list': [{
+            'accountType': 'UNIFIED',
+            'totalEquity': _fmt(equity),
+            'totalWalletBalance': _fmt(self.balance),
+            'totalAvailableBalance': _fmt(max(0.0, equity - margin)),
+            'coin': [coin]
+        }]}
+
+
+# (method, endpoint) -> FakeExchange method
+ROUTES = {
+    ('GET', '/v5/market/time'): '_server_time',
+    ('GET', '/v5/market/kline'): '_kline',
+    ('GET', '/v5/market/tickers'): '_tickers',
+    ('GET', '/v5/market/instruments-info'): '_instruments_info',
+    ('GET', '/v5/position/list'): '_position_list',
+    ('POST', '/v5/position/set-leverage'): '_set_leverage',
+    ('POST', '/v5/position/switch-mode'): '_switch_mode',
+    ('POST', '/v5/position/trading-stop'): '_trading_stop',
+    ('POST', '/v5/order/create'): '_order_create',
+    ('POST', '/v5/order/create-batch'): '_order_create_batch',
+    ('POST', '/v5/order/cancel-batch'): '_order_cancel_batch',
+    ('GET', '/v5/account/wallet-balance'): '_wallet_balance'
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP front end; FakeExchange subclasses it with the exchange attached"""
+
+    protocol_version = 'HTTP/1.1'
+    exchange = None
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes: without this, Nagle plus
+        # delayed ACK add ~40 ms to every keep-alive response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        self._serve('GET')
+
+    def do_POST(self):
+        self._serve('POST')
+
+    def _serve(self, method):
+        exchange = self.exchange
+        parts = urlsplit(self.path)
+        endpoint = parts.path
+        raw = parts.query if method == 'GET' else \
+            self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode('utf-8')
+
+        delay = exchange.latency + (exchange._random.uniform(0, exchange.jitter) if exchange.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        fault = exchange._fault(endpoint)
+        if fault is not None and fault['code'] is None:
+            self.close_connection = True
+            self.connection.close()
+            return
+
+        ext_info = {}
+        try:
+            if fault is not None and not fault['after']:
+                raise ExchangeError(fault['code'], fault['message'])
+            params = dict(parse_qsl(raw, keep_blank_values=True)) if method == 'GET' else json.loads(raw or '{}')
+            if endpoint.startswith(FakeExchange.SIGNED):
+                exchange.check_signature(self.headers, raw)
+            result = exchange.handle(method, endpoint, params)
+            if isinstance(result, tuple):
+                result, ext_info = result
+            if fault is not None:
+                raise ExchangeError(fault['code'], fault['message'])
+            body = {'retCode': 0, 'retMsg': 'OK', 'result': result}
+        except ExchangeError as e:
+            body = {'retCode': e.code, 'retMsg': e.message, 'result': {}}
+        except ValueError as e:
+            body = {'retCode': 10001, 'retMsg': f"params error: {e}", 'result': {}}
+        body['retExtInfo'] = ext_info
+        body['time'] = exchange.now_ms()
+
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Bybit V5 stand-in server")
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--candles', help="JSON {symbol: candles} to replay (default: random walks)")
+    parser.add_argument('--interval', default='1', help="Interval of the replayed candles (default 1)")
+    parser.add_argument('--key', default='test', help="API key the server accepts")
+    parser.add_argument('--secret', default='test', help="API secret the server accepts")
+    parser.add_argument('--balance', type=float, default=1000.0, help="Starting USDT balance")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra seconds per response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests failing with 10016")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+
+    candles = None
+    if args.candles:
+        with open(args.candles, 'r') as f:
+            candles = json.load(f)
+    exchange = FakeExchange(candles, interval=args.interval, api_key=args.key, api_secret=args.secret,
+                            balance=args.balance, port=args.port, latency=args.latency, jitter=args.jitter)
+    if args.error_rate:
+        exchange.inject('/v5/', code=10016, message='Injected server error', rate=args.error_rate)
+    exchange.start()
+    print(f"Fake Bybit V5 on {exchange.url} ({', '.join(exchange.tapes)}), Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        exchange.stop()
+
+
+if __name__ == "__main__":
+    main()
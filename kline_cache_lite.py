@@ -0,0 +1,151 @@
+"""
+Lightweight incremental kline cache - No extra dependencies
+Keeps a candle window per (symbol, interval) current with small REST requests
+"""
+
+import time
+import logging
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from candle_buffer_lite import CandleBuffer
+from bybit_client_lite import interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+# Most candles one /v5/market/kline request returns
+MAX_KLINE_LIMIT = 1000
+
+
+class KlineCache:
+    """
+    Candle windows per (symbol, interval) synced incrementally over REST
+
+    The first sync of a key downloads the full window. After that, sync()
+    asks only for candles from the newest stored bar on (`start`), so a
+    regular cycle transfers the forming bar plus at most one new one: the
+    forming bar is overwritten in place and new bars are appended. After
+    downtime the missed bars are backfilled in pages of MAX_KLINE_LIMIT; a
+    gap longer than the window, or a response that does not line up with
+    the stored bars, reloads the whole window instead.
+
+    Usage:
+        cache = KlineCache(client, capacity=200)
+        cache.sync('BTCUSDT', '15')
+        candles = cache.candles('BTCUSDT', '15')
+    """
+
+    def __init__(self, client, capacity: int = 200):
+        """
+        Args:
+            client: BybitClientLite used to fetch klines
+            capacity: Candles kept per (symbol, interval), forming one included
+        """
+        self.client = client
+        self.capacity = capacity
+        self.buffers = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'candles': 0, 'reloads': 0, 'backfills': 0}
+
+    def _buffer(self, symbol: str, interval: str) -> CandleBuffer:
+        key = (symbol, str(interval))
+        with self._lock:
+            buffer = self.buffers.get(key)
+            if buffer is None:
+                buffer = self.buffers[key] = CandleBuffer(capacity=self.capacity)
+            return buffer
+
+    def _fetch(self, buffer, symbol, interval, limit, start=None, end=None) -> int:
+        changed = self.client.fetch_klines_into(buffer, symbol, interval, limit=limit, start=start, end=end)
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['candles'] += changed
+        return changed
+
+    def _reload(self, buffer, symbol, interval) -> bool:
+        """Replace the window with a fresh download"""
+        buffer.clear()
+        with self._lock:
+            self._stats['reloads'] += 1
+        return self._fetch(buffer, symbol, interval, self.capacity) > 0
+
+    @staticmethod
+    def _contiguous(buffer, since: int, step: int) -> bool:
+        """True if the bars from timestamp `since` on are exactly one step apart"""
+        timestamps = buffer.timestamps
+        index = bisect_left(timestamps, since)
+        if index == len(timestamps) or timestamps[index] != since:
+            return False
+        for i in range(index + 1, len(timestamps)):
+            if timestamps[i] - timestamps[i - 1] != step:
+                return False
+        return True
+
+    def sync(self, symbol: str, interval: str) -> bool:
+        """
+        Bring one window up to date
+
+        Returns:
+            True if the window holds candles up to the current forming bar
+        """
+        interval = str(interval)
+        buffer = self._buffer(symbol, interval)
+        step = interval_to_ms(interval)
+        last = buffer.last_timestamp
+
+        if last is None or not step:
+            return self._reload(buffer, symbol, interval)
+
+        # Bars from the stored forming one up to the one forming now
+        missing = (int(time.time() * 1000) - last) // step + 1
+        if missing >= self.capacity:
+            logger.info(f"{symbol} {interval}: {missing} candles behind, reloading window")
+            return self._reload(buffer, symbol, interval)
+        if missing > 2:
+            with self._lock:
+                self._stats['backfills'] += 1
+
+        start = last
+        while missing > 0:
+            # Start at the stored forming bar so it is overwritten with its final values
+            limit = min(missing + 1, MAX_KLINE_LIMIT)
+            end = start + (limit - 1) * step if limit == MAX_KLINE_LIMIT else None
+            if not self._fetch(buffer, symbol, interval, limit, start=start, end=end):
+                return False
+            if not self._contiguous(buffer, start, step):
+                logger.info(f"{symbol} {interval}: candles do not line up, reloading window")
+                return self._reload(buffer, symbol, interval)
+            missing -= limit - 1
+            start = buffer.last_timestamp
+        return True
+
+    def last_closed(self, symbol: str, interval: str) -> Optional[int]:
+        """
+        Timestamp of the newest closed candle, None when unknown
+
+        The newest REST row is always taken as forming, even if the local
+        clock says it has ended: it may have been fetched before it closed.
+        """
+        buffer = self.buffers.get((symbol, str(interval)))
+        if buffer is None or len(buffer) < 2:
+            return None
+        return buffer.timestamps[-2]
+
+    def candles(self, symbol: str, interval: str, since: int = None) -> List[List]:
+        """
+        Copy of a window, oldest first, last one forming
+
+        Args:
+            since: Only candles with timestamp >= since
+        """
+        buffer = self.buffers.get((symbol, str(interval)))
+        if buffer is None:
+            return []
+        start = bisect_left(buffer.timestamps, since) if since is not None else 0
+        return [buffer[i] for i in range(start, len(buffer))]
+
+    def stats(self) -> Dict[str, int]:
+        """Requests, candles received, full reloads and multi-bar backfills since start"""
+        with self._lock:
+            return dict(self._stats)
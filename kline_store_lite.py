@@ -0,0 +1,451 @@
+"""
+Lightweight on-disk kline history - No extra dependencies
+Downloads months of candles per (symbol, interval) into fixed-width binary
+columns and maps them back as zero-copy arrays for backtests and tuning
+
+Usage:
+    python kline_store_lite.py BTCUSDT,ETHUSDT 15 90 [--dir history]
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import logging
+import argparse
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from bybit_client_lite import BybitClientLite, interval_to_ms
+from candle_buffer_lite import COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# File layout: 64-byte header, then one region of `capacity` 8-byte values per
+# column in COLUMNS order (timestamp int64, the rest float64, little-endian).
+# Only the first `count` values of each region are valid.
+MAGIC = b'TRFK'
+VERSION = 1
+HEADER = struct.Struct('<4sIQQQ')   # magic, version, count, capacity, flags
+HEADER_SIZE = 64
+TYPECODES = ('q', 'd', 'd', 'd', 'd', 'd')
+
+# The first stored candle is the symbol's first: the exchange has nothing older
+FLAG_LISTING = 1
+
+# Most candles one /v5/market/kline request returns
+PAGE_SIZE = 1000
+
+if sys.byteorder != 'little':
+    raise ImportError("kline_store_lite maps little-endian files and needs a little-endian CPU")
+
+
+def _column_offset(index: int, capacity: int) -> int:
+    return HEADER_SIZE + index * capacity * 8
+
+
+class KlineSeries:
+    """
+    Read-only memory map of one stored (symbol, interval)
+
+    Columns are memoryviews straight into the file, in the same shape as
+    CandleBuffer.columns(), so ema, smooth_range, calculate_signal_series
+    and Backtester.run read them without building Python lists. Pages are
+    loaded by the OS on first touch. Views stay valid until close().
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self.capacity, self.flags = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path}: not a kline store file")
+        self.path = path
+        self._views = []
+
+    def __len__(self):
+        return self.count
+
+    def column(self, name: str) -> memoryview:
+        """Zero-copy view of one column, oldest first"""
+        index = COLUMNS.index(name)
+        start = _column_offset(index, self.capacity)
+        view = memoryview(self._map)[start:start + self.count * 8].cast(TYPECODES[index])
+        self._views.append(view)
+        return view
+
+    @property
+    def timestamps(self):
+        return self.column('timestamp')
+
+    @property
+    def opens(self):
+        return self.column('open')
+
+    @property
+    def highs(self):
+        return self.column('high')
+
+    @property
+    def lows(self):
+        return self.column('low')
+
+    @property
+    def closes(self):
+        return self.column('close')
+
+    @property
+    def volumes(self):
+        return self.column('volume')
+
+    def columns(self) -> Dict[str, memoryview]:
+        """All columns, in the dict format backtest_lite uses"""
+        return {name: self.column(name) for name in COLUMNS}
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class KlineStore:
+    """
+    Directory of kline files, one per (symbol, interval)
+
+    write() keeps every file sorted and unique by timestamp. Candles newer
+    than the stored ones are appended in place without reading the file, and
+    the header count is written last, so an interrupted append loses nothing
+    already stored. Anything else (older candles, filled holes) rewrites the
+    file to a temp copy that replaces it atomically. Timestamps already
+    stored win over new ones: stored candles are closed and final.
+
+    On Windows a file cannot be replaced while it is mapped: close
+    KlineSeries objects before writing to the same (symbol, interval).
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, f"{symbol}_{interval}.klines")
+
+    def _header(self, path):
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            magic, version, count, capacity, flags = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a kline store file")
+        return count, capacity, flags
+
+    def info(self, symbol: str, interval: str) -> Optional[Dict]:
+        """{'count', 'first', 'last', 'listing'} for a stored (symbol, interval), None if there is none"""
+        path = self.path(symbol, str(interval))
+        header = self._header(path)
+        if header is None or not header[0]:
+            return None
+        count, capacity, flags = header
+        first, last = self._bounds(path, count, capacity)
+        return {'count': count, 'first': first, 'last': last, 'listing': bool(flags & FLAG_LISTING)}
+
+    @staticmethod
+    def _bounds(path, count, capacity):
+        """(first, last) stored timestamp, read without loading the column"""
+        with open(path, 'rb') as f:
+            f.seek(_column_offset(0, capacity))
+            first = struct.unpack('<q', f.read(8))[0]
+            f.seek(_column_offset(0, capacity) + (count - 1) * 8)
+            last = struct.unpack('<q', f.read(8))[0]
+        return first, last
+
+    def mark_listing(self, symbol: str, interval: str):
+        """Record that nothing older than the first stored candle exists"""
+        path = self.path(symbol, str(interval))
+        count, capacity, flags = self._header(path)
+        with open(path, 'r+b') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, count, capacity, flags | FLAG_LISTING))
+
+    def open(self, symbol: str, interval: str) -> Optional[KlineSeries]:
+        """Memory-map a stored (symbol, interval), None if there is none"""
+        path = self.path(symbol, str(interval))
+        return KlineSeries(path) if os.path.exists(path) else None
+
+    def _read(self, path, count, capacity):
+        columns = []
+        with open(path, 'rb') as f:
+            for index, typecode in enumerate(TYPECODES):
+                f.seek(_column_offset(index, capacity))
+                column = array(typecode)
+                column.frombytes(f.read(count * 8))
+                columns.append(column)
+        return columns
+
+    def _rewrite(self, path, columns, flags=0):
+        """Write a whole file with room to append and swap it in"""
+        count = len(columns[0])
+        capacity = count + max(PAGE_SIZE, count // 4)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, count, capacity, flags).ljust(HEADER_SIZE, b'\0'))
+            for index, column in enumerate(columns):
+                f.seek(_column_offset(index, capacity))
+                f.write(column.tobytes())
+            f.truncate(_column_offset(len(TYPECODES), capacity))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _columns(candles):
+        """Candle rows to one array per column"""
+        columns = [array(t) for t in TYPECODES]
+        for candle in candles:
+            columns[0].append(int(candle[0]))
+            for index in range(1, len(TYPECODES)):
+                columns[index].append(float(candle[index]))
+        return columns
+
+    def _append(self, path, count, columns):
+        """Write new rows into the spare capacity, then publish the new count"""
+        _, capacity, flags = self._header(path)
+        with open(path, 'r+b') as f:
+            for index, column in enumerate(columns):
+                f.seek(_column_offset(index, capacity) + count * 8)
+                f.write(column.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, count + len(columns[0]), capacity, flags))
+
+    def write(self, symbol: str, interval: str, candles: List[List]) -> int:
+        """
+        Add candles, skipping timestamps that are already stored
+
+        Args:
+            candles: [[timestamp, open, high, low, close, volume], ...] in any order
+
+        Returns:
+            number of candles added
+        """
+        path = self.path(symbol, str(interval))
+        rows = {}
+        for candle in candles:
+            rows[int(candle[0])] = candle
+        if not rows:
+            return 0
+        header = self._header(path)
+        count, capacity, flags = header if header else (0, 0, 0)
+
+        # Newer than everything stored and fits: append without reading the file
+        if count and count + len(rows) <= capacity and min(rows) > self._bounds(path, count, capacity)[1]:
+            self._append(path, count, self._columns(rows[t] for t in sorted(rows)))
+            return len(rows)
+
+        stored = self._read(path, count, capacity) if count else [array(t) for t in TYPECODES]
+        timestamps = stored[0]
+
+        new = []
+        for timestamp in sorted(rows):
+            i = bisect_left(timestamps, timestamp)
+            if i == count or timestamps[i] != timestamp:
+                new.append(rows[timestamp])
+        if not new:
+            return 0
+
+        added = self._columns(new)
+        if count and added[0][0] > timestamps[-1]:
+            self._rewrite(path, [old + extra for old, extra in zip(stored, added)], flags)
+        elif not count or added[0][-1] < timestamps[0]:
+            # Everything is older: nothing to merge
+            flags &= ~FLAG_LISTING
+            self._rewrite(path, [extra + old for old, extra in zip(stored, added)], flags)
+        else:
+            # Merge by timestamp: both sides are sorted and disjoint
+            order = sorted(range(count + len(new)),
+                           key=lambda k: timestamps[k] if k < count else added[0][k - count])
+            if added[0][0] < timestamps[0]:
+                flags &= ~FLAG_LISTING
+            self._rewrite(path, [array(t, (old[k] if k < count else extra[k - count] for k in order))
+                                 for t, old, extra in zip(TYPECODES, stored, added)], flags)
+        return len(new)
+
+
+class HistoryDownloader:
+    """
+    Fill a KlineStore from /v5/market/kline
+
+    A download grows the stored range outward: newer candles are fetched
+    oldest page first and appended, older ones newest page first, so the
+    stored range stays contiguous and an interrupted download resumes where
+    it stopped. Older candles are written once they outnumber the stored
+    ones, since every prepend rewrites the file: a long download costs a
+    handful of rewrites, not one per batch. Pages are fetched `workers` at a
+    time over the client's connection pool; the client's rate limiter keeps
+    them within the market data quota. The forming candle is never stored.
+
+    A page that starts late (or is empty) is checked with a one-candle
+    request for anything older: only if there is none is the symbol's
+    listing reached. Otherwise it is a gap in the exchange's data and the
+    download goes on past it.
+    """
+
+    def __init__(self, client, store: KlineStore, workers: int = 4):
+        """
+        Args:
+            client: BybitClientLite (no API keys needed)
+            store: Destination KlineStore
+            workers: Pages fetched concurrently
+        """
+        self.client = client
+        self.store = store
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='history')
+
+    def _pages(self, start, end, step, descending):
+        """(page_start, page_end) windows of PAGE_SIZE candles covering [start, end]"""
+        span = (PAGE_SIZE - 1) * step
+        pages = []
+        if descending:
+            while end >= start:
+                pages.append((max(start, end - span), end))
+                end -= span + step
+        else:
+            while start <= end:
+                pages.append((start, min(end, start + span)))
+                start += span + step
+        return pages
+
+    def _fetch(self, symbol, interval, pages):
+        """
+        Fetch pages concurrently
+
+        Returns:
+            (candles of the leading pages that succeeded, 'ok' | 'listing' | 'failed');
+            'listing' when a page starts after its window and the exchange has
+            nothing older either
+        """
+        results = self._executor.map(
+            lambda page: self.client.get_klines(symbol, interval, limit=PAGE_SIZE, start=page[0], end=page[1]),
+            pages
+        )
+        candles = []
+        for (page_start, page_end), candles_page in zip(pages, results):
+            candles.extend(candles_page)
+            if candles_page and candles_page[0][0] == page_start:
+                continue
+            # Nothing at the start of the window: listing, data gap or failed request
+            before = candles_page[0][0] - 1 if candles_page else page_end
+            older = self.client.get_klines(symbol, interval, limit=1, end=before)
+            if not older:
+                return candles, 'listing'
+            if older[-1][0] >= page_start:
+                # The exchange has candles this page is missing
+                return candles, 'failed'
+        return candles, 'ok'
+
+    def download(self, symbol: str, interval: str, start: int, end: int = None) -> Dict:
+        """
+        Make the store cover [start, end] for one symbol
+
+        Args:
+            start: Oldest candle timestamp wanted (ms)
+            end: Newest candle timestamp wanted (ms), default the last closed one
+
+        Returns:
+            {'added', 'count', 'first', 'last', 'complete'}
+        """
+        interval = str(interval)
+        step = interval_to_ms(interval)
+        if not step:
+            raise ValueError(f"interval {interval} has no fixed length")
+        last_closed = int(time.time() * 1000) // step * step - step
+        end = min(end, last_closed) if end is not None else last_closed
+        start = -(-start // step) * step
+
+        info = self.store.info(symbol, interval)
+        if info is None:
+            ranges = [(start, end, True)]
+        else:
+            ranges = []
+            if info['last'] < end:
+                ranges.append((max(start, info['last'] + step), end, False))
+            if start < info['first'] and not info['listing']:
+                ranges.append((start, info['first'] - step, True))
+
+        added = 0
+        complete = True
+        stored = info['count'] if info else 0
+        for range_start, range_end, descending in ranges:
+            pages = self._pages(range_start, range_end, step, descending)
+            pending = []
+            for i in range(0, len(pages), self.workers):
+                candles, status = self._fetch(symbol, interval, pages[i:i + self.workers])
+                pending.extend(candles)
+                # Prepends rewrite the file: hold older candles until they outnumber the stored ones
+                if not descending or status != 'ok' or len(pending) >= stored or i + self.workers >= len(pages):
+                    written = self.store.write(symbol, interval, pending)
+                    added += written
+                    stored += written
+                    pending = []
+                if status == 'listing' and descending:
+                    if stored:
+                        self.store.mark_listing(symbol, interval)
+                    break
+                if status != 'ok':
+                    # Keep the stored range contiguous: the next download resumes here
+                    logger.warning(f"⚠️ {symbol} {interval}: page failed, stopping at {added} candles added")
+                    complete = False
+                    break
+                logger.info(f"{symbol} {interval}: {added} candles added")
+
+        info = self.store.info(symbol, interval) or {'count': 0, 'first': None, 'last': None}
+        return dict(info, added=added, complete=complete)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download kline history into a local store")
+    parser.add_argument('symbols', help="Comma-separated symbols, e.g. BTCUSDT,ETHUSDT")
+    parser.add_argument('interval', help="Kline interval (1, 5, 15, 60, 240, D, ...)")
+    parser.add_argument('days', type=float, help="Days of history to keep")
+    parser.add_argument('--dir', default='history', help="Store directory (default: history)")
+    parser.add_argument('--workers', type=int, default=4, help="Pages fetched concurrently")
+    parser.add_argument('--testnet', action='store_true', help="Download from testnet")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+
+    client = BybitClientLite('', '', testnet=args.testnet)
+    downloader = HistoryDownloader(client, KlineStore(args.dir), workers=args.workers)
+    start = int((time.time() - args.days * 86400) * 1000)
+    try:
+        for symbol in args.symbols.split(','):
+            result = downloader.download(symbol.strip(), args.interval, start)
+            if result['count']:
+                first = datetime.fromtimestamp(result['first'] / 1000)
+                last = datetime.fromtimestamp(result['last'] / 1000)
+                print(f"{'✅' if result['complete'] else '⚠️'} {symbol}: {result['count']} candles "
+                      f"({first:%Y-%m-%d %H:%M} to {last:%Y-%m-%d %H:%M}), {result['added']} new")
+            else:
+                print(f"❌ {symbol}: no candles")
+    finally:
+        downloader.close()
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Lightweight request instrumentation - No extra dependencies
+Per-endpoint counters and latency histograms for Bybit REST calls, exported
+as Prometheus text or JSON snapshots
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Where request time goes: limiter queue, TCP/TLS connect (new connections
+# only), server (send until the body is read) and JSON parsing
+PHASES = ('total', 'queue', 'connect', 'server', 'parse')
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Recent samples kept per (endpoint, method, phase) for percentiles
+RESERVOIR = 2048
+
+
+# Seconds spent opening connections on this thread since take_connect_time()
+_connect = threading.local()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect.seconds = (getattr(_connect, 'seconds', None) or 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()   # TCP + TLS handshake
+        _connect.seconds = (getattr(_connect, 'seconds', None) or 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+def time_connections(adapter):
+    """Make a requests HTTPAdapter time every connection it opens (see take_connect_time)"""
+    adapter.poolmanager.pool_classes_by_scheme = {
+        'http': _TimedHTTPConnectionPool,
+        'https': _TimedHTTPSConnectionPool
+    }
+
+
+def take_connect_time() -> Optional[float]:
+    """Seconds this thread spent opening connections since the last call, None if it opened none"""
+    seconds = getattr(_connect, 'seconds', None)
+    _connect.seconds = None
+    return seconds
+
+
+class Histogram:
+    """Cumulative Prometheus buckets plus a window of recent samples for percentiles"""
+
+    def __init__(self, buckets=BUCKETS, window: int = RESERVOIR):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)     # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+
+    def percentiles(self, quantiles=(0.5, 0.95, 0.99)) -> Dict[str, float]:
+        """{'p50': ms, ...} over the recent window"""
+        samples = sorted(self.recent)
+        if not samples:
+            return {}
+        result = {}
+        for q in quantiles:
+            index = min(len(samples) - 1, int(q * len(samples)))
+            result[f"p{int(q * 100)}"] = samples[index] * 1000
+        return result
+
+
+class RequestMetrics:
+    """
+    Thread-safe per-endpoint request metrics
+
+    record() takes one request; BybitClientLite calls it for every
+    _request_v5. Counters are split by method, signed, HTTP status and
+    retCode; latencies by phase (PHASES). Read them with snapshot() (JSON,
+    with p50/p95/p99), prometheus() (text exposition format), serve() for a
+    scrape endpoint or start_snapshots() for periodic JSON files.
+    """
+
+    def __init__(self, prefix: str = 'bybit'):
+        self.prefix = prefix
+        self.started = time.time()
+        self._requests = {}     # (endpoint, method, signed, status, ret_code) -> count
+        self._bytes = {}        # (endpoint, direction) -> bytes
+        self._latency = {}      # (endpoint, method, phase) -> Histogram
+        self._lock = threading.Lock()
+        self._server = None
+        self._stop = threading.Event()
+
+    def record(self, endpoint: str, method: str, signed: bool, status: int, ret_code,
+               sent: int = 0, received: int = 0, timings: Dict[str, Optional[float]] = None):
+        """
+        Add one request
+
+        Args:
+            status: HTTP status, 0 when no response arrived
+            ret_code: V5 retCode (-1 for client-side failures)
+            sent/received: Request and response bytes
+            timings: {phase: seconds}; phases that did not happen are None or missing
+        """
+        with self._lock:
+            key = (endpoint, method, bool(signed), int(status), ret_code)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for direction, size in (('sent', sent), ('received', received)):
+                self._bytes[(endpoint, direction)] = self._bytes.get((endpoint, direction), 0) + size
+            for phase, seconds in (timings or {}).items():
+                if seconds is None:
+                    continue
+                histogram = self._latency.get((endpoint, method, phase))
+                if histogram is None:
+                    histogram = self._latency[(endpoint, method, phase)] = Histogram()
+                histogram.observe(seconds)
+
+    def snapshot(self) -> Dict:
+        """
+        JSON-ready view of everything recorded
+
+        Returns:
+            {'time', 'uptime', 'endpoints': {'METHOD /path': {'requests', 'errors',
+             'signed', 'status', 'ret_codes', 'bytes_sent', 'bytes_received',
+             'connections_opened', 'latency_ms': {phase: {'p50', 'p95', 'p99', 'avg', 'max'}}}}}
+        """
+        with self._lock:
+            endpoints = {}
+
+            def entry(endpoint, method):
+                name = f"{method} {endpoint}"
+                if name not in endpoints:
+                    endpoints[name] = {'requests': 0, 'errors': 0, 'signed': False, 'status': {},
+                                       'ret_codes': {}, 'bytes_sent': 0, 'bytes_received': 0,
+                                       'connections_opened': 0, 'latency_ms': {}}
+                return endpoints[name]
+
+            for (endpoint, method, signed, status, ret_code), count in self._requests.items():
+                e = entry(endpoint, method)
+                e['requests'] += count
+                e['signed'] = e['signed'] or signed
+                if ret_code != 0:
+                    e['errors'] += count
+                e['status'][str(status)] = e['status'].get(str(status), 0) + count
+                e['ret_codes'][str(ret_code)] = e['ret_codes'].get(str(ret_code), 0) + count
+            for (endpoint, method, phase), histogram in self._latency.items():
+                e = entry(endpoint, method)
+                if phase == 'connect':
+                    e['connections_opened'] = histogram.count
+                stats = histogram.percentiles()
+                stats['avg'] = histogram.sum / histogram.count * 1000 if histogram.count else 0.0
+                stats['max'] = max(histogram.recent) * 1000 if histogram.recent else 0.0
+                e['latency_ms'][phase] = {k: round(v, 3) for k, v in stats.items()}
+            for name, e in endpoints.items():
+                endpoint = name.split(' ', 1)[1]
+                e['bytes_sent'] = self._bytes.get((endpoint, 'sent'), 0)
+                e['bytes_received'] = self._bytes.get((endpoint, 'received'), 0)
+
+        return {'time': time.time(), 'uptime': time.time() - self.started, 'endpoints': endpoints}
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition (version 0.0.4)"""
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_requests_total REST requests by endpoint, HTTP status and retCode",
+            f"# TYPE {p}_requests_total counter"
+        ]
+        with self._lock:
+            for (endpoint, method, signed, status, ret_code), count in sorted(self._requests.items(), key=str):
+                lines.append(f'{p}_requests_total{{endpoint="{endpoint}",method="{method}",'
+                             f'signed="{str(signed).lower()}",status="{status}",ret_code="{ret_code}"}} {count}')
+
+            lines += [f"# HELP {p}_request_bytes_total REST bytes by endpoint and direction",
+                      f"# TYPE {p}_request_bytes_total counter"]
+            for (endpoint, direction), size in sorted(self._bytes.items()):
+                lines.append(f'{p}_request_bytes_total{{endpoint="{endpoint}",direction="{direction}"}} {size}')
+
+            lines += [f"# HELP {p}_request_duration_seconds REST request time by endpoint and phase",
+                      f"# TYPE {p}_request_duration_seconds histogram"]
+            for (endpoint, method, phase), histogram in sorted(self._latency.items()):
+                labels = f'endpoint="{endpoint}",method="{method}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{p}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'{p}_request_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}')
+                lines.append(f'{p}_request_duration_seconds_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path: str):
+        """Write snapshot() to path (replaced atomically)"""
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+    def serve(self, port: int, host: str = '127.0.0.1'):
+        """Serve /metrics (Prometheus text) and /metrics.json in a background thread"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body = json.dumps(metrics.snapshot(), indent=2).encode('utf-8')
+                    content_type = 'application/json'
+                elif self.path.startswith('/metrics'):
+                    body = metrics.prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(f"📈 Metrics on http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server.server_address[1]
+
+    def start_snapshots(self, path: str, interval: float = 60.0):
+        """Write a JSON snapshot to path every interval seconds in a background thread"""
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.write_json(path)
+                except OSError as e:
+                    logger.warning(f"⚠️ Could not write metrics snapshot: {e}")
+
+        threading.Thread(target=loop, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,155 @@
+"""
+Parallel parameter sweep for the Twin Range Filter
+Backtests a grid of fast/slow periods and range multipliers over stored history
+"""
+
+import sys
+import json
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from twin_range_filter_lite import smooth_range
+from twin_range_filter_batch import filter_conditions_batch, entry_flags_batch
+from backtest_lite import Backtester, candles_to_columns
+
+# 50 x 50 x 10 x 10 grid around the default parameters
+DEFAULT_GRID = {
+    'twin_range_fast_period': list(range(10, 60)),
+    'twin_range_slow_period': list(range(30, 130, 2)),
+    'twin_range_fast_range': [round(0.8 + 0.2 * i, 1) for i in range(10)],
+    'twin_range_slow_range': [round(1.0 + 0.2 * i, 1) for i in range(10)]
+}
+
+# Per-process state, set once by _init_worker
+_worker = {}
+
+
+def build_smooth_cache(columns, periods):
+    """
+    Unscaled smooth range per (symbol, period)
+
+    The range multiplier only scales smooth_range output, so each
+    ema(ema(changes, period), 2 * period - 1) is computed once and reused for
+    every multiplier in the grid.
+    """
+    cache = {}
+    for symbol, col in columns.items():
+        closes = col['close']
+        cache[symbol] = {p: np.array(smooth_range(closes, p, 1.0)) for p in sorted(set(periods))}
+    return cache
+
+
+def _init_worker(columns, cache, config, fast_ranges, slow_ranges, backtest_options):
+    _worker['columns'] = columns
+    _worker['cache'] = cache
+    _worker['config'] = config
+    _worker['fast_ranges'] = fast_ranges
+    _worker['slow_ranges'] = slow_ranges
+    _worker['backtest_options'] = backtest_options
+
+
+def _evaluate_periods(periods):
+    """Backtest every range multiplier combination for one (fast, slow) period pair"""
+    fast_period, slow_period = periods
+    columns = _worker['columns']
+    cache = _worker['cache']
+    combos = list(itertools.product(_worker['fast_ranges'], _worker['slow_ranges']))
+    fast_range = np.array([c[0] for c in combos])
+    slow_range = np.array([c[1] for c in combos])
+    first_entry = max(fast_period, slow_period) * 2 - 2
+
+    # One vectorized filter run per symbol, one column per multiplier combo
+    flags = {}
+    for symbol, col in columns.items():
+        fast = cache[symbol][fast_period][:, None]
+        slow = cache[symbol][slow_period][:, None]
+        smrng = (fast * fast_range + slow * slow_range) / 2
+        src = np.repeat(np.asarray(col['close'], dtype=np.float64)[:, None], len(combos), axis=1)
+        cond = filter_conditions_batch(src, smrng)
+        flags[symbol] = entry_flags_batch(cond['long_cond'], cond['short_cond'], cond['cond_ini'], first_entry)
+
+    results = []
+    for k, (fr, sr) in enumerate(combos):
+        params = {
+            'twin_range_fast_period': fast_period,
+            'twin_range_fast_range': fr,
+            'twin_range_slow_period': slow_period,
+            'twin_range_slow_range': sr
+        }
+        config = dict(_worker['config'], **params)
+        series = {
+            symbol: {'long_entry': long_entry[:, k], 'short_entry': short_entry[:, k]}
+            for symbol, (long_entry, short_entry) in flags.items()
+        }
+        stats = Backtester(config, **_worker['backtest_options']).run(columns, series)['stats']
+        results.append(dict(params, **stats))
+
+    return results
+
+
+def rank_results(results):
+    """Sort by total return (highest first), then max drawdown (lowest first)"""
+    return sorted(results, key=lambda r: (-r['total_return_percent'], r['max_drawdown_percent']))
+
+
+def optimize(data, config, grid=None, workers=None, **backtest_options):
+    """
+    Run a parameter sweep
+
+    Args:
+        data: {symbol: candles or columns}, same as Backtester.run
+        config: Base bot config; swept keys are overridden per run
+        grid: {config key: [values]} for the four twin_range_* parameters
+        workers: Process count (default: CPU count)
+        backtest_options: Extra Backtester arguments (initial_balance, fee_rate, slippage)
+
+    Returns:
+        list of result dicts (parameters + backtest stats), ranked
+    """
+    grid = dict(DEFAULT_GRID, **(grid or {}))
+    columns = {}
+    for symbol, candles in data.items():
+        columns[symbol] = candles if isinstance(candles, dict) else candles_to_columns(candles)
+
+    fast_periods = grid['twin_range_fast_period']
+    slow_periods = grid['twin_range_slow_period']
+    cache = build_smooth_cache(columns, list(fast_periods) + list(slow_periods))
+    pairs = list(itertools.product(fast_periods, slow_periods))
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(columns, cache, config, grid['twin_range_fast_range'],
+                  grid['twin_range_slow_range'], backtest_options)
+    ) as pool:
+        for batch in pool.map(_evaluate_periods, pairs, chunksize=max(1, len(pairs) // 64)):
+            results.extend(batch)
+
+    return rank_results(results)
+
+
+def main():
+    """Usage: python optimizer_lite.py candles.json [mobile_config.json] [top_n]"""
+    if len(sys.argv) < 2:
+        print(main.__doc__)
+        return
+
+    with open(sys.argv[1], 'r') as f:
+        data = json.load(f)
+    with open(sys.argv[2] if len(sys.argv) > 2 else 'mobile_config.json', 'r') as f:
+        config = json.load(f)
+    top_n = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    for r in optimize(data, config)[:top_n]:
+        print(f"fast {r['twin_range_fast_period']}/{r['twin_range_fast_range']} "
+              f"slow {r['twin_range_slow_period']}/{r['twin_range_slow_range']} | "
+              f"return {r['total_return_percent']:.2f}% | "
+              f"drawdown {r['max_drawdown_percent']:.2f}% | "
+              f"trades {r['trades']}")
+
+
+if __name__ == "__main__":
+    main()
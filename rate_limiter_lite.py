@@ -0,0 +1,235 @@
+"""
+Lightweight client-side rate limiter for the Bybit V5 API
+Token buckets per endpoint group until the exchange reports a limit, then
+per endpoint synced from X-Bapi-Limit-* headers, with priority lanes so trading calls go before account and market polling
+"""
+
+import time
+import heapq
+import itertools
+import threading
+from typing import Dict, Optional
+
+# Priority lanes, lower goes first
+LANE_TRADE = 0      # Order placement, SL/TP
+LANE_ACCOUNT = 1    # Positions, leverage, wallet
+LANE_MARKET = 2     # Klines, tickers, instruments, server time
+LANE_NAMES = ('trade', 'account', 'market')
+
+# Endpoint prefix -> (group, default lane); the longest matching prefix wins
+ENDPOINT_GROUPS = {
+    '/v5/order/': ('order', LANE_TRADE),
+    '/v5/position/trading-stop': ('position_write', LANE_TRADE),
+    '/v5/position/set-leverage': ('position_write', LANE_ACCOUNT),
+    '/v5/position/switch-mode': ('position_write', LANE_ACCOUNT),
+    '/v5/position/list': ('position_read', LANE_ACCOUNT),
+    '/v5/account/': ('account', LANE_ACCOUNT),
+    '/v5/market/': ('market', LANE_MARKET)
+}
+
+# Requests per second per group until the exchange reports its own limit
+DEFAULT_GROUP_RATES = {
+    'order': 10,
+    'position_write': 10,
+    'position_read': 50,
+    'account': 50,
+    'market': 120,
+    'other': 10
+}
+
+# Bybit's per-IP limit covers every HTTP request: 600 per 5 seconds
+IP_CAPACITY = 600
+IP_RATE = 120
+
+# Share of the IP bucket each lane must leave for the lanes above it
+IP_RESERVE = {LANE_TRADE: 0.0, LANE_ACCOUNT: 0.05, LANE_MARKET: 0.10}
+
+
+def endpoint_group(endpoint: str):
+    """(group, default lane) for an endpoint path"""
+    best = None
+    for prefix, value in ENDPOINT_GROUPS.items():
+        if endpoint.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return ENDPOINT_GROUPS[best] if best else ('other', LANE_ACCOUNT)
+
+
+class TokenBucket:
+    """Refilling token bucket that can be corrected from exchange headers"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.throttled = 0          # times the exchange said we were out
+        self.waiting = []           # heap of (lane, seq) tickets queued on this bucket
+
+    def refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def available(self, now: float, reserve: float = 0.0) -> bool:
+        return now >= self.blocked_until and self.tokens >= 1 + reserve
+
+    def delay(self, now: float, reserve: float = 0.0) -> float:
+        """Seconds until available(reserve) can become true"""
+        wait = max(0.0, self.blocked_until - now)
+        missing = 1 + reserve - self.tokens
+        if missing > 0:
+            wait = max(wait, missing / self.rate)
+        return wait
+
+    def sync(self, now: float, remaining: int, limit: int = None, reset_in: float = None):
+        """Apply X-Bapi-Limit-Status / X-Bapi-Limit / X-Bapi-Limit-Reset-Timestamp"""
+        if limit:
+            self.capacity = float(limit)
+            self.rate = float(limit)    # Bybit limits are per one-second window
+        self.tokens = min(self.tokens, float(remaining))
+        if remaining <= 0:
+            self.block(now, reset_in)
+
+    def block(self, now: float, reset_in: float = None):
+        """Out of quota until the window resets (1 s when unknown)"""
+        self.tokens = 0.0
+        self.throttled += 1
+        self.blocked_until = max(self.blocked_until, now + (reset_in if reset_in and reset_in > 0 else 1.0))
+
+
+class RateLimiter:
+    """
+    Priority-aware limiter shared by every request thread
+
+    acquire() takes one token from the endpoint's bucket and one from the
+    shared IP bucket. Waiters on a bucket are served strictly by lane, then
+    arrival order; in the IP bucket lower lanes leave a reserve, so a burst
+    of market-data calls cannot use up the quota an order needs.
+
+    Bybit counts its limits per endpoint, so the group buckets only stand in
+    until an endpoint's first response: update() then gives that endpoint its
+    own bucket, synced from the headers, and a sibling's remaining quota
+    never resets or drains it.
+    """
+
+    def __init__(self, group_rates: Dict[str, float] = None):
+        rates = dict(DEFAULT_GROUP_RATES, **(group_rates or {}))
+        self.buckets = {group: TokenBucket(rate) for group, rate in rates.items()}
+        self.endpoint_buckets = {}
+        self.ip_bucket = TokenBucket(IP_RATE, IP_CAPACITY)
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._lanes = [{'queued': 0, 'max_queued': 0, 'requests': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+                       for _ in LANE_NAMES]
+
+    def acquire(self, endpoint: str, lane: int = None, timeout: float = None) -> Optional[float]:
+        """
+        Wait for a request slot
+
+        Args:
+            lane: Priority lane (default from ENDPOINT_GROUPS)
+            timeout: Give up after this many seconds
+
+        Returns:
+            seconds waited, or None if timeout expired first
+        """
+        group, default_lane = endpoint_group(endpoint)
+        lane = default_lane if lane is None else lane
+        reserve = IP_RESERVE.get(lane, 0.0) * self.ip_bucket.capacity
+        start = time.monotonic()
+        stats = self._lanes[lane]
+
+        with self._cond:
+            bucket = self.endpoint_buckets.get(endpoint) or self.buckets[group]
+            ticket = (lane, next(self._seq))
+            waiting = bucket.waiting
+            heapq.heappush(waiting, ticket)
+            stats['queued'] += 1
+            stats['max_queued'] = max(stats['max_queued'], stats['queued'])
+            try:
+                while True:
+                    now = time.monotonic()
+                    bucket.refill(now)
+                    self.ip_bucket.refill(now)
+                    if waiting[0] == ticket and bucket.available(now) and self.ip_bucket.available(now, reserve):
+                        bucket.tokens -= 1
+                        self.ip_bucket.tokens -= 1
+                        break
+
+                    wait = max(bucket.delay(now), self.ip_bucket.delay(now, reserve)) if waiting[0] == ticket else None
+                    if timeout is not None:
+                        remaining = start + timeout - now
+                        if remaining <= 0:
+                            return None
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                waiting.remove(ticket)
+                heapq.heapify(waiting)
+                stats['queued'] -= 1
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            stats['requests'] += 1
+            stats['wait_total'] += waited
+            stats['wait_max'] = max(stats['wait_max'], waited)
+            return waited
+
+    def update(self, endpoint: str, remaining=None, limit=None, reset_in: float = None, throttled: bool = False):
+        """
+        Feed one response back into the endpoint's own bucket
+
+        Args:
+            remaining/limit: X-Bapi-Limit-Status / X-Bapi-Limit header values
+            reset_in: Seconds until X-Bapi-Limit-Reset-Timestamp
+            throttled: The exchange rejected the call for rate limiting
+        """
+        if remaining is None and not throttled:
+            return
+        with self._cond:
+            now = time.monotonic()
+            bucket = self.endpoint_buckets.get(endpoint)
+            if bucket is None:
+                group, _ = endpoint_group(endpoint)
+                bucket = self.endpoint_buckets[endpoint] = TokenBucket(self.buckets[group].rate)
+            bucket.refill(now)
+            if remaining is not None:
+                bucket.sync(now, int(remaining), int(limit) if limit else None, reset_in)
+            if throttled:
+                bucket.block(now, reset_in)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        """
+        Queue depth and wait-time metrics
+
+        Returns:
+            {'lanes': {lane: {'queued', 'max_queued', 'requests', 'wait_avg_ms', 'wait_max_ms'}},
+             'groups': {group: {'tokens', 'capacity', 'queued', 'throttled'}},
+             'endpoints': {endpoint: same as groups}}
+        """
+        with self._cond:
+            now = time.monotonic()
+            lanes = {}
+            for name, stats in zip(LANE_NAMES, self._lanes):
+                lanes[name] = {
+                    'queued': stats['queued'],
+                    'max_queued': stats['max_queued'],
+                    'requests': stats['requests'],
+                    'wait_avg_ms': stats['wait_total'] / stats['requests'] * 1000 if stats['requests'] else 0.0,
+                    'wait_max_ms': stats['wait_max'] * 1000
+                }
+            buckets = {}
+            for kind, items in (('groups', list(self.buckets.items()) + [('ip', self.ip_bucket)]),
+                                ('endpoints', self.endpoint_buckets.items())):
+                buckets[kind] = {}
+                for name, bucket in items:
+                    bucket.refill(now)
+                    buckets[kind][name] = {
+                        'tokens': round(bucket.tokens, 2),
+                        'capacity': bucket.capacity,
+                        'queued': len(bucket.waiting),
+                        'throttled': bucket.throttled
+                    }
+            return {'lanes': lanes, **buckets}
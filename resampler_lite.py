@@ -0,0 +1,238 @@
+"""
+Lightweight multi-timeframe resampler
+Builds higher-timeframe OHLCV candles locally from one base-interval stream,
+so running the strategy on several timeframes costs one kline fetch per symbol
+"""
+
+import time
+import logging
+from collections import deque
+
+from bybit_client_lite import interval_to_ms
+from twin_range_filter_lite import calculate_signals
+
+logger = logging.getLogger(__name__)
+
+# Bybit weekly candles open on Monday 00:00 UTC, the epoch was a Thursday
+WEEK_OFFSET_MS = 4 * 86400000
+MAX_KLINE_LIMIT = 1000
+
+
+class CandleResampler:
+    """
+    Incrementally aggregates base candles into one higher timeframe
+
+    Closed base candles are folded into the current bucket; the bucket is
+    closed as soon as its last base candle closes (or the next bucket starts
+    if candles are missing). The forming base candle is only overlaid when
+    candles() is read, never committed.
+    """
+
+    def __init__(self, base_interval, target_interval, history=200):
+        self.base_ms = interval_to_ms(base_interval)
+        self.target_ms = interval_to_ms(target_interval)
+        if not self.base_ms or not self.target_ms:
+            raise ValueError(f"Unsupported interval {base_interval} -> {target_interval}")
+        if self.target_ms % self.base_ms:
+            raise ValueError(f"{target_interval} is not a multiple of {base_interval}")
+
+        self.target_interval = str(target_interval)
+        self.offset_ms = WEEK_OFFSET_MS if self.target_interval == 'W' else 0
+        self.closed = deque(maxlen=history)
+        self.partial = None       # [bucket, open, high, low, close, volume] from closed base candles
+        self.forming_base = None  # Latest forming base candle
+        self.next_bucket = None   # Buckets before this are already closed
+        self.last_base = None     # Timestamp of the last closed base candle folded in
+
+    def bucket(self, timestamp):
+        """Start timestamp of the target candle containing timestamp"""
+        return timestamp - ((timestamp - self.offset_ms) % self.target_ms)
+
+    def seed(self, candles):
+        """Load closed target-timeframe candles fetched directly from the exchange"""
+        for candle in candles:
+            self.closed.append(list(candle))
+        if self.closed:
+            self.next_bucket = self.closed[-1][0] + self.target_ms
+        self.partial = None
+
+    def _close_partial(self):
+        self.closed.append(self.partial)
+        self.next_bucket = self.partial[0] + self.target_ms
+        self.partial = None
+
+    def add_closed(self, candle):
+        """
+        Fold a closed base candle into the current bucket
+
+        Returns:
+            True if this completed a target candle
+        """
+        timestamp = int(candle[0])
+        self.last_base = timestamp
+        bucket = self.bucket(timestamp)
+        if self.next_bucket is not None and bucket < self.next_bucket:
+            return False
+
+        closed_any = False
+        if self.partial is not None and bucket != self.partial[0]:
+            # Base candles were missing at the end of the previous bucket
+            self._close_partial()
+            closed_any = True
+
+        if self.partial is None:
+            self.partial = [bucket, float(candle[1]), float(candle[2]), float(candle[3]),
+                            float(candle[4]), float(candle[5])]
+        else:
+            partial = self.partial
+            partial[2] = max(partial[2], float(candle[2]))
+            partial[3] = min(partial[3], float(candle[3]))
+            partial[4] = float(candle[4])
+            partial[5] += float(candle[5])
+
+        if timestamp + self.base_ms >= bucket + self.target_ms:
+            self._close_partial()
+            closed_any = True
+
+        return closed_any
+
+    def set_forming(self, candle):
+        """Replace the forming base candle (None to clear it)"""
+        self.forming_base = candle
+
+    def candles(self):
+        """Closed target candles plus the forming one, oldest first"""
+        candles = list(self.closed)
+        forming = self.partial[:] if self.partial is not None else None
+        base = self.forming_base
+
+        if base is not None and (self.last_base is None or base[0] > self.last_base):
+            bucket = self.bucket(int(base[0]))
+            if self.next_bucket is None or bucket >= self.next_bucket:
+                if forming is not None and forming[0] == bucket:
+                    forming[2] = max(forming[2], float(base[2]))
+                    forming[3] = min(forming[3], float(base[3]))
+                    forming[4] = float(base[4])
+                    forming[5] += float(base[5])
+                else:
+                    if forming is not None:
+                        # Base candles ended early in that bucket: it is closed
+                        candles.append(forming)
+                    forming = [bucket, float(base[1]), float(base[2]), float(base[3]),
+                               float(base[4]), float(base[5])]
+
+        if forming is not None:
+            candles.append(forming)
+        return candles
+
+
+class MultiTimeframeFeed:
+    """
+    One base kline stream per symbol, resampled into several timeframes
+
+    Each timeframe is seeded once with its own closed history. After that,
+    poll() makes a single base-interval request per symbol, covering only the
+    candles since the last one seen, and updates every timeframe from it.
+    """
+
+    def __init__(self, client, base_interval, timeframes, history=200):
+        self.client = client
+        self.base_interval = str(base_interval)
+        self.base_ms = interval_to_ms(base_interval)
+        self.timeframes = [str(tf) for tf in timeframes]
+        self.history = history
+        self.resamplers = {}      # symbol -> {timeframe: CandleResampler}
+        self.last_closed = {}     # symbol -> last closed base timestamp
+
+        for tf in self.timeframes:
+            ratio = (interval_to_ms(tf) or 0) // self.base_ms
+            if ratio >= MAX_KLINE_LIMIT:
+                raise ValueError(f"{tf} needs {ratio} base candles per bar, more than one request returns")
+
+    def seed(self, symbol):
+        """Load each timeframe's history and the base candles of every forming bucket"""
+        resamplers = {tf: CandleResampler(self.base_interval, tf, self.history) for tf in self.timeframes}
+        earliest = None
+        for tf, resampler in resamplers.items():
+            candles = self.client.get_klines(symbol, tf, limit=self.history)
+            if not candles:
+                logger.error(f"{symbol}: no {tf} history to seed")
+                return False
+            resampler.seed(candles[:-1])
+            forming_start = candles[-1][0]
+            earliest = forming_start if earliest is None else min(earliest, forming_start)
+
+        self.resamplers[symbol] = resamplers
+        self.last_closed[symbol] = None
+        limit = min(MAX_KLINE_LIMIT, self._bars_since(earliest) + 1)
+        candles = self.client.get_klines(symbol, self.base_interval, limit=limit, start=earliest)
+        return self.ingest(symbol, candles) is not None
+
+    def _bars_since(self, timestamp):
+        """Base candles from timestamp up to the forming one, inclusive"""
+        return max(0, (int(time.time() * 1000) - timestamp) // self.base_ms) + 1
+
+    def poll(self, symbol):
+        """
+        Fetch new base candles for a symbol and update every timeframe
+
+        Returns:
+            list of timeframes that closed a candle, or None on failure
+        """
+        if symbol not in self.resamplers:
+            if not self.seed(symbol):
+                return None
+            return list(self.timeframes)
+
+        last = self.last_closed[symbol]
+        if last is None:
+            candles = self.client.get_klines(symbol, self.base_interval, limit=2)
+        else:
+            limit = self._bars_since(last) + 1
+            if limit > MAX_KLINE_LIMIT:
+                # Too far behind to catch up with one request: reseed
+                del self.resamplers[symbol]
+                return self.poll(symbol)
+            candles = self.client.get_klines(symbol, self.base_interval, limit=limit, start=last)
+
+        return self.ingest(symbol, candles)
+
+    def ingest(self, symbol, candles):
+        """
+        Feed base candles (ascending, last one forming) to every timeframe
+
+        Returns:
+            list of timeframes that closed a candle, or None if candles is empty
+        """
+        if not candles:
+            return None
+
+        resamplers = self.resamplers[symbol]
+        last = self.last_closed[symbol]
+        closed = set()
+
+        for candle in candles[:-1]:
+            if last is not None and candle[0] <= last:
+                continue
+            for tf, resampler in resamplers.items():
+                if resampler.add_closed(candle):
+                    closed.add(tf)
+            last = candle[0]
+
+        self.last_closed[symbol] = last
+        forming = candles[-1]
+        if last is not None and forming[0] <= last:
+            forming = None
+        for resampler in resamplers.values():
+            resampler.set_forming(forming)
+
+        return [tf for tf in self.timeframes if tf in closed]
+
+    def candles(self, symbol, timeframe):
+        """Candles for calculate_signals: closed bars plus the forming one"""
+        resampler = self.resamplers.get(symbol, {}).get(str(timeframe))
+        return resampler.candles() if resampler else []
+
+    def signals(self, symbol, timeframe, **params):
+        """calculate_signals for one (symbol, timeframe) from the shared base stream"""
+        return calculate_signals(self.candles(symbol, timeframe), **params)
@@ -0,0 +1,171 @@
+"""
+Lightweight retry/backoff policies for Bybit V5 calls
+Classifies retCodes as retryable, ambiguous or fatal and retries with
+jittered exponential backoff under a per-operation deadline
+"""
+
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rejected before anything happened: always safe to send again
+# 10002 timestamp/recv_window, 10006 rate limit, 10429 system frequency protection
+RETRYABLE_CODES = frozenset([10002, 10006, 10429])
+
+# The request may or may not have been executed: only retried when idempotent
+# -1 network error / bad response (client side), 10000 server timeout, 10016 server error
+AMBIGUOUS_CODES = frozenset([-1, 10000, 10016])
+
+SUCCESS = 'success'
+RETRY = 'retry'
+FATAL = 'fatal'
+
+# Monotonic deadline of the innermost budget() on this thread
+_budget = threading.local()
+
+# Per-operation policies used by BybitClientLite
+DEFAULT_POLICIES = {
+    # Orders carry an orderLinkId, so a resend after an ambiguous failure
+    # cannot open a second position (Bybit answers 110072 instead)
+    'order': {'deadline': 3.0, 'max_attempts': 4, 'success_codes': (110072,)},
+    # 110001: the position created by the order is not visible yet
+    'trading_stop': {'deadline': 6.0, 'max_attempts': 8, 'base_delay': 0.1, 'retry_codes': (110001,)},
+    'position': {'deadline': 5.0, 'max_attempts': 4},
+    'read': {'deadline': 6.0, 'max_attempts': 3, 'base_delay': 1.0}
+}
+
+
+@contextmanager
+def budget(seconds: float):
+    """
+    Bound everything this thread does inside the block to seconds from now
+
+    BybitClientLite reads remaining() to cap its rate-limiter wait and
+    request timeout. Nested budgets can only shrink the outer one.
+    """
+    outer = getattr(_budget, 'deadline', None)
+    deadline = time.monotonic() + seconds
+    _budget.deadline = deadline if outer is None else min(outer, deadline)
+    try:
+        yield
+    finally:
+        _budget.deadline = outer
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in this thread's budget(), None outside one"""
+    deadline = getattr(_budget, 'deadline', None)
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+class RetryPolicy:
+    """
+    Retry one kind of operation until success, a fatal error or its deadline
+
+    Backoff doubles from base_delay up to max_delay; each delay is drawn
+    from [d/2, d] so clients that failed together do not retry together.
+    A retry is never started if its delay would end past the deadline, and
+    the calls themselves run inside budget(deadline), so the client cuts
+    each request's queue wait and timeout to what is left: one operation
+    cannot hold up the bot loop longer than its budget.
+    """
+
+    def __init__(self, name: str, deadline: float = 5.0, max_attempts: int = 5,
+                 base_delay: float = 0.2, max_delay: float = 2.0, idempotent: bool = True,
+                 retry_codes=(), success_codes=(), sleep: Callable = time.sleep):
+        """
+        Args:
+            name: Label for log messages
+            deadline: Seconds the whole operation may take, retries included
+            idempotent: Also retry ambiguous failures (request may have executed)
+            retry_codes: Extra retCodes that are retryable for this operation
+            success_codes: Extra retCodes that count as success
+        """
+        self.name = name
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.idempotent = idempotent
+        self.retry_codes = frozenset(retry_codes)
+        self.success_codes = frozenset(success_codes)
+        self.sleep = sleep
+        self._random = random.Random()
+
+    def classify(self, ret_code) -> str:
+        """SUCCESS, RETRY or FATAL for a retCode"""
+        if ret_code == 0 or ret_code in self.success_codes:
+            return SUCCESS
+        if ret_code in RETRYABLE_CODES or ret_code in self.retry_codes:
+            return RETRY
+        if ret_code in AMBIGUOUS_CODES:
+            return RETRY if self.idempotent else FATAL
+        return FATAL
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered delay before retry number attempt + 1"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay / 2 + self._random.uniform(0, delay / 2)
+
+    def _attempts(self, description, wait):
+        """Yield attempt numbers, sleeping between them while the budget allows"""
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            yield attempt
+            if attempt + 1 >= self.max_attempts:
+                logger.error(f"❌ {description}: giving up after {attempt + 1} attempts")
+                return
+            delay = self.backoff(attempt)
+            left = remaining()
+            if time.monotonic() + delay > start + self.deadline or (left is not None and delay >= left):
+                logger.error(f"❌ {description}: giving up, {self.deadline}s deadline reached")
+                return
+            wait(delay)
+            attempt += 1
+
+    def run(self, call: Callable[[], Dict], description: str = None, wait: Callable = None) -> Dict:
+        """
+        Call until the response is not retryable
+
+        Args:
+            call: Returns a V5 response dict
+            wait: Optional wait(seconds) used between attempts instead of
+                  sleeping, e.g. to wake up early on a stream event
+
+        Returns:
+            the last response
+        """
+        description = description or self.name
+        response = {}
+        with budget(self.deadline):
+            for attempt in self._attempts(description, wait or self.sleep):
+                response = call()
+                code = response.get('retCode')
+                if self.classify(code) != RETRY:
+                    return response
+                logger.warning(f"⚠️ {description}: {response.get('retMsg')} (Code: {code}), retrying")
+        return response
+
+    def until(self, call: Callable, description: str = None):
+        """
+        Call until it returns something truthy
+
+        Returns:
+            the first truthy result, or None when the budget ran out
+        """
+        description = description or self.name
+        with budget(self.deadline):
+            for attempt in self._attempts(description, self.sleep):
+                result = call()
+                if result:
+                    return result
+                logger.warning(f"⚠️ {description}: attempt {attempt + 1} failed, retrying")
+        return None
@@ -0,0 +1,72 @@
+"""
+Lightweight risk rules shared by the live bot and the backtester
+Position cap, sizing and leverage-scaled ROI stop loss / take profit
+"""
+
+# Default risk management values
+MAX_ACTIVE_POSITIONS = 3
+DEFAULT_LEVERAGE = 35
+DEFAULT_STOP_LOSS_PERCENT = 37
+DEFAULT_TAKE_PROFIT_PERCENT = 150
+
+
+def position_size_usd(wallet, config):
+    """Margin to commit for a new position (position_size_percent of the wallet)"""
+    return wallet * (config['position_size_percent'] / 100)
+
+
+def stop_loss_take_profit_prices(side, entry_price, leverage, config):
+    """
+    Calculate stop loss and take profit prices for a new position
+
+    IMPORTANT: Accounts for leverage! With 35x leverage, 1% price move = 35% ROI,
+    so the price move needed = ROI% / leverage.
+
+    Args:
+        side: 'Buy' (long) or 'Sell' (short)
+
+    Returns:
+        (stop_loss_price, take_profit_price), None for a disabled leg
+    """
+    stop_loss_price = None
+    take_profit_price = None
+
+    if config.get('enable_stop_loss', True):
+        sl_percent = config.get('stop_loss_percent', DEFAULT_STOP_LOSS_PERCENT)
+        price_move_percent = sl_percent / leverage
+        if side == 'Buy':
+            stop_loss_price = entry_price * (1 - price_move_percent / 100)
+        else:
+            # For SHORT: stop loss is ABOVE entry price (price goes up = loss)
+            stop_loss_price = entry_price * (1 + price_move_percent / 100)
+
+    if config.get('enable_take_profit', True):
+        tp_percent = config.get('take_profit_percent', DEFAULT_TAKE_PROFIT_PERCENT)
+        price_move_percent = tp_percent / leverage
+        if side == 'Buy':
+            take_profit_price = entry_price * (1 + price_move_percent / 100)
+        else:
+            # For SHORT: take profit is BELOW entry price (price goes down = profit)
+            take_profit_price = entry_price * (1 - price_move_percent / 100)
+
+    return stop_loss_price, take_profit_price
+
+
+def position_roi(side, entry_price, price, leverage):
+    """Return on margin in percent for a position at the given price"""
+    if side == 'Buy':
+        return ((price - entry_price) / entry_price) * leverage * 100
+    return ((entry_price - price) / entry_price) * leverage * 100
+
+
+def roi_exit_reason(roi, config):
+    """Return 'stop_loss', 'take_profit' or None for a position's ROI"""
+    if config.get('enable_stop_loss', True):
+        if roi <= -config.get('stop_loss_percent', DEFAULT_STOP_LOSS_PERCENT):
+            return 'stop_loss'
+
+    if config.get('enable_take_profit', True):
+        if roi >= config.get('take_profit_percent', DEFAULT_TAKE_PROFIT_PERCENT):
+            return 'take_profit'
+
+    return None
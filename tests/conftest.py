@@ -0,0 +1,35 @@
+"""
+Shared fixtures: a local fake Bybit exchange and a client pointed at it
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# bot_mobile_lite creates its data directory and log file on import
+os.environ.setdefault('APPDATA', tempfile.mkdtemp())
+
+from fake_bybit_lite import FakeExchange
+from bybit_client_lite import BybitClientLite
+
+API_KEY = 'test-key'
+API_SECRET = 'test-secret'
+
+
+@pytest.fixture
+def exchange():
+    exchange = FakeExchange(api_key=API_KEY, api_secret=API_SECRET).start()
+    yield exchange
+    exchange.stop()
+
+
+@pytest.fixture
+def client(exchange):
+    client = BybitClientLite(API_KEY, API_SECRET, base_url=exchange.url)
+    yield client
+    client.close()
@@ -0,0 +1,106 @@
+"""
+Backtester rules on hand-made candles and signals
+"""
+
+from array import array
+
+import pytest
+
+from backtest_lite import Backtester, candles_to_columns
+from twin_range_filter_lite import calculate_signal_series
+
+STEP = 60000
+CONFIG = {
+    'position_size_percent': 10,
+    'leverage': {},
+    'stop_loss_percent': 35,        # 1% price move at 35x
+    'take_profit_percent': 70,      # 2% price move at 35x
+    'twin_range_fast_period': 5, 'twin_range_fast_range': 1.2,
+    'twin_range_slow_period': 9, 'twin_range_slow_range': 2.5
+}
+
+
+def bars(rows):
+    """[(open, high, low, close), ...] -> candles one minute apart"""
+    return [[i * STEP, o, h, l, c, 1.0] for i, (o, h, l, c) in enumerate(rows)]
+
+
+def signals(n, longs=(), shorts=()):
+    long_entry = array('B', bytes(n))
+    short_entry = array('B', bytes(n))
+    for i in longs:
+        long_entry[i] = 1
+    for i in shorts:
+        short_entry[i] = 1
+    return {'long_entry': long_entry, 'short_entry': short_entry}
+
+
+def flat(n, price=100.0):
+    return [(price, price, price, price)] * n
+
+
+def run(data, series, **kwargs):
+    return Backtester(CONFIG, initial_balance=1000.0, fee_rate=0.0, **kwargs).run(data, series)
+
+
+def test_long_entry_then_stop_loss():
+    candles = bars(flat(3) + [(100, 100.5, 98.5, 99)] + flat(2, 99))
+    result = run({'A': candles}, {'A': signals(6, longs=[1])})
+
+    trade, = result['trades']
+    assert trade['side'] == 'Buy' and trade['entry_price'] == 100.0 and trade['entry_time'] == STEP
+    assert trade['reason'] == 'stop_loss' and trade['exit_price'] == pytest.approx(99.0)
+    assert trade['roi'] == pytest.approx(-35.0)
+    assert result['stats']['final_balance'] == pytest.approx(1000.0 + trade['pnl'])
+
+
+def test_stop_loss_wins_when_both_legs_hit_in_one_bar():
+    candles = bars(flat(2) + [(100, 103, 98, 100)])
+    trade, = run({'A': candles}, {'A': signals(3, longs=[0])})['trades']
+    assert trade['reason'] == 'stop_loss'
+
+
+def test_take_profit_for_short():
+    candles = bars(flat(2) + [(100, 100.2, 97.5, 98)])
+    trade, = run({'A': candles}, {'A': signals(3, shorts=[0])})['trades']
+    assert trade['side'] == 'Sell' and trade['reason'] == 'take_profit'
+    assert trade['exit_price'] == pytest.approx(98.0)
+
+
+def test_opposite_signal_flips_every_pair():
+    data = {'A': bars(flat(4)), 'B': bars(flat(4))}
+    series = {'A': signals(4, longs=[0]), 'B': signals(4, shorts=[2])}
+    trades = run(data, series)['trades']
+
+    assert [(t['symbol'], t['side'], t['reason']) for t in trades] == [
+        ('A', 'Buy', 'flip'), ('B', 'Sell', 'end_of_data')]
+    assert trades[0]['exit_time'] == 2 * STEP
+
+
+def test_position_cap():
+    data = {s: bars(flat(3)) for s in 'ABCD'}
+    series = {s: signals(3, longs=[1]) for s in 'ABCD'}
+    trades = run(data, series)['trades']
+    assert sorted(t['symbol'] for t in trades) == ['A', 'B', 'C']
+
+
+def test_fees_and_slippage_reduce_the_balance():
+    candles = bars(flat(3))
+    result = Backtester(CONFIG, initial_balance=1000.0, fee_rate=0.001, slippage=0.001).run(
+        {'A': candles}, {'A': signals(3, longs=[0])})
+    trade, = result['trades']
+    assert trade['entry_price'] == pytest.approx(100.1) and trade['exit_price'] == pytest.approx(99.9)
+    assert trade['fees'] > 0 and trade['pnl'] < 0
+    assert result['stats']['final_balance'] == pytest.approx(1000.0 + trade['pnl'])
+
+
+def test_computes_signals_like_calculate_signal_series():
+    closes = [100 + (i % 17) - (i % 5) * 0.7 for i in range(200)]
+    candles = bars([(c, c, c, c) for c in closes])
+    params = (5, 1.2, 9, 2.5)
+    series = calculate_signal_series(closes, *params)
+
+    result = run({'A': candles}, None)
+    assert result['trades']
+    assert result == run({'A': candles}, {'A': series})
+    assert run({'A': candles_to_columns(candles)}, None)['trades'] == run({'A': candles}, None)['trades']
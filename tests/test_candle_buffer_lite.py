@@ -0,0 +1,66 @@
+"""
+CandleBuffer window, compaction and forming-bar updates
+"""
+
+import pytest
+
+from candle_buffer_lite import CandleBuffer, COLUMNS
+
+
+def candle(i, close=None):
+    close = float(i) if close is None else close
+    return [i * 60000, close, close + 1, close - 1, close, 10.0 + i]
+
+
+def test_keeps_newest_capacity_bars_across_compactions():
+    buffer = CandleBuffer(capacity=4, slack=2)
+    for i in range(25):
+        buffer.append(candle(i))
+
+    assert len(buffer) == 4
+    assert buffer.to_list() == [candle(i) for i in range(21, 25)]
+    assert list(buffer.timestamps) == [i * 60000 for i in range(21, 25)]
+    assert list(buffer.closes) == [21.0, 22.0, 23.0, 24.0]
+    # Storage never grows past capacity + slack
+    assert all(len(column) == 6 for column in buffer._arrays)
+
+
+def test_columns_are_zero_copy_views():
+    buffer = CandleBuffer(capacity=3)
+    buffer.extend(candle(i) for i in range(3))
+
+    columns = buffer.columns()
+    assert set(columns) == set(COLUMNS)
+    assert all(isinstance(view, memoryview) for view in columns.values())
+
+    buffer.update_last(candle(2, close=50.0))
+    assert columns['close'][-1] == 50.0
+
+
+def test_push_overwrites_forming_bar_and_ignores_older():
+    buffer = CandleBuffer(capacity=3)
+    assert buffer.push(candle(1))
+    assert buffer.push(candle(2))
+    assert buffer.push(candle(2, close=7.5))
+    assert not buffer.push(candle(1, close=99.0))
+
+    assert len(buffer) == 2
+    assert buffer[-1][4] == 7.5
+    assert buffer[0][4] == 1.0
+    assert buffer.last_timestamp == 2 * 60000
+
+
+def test_empty_buffer():
+    buffer = CandleBuffer(capacity=2)
+    buffer.extend(candle(i) for i in range(3))
+    buffer.clear()
+
+    assert len(buffer) == 0
+    assert buffer.last_timestamp is None
+    assert buffer.to_list() == []
+    with pytest.raises(IndexError):
+        buffer.update_last(candle(0))
+    with pytest.raises(IndexError):
+        buffer[0]
+    with pytest.raises(ValueError):
+        CandleBuffer(capacity=0)
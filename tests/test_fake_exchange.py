@@ -0,0 +1,159 @@
+"""
+Order paths of BybitClientLite against the local fake exchange
+"""
+
+import time
+
+ENDPOINT_CREATE = '/v5/order/create'
+ENDPOINT_TRADING_STOP = '/v5/position/trading-stop'
+
+
+def open_position(client, symbol, side='Buy', usd=100, leverage=10, **kwargs):
+    qty = client.calculate_qty(symbol, usd, leverage)
+    response = client.place_order(symbol, side, qty, **kwargs)
+    assert response['retCode'] == 0
+    client.positions.invalidate()
+    return qty
+
+
+def test_place_order_attaches_sl_tp(client, exchange):
+    price = float(client.get_ticker('ETHUSDT')['lastPrice'])
+    open_position(client, 'ETHUSDT', stop_loss=price * 0.98, take_profit=price * 1.03)
+
+    position = client.positions.get('ETHUSDT')
+    assert position['side'] == 'Buy'
+    assert float(position['stopLoss']) == client.instruments.round_price('ETHUSDT', price * 0.98)
+    assert float(position['takeProfit']) == client.instruments.round_price('ETHUSDT', price * 1.03)
+    # Protected by the create-order request itself, no trading-stop fallback
+    assert ENDPOINT_TRADING_STOP not in exchange.requests
+
+
+def test_place_order_falls_back_to_trading_stop(client, exchange):
+    # A stop on the wrong side of the price is rejected by create-order
+    price = float(client.get_ticker('SOLUSDT')['lastPrice'])
+    qty = client.calculate_qty('SOLUSDT', 50, 10)
+    response = client.place_order('SOLUSDT', 'Sell', qty, stop_loss=price * 0.5)
+
+    assert response['retCode'] == 0
+    assert exchange.requests[ENDPOINT_TRADING_STOP] == 1
+    client.positions.invalidate()
+    assert float(client.positions.get('SOLUSDT')['size']) == qty
+
+
+def test_lost_order_response_is_not_placed_twice(client, exchange):
+    qty = client.calculate_qty('ETHUSDT', 100, 10)
+    exchange.inject(ENDPOINT_CREATE, code=10016, after=True)
+
+    response = client.place_order('ETHUSDT', 'Buy', qty)
+
+    assert response['retCode'] == 0
+    assert exchange.requests[ENDPOINT_CREATE] == 2
+    client.positions.invalidate()
+    assert float(client.positions.get('ETHUSDT')['size']) == qty
+
+
+def test_set_trading_stop_retries_until_position_is_visible(client, exchange):
+    open_position(client, 'BTCUSDT')
+    price = float(client.get_ticker('BTCUSDT')['lastPrice'])
+    exchange.inject(ENDPOINT_TRADING_STOP, code=110001, count=3)
+
+    assert client.set_trading_stop('BTCUSDT', stop_loss=price * 0.9)
+
+    client.positions.invalidate()
+    assert float(client.positions.get('BTCUSDT')['stopLoss']) == client.instruments.round_price('BTCUSDT', price * 0.9)
+    assert client.request_stats()['endpoints']['POST ' + ENDPOINT_TRADING_STOP]['requests'] == 4
+
+
+def test_set_trading_stop_gives_up_on_fatal_error(client):
+    # No position: 10001 is not retried
+    assert not client.set_trading_stop('BTCUSDT', stop_loss=1.0)
+    assert client.request_stats()['endpoints']['POST ' + ENDPOINT_TRADING_STOP]['requests'] == 1
+
+
+def test_place_orders_returns_per_order_results(client, exchange):
+    eth = open_position(client, 'ETHUSDT')
+    sol = open_position(client, 'SOLUSDT')
+
+    results = client.place_orders([
+        {'symbol': 'ETHUSDT', 'side': 'Sell', 'qty': eth, 'reduce_only': True},
+        {'symbol': 'SOLUSDT', 'side': 'Sell', 'qty': sol, 'reduce_only': True},
+        {'symbol': 'BTCUSDT', 'side': 'Sell', 'qty': 0.01, 'reduce_only': True}
+    ])
+
+    assert [r['symbol'] for r in results] == ['ETHUSDT', 'SOLUSDT', 'BTCUSDT']
+    assert [r['retCode'] for r in results[:2]] == [0, 0]
+    assert results[2]['retCode'] == 110017
+    assert exchange.requests['/v5/order/create-batch'] == 1
+    client.positions.invalidate()
+    assert client.positions.count() == 0
+
+
+def test_place_orders_lost_response_is_not_placed_twice(client, exchange):
+    eth = open_position(client, 'ETHUSDT')
+    exchange.inject('/v5/order/create-batch', code=10016, after=True)
+
+    results = client.place_orders([{'symbol': 'ETHUSDT', 'side': 'Sell', 'qty': eth, 'reduce_only': True}])
+
+    assert results[0]['retCode'] == 0
+    client.positions.invalidate()
+    assert client.positions.count() == 0
+
+
+def test_order_retries_stay_within_deadline(client, exchange):
+    qty = client.calculate_qty('ETHUSDT', 100, 10)
+    client.clock.sync()
+    exchange.latency = 5.0
+
+    start = time.monotonic()
+    response = client.place_order('ETHUSDT', 'Buy', qty)
+    elapsed = time.monotonic() - start
+
+    exchange.latency = 0.0
+    assert response['retCode'] == -1
+    assert elapsed < client.retry['order'].deadline + 0.5
+
+
+def test_set_leverage_halves_on_insufficient_margin(client, exchange):
+    exchange.inject('/v5/position/set-leverage', code=110012, count=2)
+
+    assert client.set_leverage('ETHUSDT', 48)
+    assert exchange.leverage['ETHUSDT'] == 12
+
+
+def test_set_leverage_steps_share_one_deadline(client, exchange):
+    client.clock.sync()
+    exchange.inject('/v5/position/set-leverage', code=110012, count=10)
+    exchange.latency = 2.0
+
+    start = time.monotonic()
+    result = client.set_leverage('ETHUSDT', 40)
+    elapsed = time.monotonic() - start
+
+    exchange.latency = 0.0
+    assert not result
+    assert elapsed < client.retry['position'].deadline + 0.5
+
+
+def test_params_error_about_sl_falls_back_to_trading_stop(client, exchange):
+    price = float(client.get_ticker('ETHUSDT')['lastPrice'])
+    qty = client.calculate_qty('ETHUSDT', 100, 10)
+    exchange.inject(ENDPOINT_CREATE, code=10001,
+                    message="params error: StopLoss set for Buy position should lower than base_price")
+
+    response = client.place_order('ETHUSDT', 'Buy', qty, stop_loss=price * 0.98)
+
+    assert response['retCode'] == 0
+    assert exchange.requests[ENDPOINT_TRADING_STOP] == 1
+
+
+def test_other_params_error_is_not_resent_without_sl(client, exchange):
+    price = float(client.get_ticker('ETHUSDT')['lastPrice'])
+    qty = client.calculate_qty('ETHUSDT', 100, 10)
+    exchange.inject(ENDPOINT_CREATE, code=10001, message="params error: qty invalid")
+
+    response = client.place_order('ETHUSDT', 'Buy', qty, stop_loss=price * 0.98)
+
+    assert response['retCode'] == 10001
+    assert client.request_stats()['endpoints']['POST ' + ENDPOINT_CREATE]['requests'] == 1
+    client.positions.invalidate()
+    assert client.positions.count() == 0
@@ -0,0 +1,79 @@
+"""
+Per-symbol indicator checkpoints saved and resumed by LiteMobileBot
+"""
+
+import json
+
+from bot_mobile_lite import LiteMobileBot
+from twin_range_filter_lite import TwinRangeFilterState
+
+PARAMS = (5, 1.2, 9, 2.5)
+
+
+def make_bot(tmp_path, timeframe='60', params=PARAMS, pairs=('BTCUSDT', 'ETHUSDT')):
+    bot = object.__new__(LiteMobileBot)
+    bot.config = {
+        'timeframe': timeframe,
+        'twin_range_fast_period': params[0], 'twin_range_fast_range': params[1],
+        'twin_range_slow_period': params[2], 'twin_range_slow_range': params[3]
+    }
+    bot.pairs = list(pairs)
+    bot.last_signals = {pair: 'none' for pair in pairs}
+    bot.filter_states = {}
+    bot.state_file = str(tmp_path / 'bot_state.json')
+    return bot
+
+
+def candles(n, start=100.0):
+    return [[i * 3600000, 0, 0, 0, start + (i % 7) - (i % 3) * 1.5, 0] for i in range(n)]
+
+
+def saved_bot(tmp_path):
+    bot = make_bot(tmp_path)
+    bot.filter_states['BTCUSDT'] = TwinRangeFilterState.from_candles(candles(40), *PARAMS)
+    bot.last_signals['BTCUSDT'] = 'long'
+    bot.save_state()
+    return bot
+
+
+def test_checkpoint_resumes_identical_state(tmp_path):
+    saved = saved_bot(tmp_path)
+    bot = make_bot(tmp_path)
+    bot.load_state()
+
+    assert bot.last_signals['BTCUSDT'] == 'long'
+    assert bot.filter_states['BTCUSDT'].to_dict() == saved.filter_states['BTCUSDT'].to_dict()
+    following = [41 * 3600000, 0, 0, 0, 103.0, 0]
+    assert bot.filter_states['BTCUSDT'].peek(following) == saved.filter_states['BTCUSDT'].peek(following)
+
+
+def test_checkpoint_ignored_for_other_timeframe_or_params(tmp_path):
+    saved_bot(tmp_path)
+
+    other_timeframe = make_bot(tmp_path, timeframe='15')
+    other_timeframe.load_state()
+    assert other_timeframe.filter_states == {}
+
+    other_params = make_bot(tmp_path, params=(27, 1.6, 55, 2.0))
+    other_params.load_state()
+    assert other_params.filter_states == {}
+
+
+def test_checkpoint_skips_symbols_no_longer_traded(tmp_path):
+    saved_bot(tmp_path)
+    bot = make_bot(tmp_path, pairs=('ETHUSDT',))
+    bot.load_state()
+    assert bot.filter_states == {}
+
+
+def test_corrupt_checkpoint_is_ignored(tmp_path):
+    bot = make_bot(tmp_path)
+    with open(bot.state_file, 'w') as f:
+        f.write('{not json')
+    bot.load_state()
+    assert bot.filter_states == {} and bot.last_signals['BTCUSDT'] == 'none'
+
+    with open(bot.state_file, 'w') as f:
+        json.dump({'timeframe': '60', 'indicators': {'BTCUSDT': {'params': list(PARAMS)}}}, f)
+    bot.load_state()
+    assert bot.filter_states == {}
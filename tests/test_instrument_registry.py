@@ -0,0 +1,90 @@
+"""
+InstrumentRegistry bulk loading, persistence and lookup backoffs
+"""
+
+from bybit_client_lite import BybitClientLite, InstrumentRegistry
+from fake_bybit_lite import default_instrument
+
+from conftest import API_KEY, API_SECRET
+
+ENDPOINT = '/v5/market/instruments-info'
+
+
+class Instruments:
+    """Stub fetchers counting their calls"""
+
+    def __init__(self, symbols):
+        self.listed = {symbol: default_instrument(symbol, 100.0) for symbol in symbols}
+        self.fail = False
+        self.all_calls = 0
+        self.one_calls = 0
+
+    def fetch_all(self):
+        self.all_calls += 1
+        return None if self.fail else list(self.listed.values())
+
+    def fetch_one(self, symbol):
+        self.one_calls += 1
+        return self.listed.get(symbol, {})
+
+
+def test_quantities_come_from_one_bulk_load(client, exchange):
+    for usd in (50, 100, 250):
+        for symbol in ('BTCUSDT', 'ETHUSDT', 'SOLUSDT'):
+            qty = client.calculate_qty(symbol, usd, 10)
+            step = client.instruments.get(symbol)['qty_step']
+            assert qty > 0
+            assert abs(qty / step - round(qty / step)) < 1e-6
+
+    assert exchange.requests[ENDPOINT] == 1
+    assert client.get_max_leverage('BTCUSDT') == 50
+
+
+def test_restart_loads_specs_from_cache_file(exchange, tmp_path):
+    cache = str(tmp_path / 'instruments.json')
+    first = BybitClientLite(API_KEY, API_SECRET, base_url=exchange.url, instrument_cache=cache)
+    spec = first.instruments.get('ETHUSDT')
+    first.close()
+
+    second = BybitClientLite(API_KEY, API_SECRET, base_url=exchange.url, instrument_cache=cache)
+    try:
+        assert second.instruments.is_fresh()
+        assert second.instruments.get('ETHUSDT') == spec
+        assert exchange.requests[ENDPOINT] == 1
+    finally:
+        second.close()
+
+
+def test_missing_symbol_is_looked_up_once_per_backoff():
+    source = Instruments(['BTCUSDT'])
+    registry = InstrumentRegistry(source.fetch_all, fetch_one=source.fetch_one)
+
+    assert registry.get('NEWUSDT') is None
+    assert registry.get('NEWUSDT') is None
+    assert source.one_calls == 1
+
+    # Listed after the bulk load: found on its own once the backoff is over
+    source.listed['NEWUSDT'] = default_instrument('NEWUSDT', 2.0)
+    registry._missing['NEWUSDT'] = 0.0
+    assert registry.get('NEWUSDT')['qty_step'] == 1.0
+    assert registry.get('NEWUSDT') is not None
+    assert source.one_calls == 2
+    assert source.all_calls == 1
+
+
+def test_failed_reload_keeps_specs_and_backs_off():
+    source = Instruments(['BTCUSDT'])
+    registry = InstrumentRegistry(source.fetch_all, ttl=0.0)
+    assert registry.get('BTCUSDT') is not None
+
+    source.fail = True
+    registry.invalidate()
+    for _ in range(3):
+        assert registry.get('BTCUSDT') is not None
+    assert source.all_calls == 2
+
+    # A rejected order invalidates the registry, which reloads right away
+    source.fail = False
+    registry.invalidate()
+    assert registry.get('BTCUSDT') is not None
+    assert source.all_calls == 3
@@ -0,0 +1,123 @@
+"""
+KlineCache incremental sync, backfills and reloads against a scripted client
+"""
+
+import types
+
+import pytest
+
+import kline_cache_lite
+from kline_cache_lite import KlineCache
+
+STEP = 60000
+
+
+class Klines:
+    """Stub client serving one-minute bars up to the bar forming at clock.now"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.offset = 0         # shifts the next response off the bar grid
+        self.calls = []
+
+    def fetch_klines_into(self, buffer, symbol, interval, limit=200, start=None, end=None):
+        self.calls.append({'limit': limit, 'start': start, 'end': end})
+        forming = self.clock.now // STEP * STEP
+        if start is None:
+            first = forming - (limit - 1) * STEP
+        else:
+            first = start
+        last = min(forming, end if end is not None else forming, first + (limit - 1) * STEP)
+        changed = 0
+        for ts in range(first, last + 1, STEP):
+            ts += self.offset
+            close = ts / STEP + (0.5 if ts == forming else 0.0)
+            if buffer.push([ts, close, close + 1, close - 1, close, 1.0]):
+                changed += 1
+        self.offset = 0
+        return changed
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=1_700_000_000_000 // STEP * STEP + 1000)
+    monkeypatch.setattr(kline_cache_lite, 'time', types.SimpleNamespace(time=lambda: clock.now / 1000))
+    return clock
+
+
+def contiguous(candles):
+    return all(b[0] - a[0] == STEP for a, b in zip(candles, candles[1:]))
+
+
+def test_incremental_sync_overwrites_forming_bar(clock):
+    client = Klines(clock)
+    cache = KlineCache(client, capacity=50)
+    assert cache.sync('BTCUSDT', '1')
+    forming = cache.candles('BTCUSDT', '1')[-1][0]
+    assert client.calls[-1] == {'limit': 50, 'start': None, 'end': None}
+
+    clock.now += STEP
+    assert cache.sync('BTCUSDT', '1')
+
+    candles = cache.candles('BTCUSDT', '1')
+    assert len(candles) == 50 and contiguous(candles)
+    assert client.calls[-1]['start'] == forming and client.calls[-1]['end'] is None
+    # The old forming bar got its final values, the new one is forming
+    assert candles[-2][0] == forming and candles[-2][4] == forming / STEP
+    assert cache.last_closed('BTCUSDT', '1') == forming
+    assert cache.stats() == {'requests': 2, 'candles': 52, 'reloads': 1, 'backfills': 0}
+
+
+def test_gap_is_backfilled_in_one_request(clock):
+    client = Klines(clock)
+    cache = KlineCache(client, capacity=50)
+    cache.sync('BTCUSDT', '1')
+
+    clock.now += 10 * STEP
+    assert cache.sync('BTCUSDT', '1')
+
+    candles = cache.candles('BTCUSDT', '1')
+    assert len(candles) == 50 and contiguous(candles)
+    assert candles[-1][0] == clock.now // STEP * STEP
+    assert client.calls[-1]['limit'] == 12
+    assert cache.stats()['backfills'] == 1 and cache.stats()['reloads'] == 1
+
+
+def test_gap_longer_than_window_reloads(clock):
+    client = Klines(clock)
+    cache = KlineCache(client, capacity=50)
+    cache.sync('BTCUSDT', '1')
+
+    clock.now += 60 * STEP
+    assert cache.sync('BTCUSDT', '1')
+
+    assert client.calls[-1] == {'limit': 50, 'start': None, 'end': None}
+    assert cache.stats()['reloads'] == 2
+    assert contiguous(cache.candles('BTCUSDT', '1'))
+
+
+def test_misaligned_response_reloads(clock):
+    client = Klines(clock)
+    cache = KlineCache(client, capacity=50)
+    cache.sync('BTCUSDT', '1')
+
+    clock.now += 2 * STEP
+    client.offset = STEP // 2
+    assert cache.sync('BTCUSDT', '1')
+
+    candles = cache.candles('BTCUSDT', '1')
+    assert len(client.calls) == 3 and client.calls[-1]['start'] is None
+    assert len(candles) == 50 and contiguous(candles)
+    assert candles[-1][0] == clock.now // STEP * STEP
+
+
+def test_newest_rest_row_is_never_closed(clock):
+    client = Klines(clock)
+    cache = KlineCache(client, capacity=50)
+    cache.sync('BTCUSDT', '1')
+    newest = cache.candles('BTCUSDT', '1')[-1][0]
+
+    # The local clock passing the bar's end does not make the fetched row final
+    clock.now += 5 * STEP
+    assert cache.last_closed('BTCUSDT', '1') == newest - STEP
+    assert cache.last_closed('ETHUSDT', '1') is None
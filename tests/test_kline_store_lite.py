@@ -0,0 +1,134 @@
+"""
+KlineStore writes and HistoryDownloader paging, gaps and listing detection
+"""
+
+import pytest
+
+from kline_store_lite import KlineStore, HistoryDownloader, PAGE_SIZE
+
+STEP = 60000
+BASE = 1_600_000_000_000 // STEP * STEP
+
+
+def candle(i, close=None):
+    close = float(i) if close is None else close
+    return [BASE + i * STEP, close, close + 1, close - 1, close, 1.0]
+
+
+def stored(store, symbol='BTCUSDT'):
+    with store.open(symbol, '1') as series:
+        return list(series.timestamps), list(series.closes)
+
+
+class CountingStore(KlineStore):
+    def __init__(self, root):
+        super().__init__(root)
+        self.writes = 0
+
+    def write(self, symbol, interval, candles):
+        self.writes += 1
+        return super().write(symbol, interval, candles)
+
+
+class Klines:
+    """Stub client serving one-minute candles at the given indices, newest `limit` per request"""
+
+    def __init__(self, indices):
+        self.timestamps = [BASE + i * STEP for i in sorted(indices)]
+        self.fail = set()   # page starts answered with [] once
+        self.requests = 0
+
+    def get_klines(self, symbol, interval, limit=200, start=None, end=None):
+        self.requests += 1
+        if start in self.fail:
+            self.fail.discard(start)
+            return []
+        rows = [ts for ts in self.timestamps if (start is None or ts >= start) and (end is None or ts <= end)]
+        return [[ts, 1.0, 2.0, 0.5, float((ts - BASE) // STEP), 1.0] for ts in rows[-limit:]]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CountingStore(str(tmp_path))
+
+
+def test_write_appends_in_place(store):
+    assert store.write('BTCUSDT', '1', [candle(i) for i in range(10)]) == 10
+    capacity = store._header(store.path('BTCUSDT', '1'))[1]
+
+    assert store.write('BTCUSDT', '1', [candle(i) for i in range(10, 15)]) == 5
+
+    assert store._header(store.path('BTCUSDT', '1'))[1] == capacity
+    timestamps, closes = stored(store)
+    assert timestamps == [BASE + i * STEP for i in range(15)]
+    assert closes == [float(i) for i in range(15)]
+
+
+def test_write_prepends_and_clears_listing(store):
+    store.write('BTCUSDT', '1', [candle(i) for i in range(5, 10)])
+    store.mark_listing('BTCUSDT', '1')
+
+    assert store.write('BTCUSDT', '1', [candle(i) for i in reversed(range(5))]) == 5
+
+    info = store.info('BTCUSDT', '1')
+    assert info == {'count': 10, 'first': BASE, 'last': BASE + 9 * STEP, 'listing': False}
+    assert stored(store)[0] == [BASE + i * STEP for i in range(10)]
+
+
+def test_write_overlap_keeps_stored_candles(store):
+    store.write('BTCUSDT', '1', [candle(i) for i in range(0, 10, 2)])
+
+    added = store.write('BTCUSDT', '1', [candle(i, close=-1.0) for i in range(12)])
+
+    assert added == 7
+    timestamps, closes = stored(store)
+    assert timestamps == [BASE + i * STEP for i in range(12)]
+    assert closes[0:10:2] == [0.0, 2.0, 4.0, 6.0, 8.0]
+    assert closes[1:10:2] == [-1.0] * 5
+    assert store.write('BTCUSDT', '1', [candle(3)]) == 0
+
+
+def test_fresh_download_stops_at_listing(store):
+    client = Klines(range(500, 12000))
+    downloader = HistoryDownloader(client, store, workers=2)
+    try:
+        result = downloader.download('BTCUSDT', '1', BASE, end=BASE + 11999 * STEP)
+    finally:
+        downloader.close()
+
+    assert result['complete'] and result['count'] == 11500
+    assert store.info('BTCUSDT', '1')['listing']
+    assert stored(store)[0] == [BASE + i * STEP for i in range(500, 12000)]
+    # Older batches are held back until they outnumber the stored candles
+    assert store.writes < 12000 // (PAGE_SIZE * 2)
+
+
+def test_gap_is_not_taken_for_listing(store):
+    # Exchange outage from 3500 to 5200, spanning a page boundary
+    client = Klines(list(range(0, 3500)) + list(range(5200, 9000)))
+    downloader = HistoryDownloader(client, store, workers=2)
+    try:
+        result = downloader.download('BTCUSDT', '1', BASE + 1000 * STEP, end=BASE + 8999 * STEP)
+    finally:
+        downloader.close()
+
+    assert result['complete'] and result['count'] == 8000 - 1700
+    info = store.info('BTCUSDT', '1')
+    assert info['first'] == BASE + 1000 * STEP and not info['listing']
+
+
+def test_failed_page_resumes(store):
+    client = Klines(range(0, 6000))
+    client.fail.add(BASE + 1000 * STEP)
+    downloader = HistoryDownloader(client, store, workers=2)
+    try:
+        first = downloader.download('BTCUSDT', '1', BASE, end=BASE + 5999 * STEP)
+        assert not first['complete']
+        assert first['last'] == BASE + 5999 * STEP and first['first'] > BASE + 1000 * STEP
+
+        second = downloader.download('BTCUSDT', '1', BASE, end=BASE + 5999 * STEP)
+    finally:
+        downloader.close()
+
+    assert second['complete'] and second['count'] == 6000
+    assert stored(store)[0] == [BASE + i * STEP for i in range(6000)]
@@ -0,0 +1,79 @@
+"""
+RequestMetrics snapshots, Prometheus export and the client's instrumentation
+"""
+
+import json
+import urllib.request
+
+import pytest
+
+from metrics_lite import RequestMetrics, Histogram
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000)
+
+    assert histogram.count == 100
+    assert histogram.percentiles() == pytest.approx({'p50': 51.0, 'p95': 96.0, 'p99': 100.0})
+    assert Histogram().percentiles() == {}
+
+
+def test_snapshot_counts_and_latencies():
+    metrics = RequestMetrics()
+    metrics.record('/v5/order/create', 'POST', True, 200, 0, sent=100, received=300,
+                   timings={'total': 0.05, 'queue': 0.001, 'connect': None})
+    metrics.record('/v5/order/create', 'POST', True, 200, 110007, sent=100, received=200,
+                   timings={'total': 0.03, 'connect': 0.02})
+    metrics.record('/v5/order/create', 'POST', True, 0, -1)
+
+    entry = metrics.snapshot()['endpoints']['POST /v5/order/create']
+    assert entry['requests'] == 3 and entry['errors'] == 2 and entry['signed']
+    assert entry['status'] == {'200': 2, '0': 1}
+    assert entry['ret_codes'] == {'0': 1, '110007': 1, '-1': 1}
+    assert entry['bytes_sent'] == 200 and entry['bytes_received'] == 500
+    assert entry['connections_opened'] == 1
+    assert entry['latency_ms']['total']['max'] == pytest.approx(50.0)
+    assert entry['latency_ms']['total']['avg'] == pytest.approx(40.0)
+
+
+def test_prometheus_text():
+    metrics = RequestMetrics()
+    metrics.record('/v5/market/kline', 'GET', False, 200, 0, timings={'total': 0.02})
+
+    text = metrics.prometheus()
+    assert ('bybit_requests_total{endpoint="/v5/market/kline",method="GET",signed="false",'
+            'status="200",ret_code="0"} 1') in text
+    labels = 'endpoint="/v5/market/kline",method="GET",phase="total"'
+    assert f'bybit_request_duration_seconds_bucket{{{labels},le="0.01"}} 0' in text
+    assert f'bybit_request_duration_seconds_bucket{{{labels},le="0.025"}} 1' in text
+    assert f'bybit_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f'bybit_request_duration_seconds_count{{{labels}}} 1' in text
+
+
+def test_serve_exposes_both_formats():
+    metrics = RequestMetrics()
+    metrics.record('/v5/market/tickers', 'GET', False, 200, 0, timings={'total': 0.01})
+    port = metrics.serve(0)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+            assert response.headers['Content-Type'].startswith('text/plain')
+            assert 'bybit_requests_total' in response.read().decode()
+        with urllib.request.urlopen(f"{base}/metrics.json", timeout=5) as response:
+            assert 'GET /v5/market/tickers' in json.load(response)['endpoints']
+    finally:
+        metrics.stop()
+
+
+def test_client_records_every_request(client):
+    client.clock.sync()
+    client.get_ticker('BTCUSDT')
+
+    endpoints = client.request_stats()['endpoints']
+    time_entry = endpoints['GET /v5/market/time']
+    assert time_entry['requests'] >= 1 and time_entry['errors'] == 0
+    ticker = endpoints['GET /v5/market/tickers']
+    assert ticker['requests'] == 1 and ticker['ret_codes'] == {'0': 1}
+    assert set(ticker['latency_ms']) >= {'total', 'queue', 'server', 'parse'}
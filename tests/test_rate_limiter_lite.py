@@ -0,0 +1,73 @@
+"""
+RateLimiter lanes and per-endpoint header sync
+"""
+
+import threading
+import time
+
+from rate_limiter_lite import RateLimiter, LANE_TRADE, LANE_MARKET
+
+CREATE = '/v5/order/create'
+CANCEL = '/v5/order/cancel'
+
+
+def test_trade_lane_goes_before_queued_market_calls():
+    limiter = RateLimiter({'market': 5})
+    for _ in range(5):
+        assert limiter.acquire('/v5/market/tickers') is not None
+
+    order = []
+    threads = []
+    for i in range(3):
+        thread = threading.Thread(target=lambda i=i: order.append(
+            ('market', i) if limiter.acquire('/v5/market/kline') is not None else None))
+        thread.start()
+        threads.append(thread)
+    time.sleep(0.05)
+    # Sent on the market endpoint's lane override, so it shares its bucket
+    thread = threading.Thread(target=lambda: order.append(
+        ('trade', 0) if limiter.acquire('/v5/market/kline', lane=LANE_TRADE) is not None else None))
+    thread.start()
+    threads.append(thread)
+    for thread in threads:
+        thread.join(5)
+
+    assert order[0] == ('trade', 0)
+    assert sorted(order[1:]) == [('market', 0), ('market', 1), ('market', 2)]
+    stats = limiter.stats()['lanes']
+    assert stats['trade']['requests'] == 1 and stats['market']['requests'] == 8
+    assert stats['market']['max_queued'] >= 3
+
+
+def test_acquire_gives_up_after_timeout():
+    limiter = RateLimiter()
+    limiter.update(CREATE, remaining=0, limit=10, reset_in=5.0)
+
+    start = time.monotonic()
+    assert limiter.acquire(CREATE, timeout=0.1) is None
+    assert time.monotonic() - start < 1.0
+
+
+def test_headers_only_sync_their_own_endpoint():
+    limiter = RateLimiter()
+    limiter.update(CREATE, remaining=0, limit=20, reset_in=5.0)
+    limiter.update(CANCEL, remaining=19, limit=20)
+
+    stats = limiter.stats()
+    assert stats['endpoints'][CREATE]['tokens'] == 0.0
+    assert stats['endpoints'][CREATE]['throttled'] == 1
+    assert stats['endpoints'][CANCEL]['capacity'] == 20.0
+    # The cancel headers did not refill create, and create's block does not stop cancel
+    assert limiter.acquire(CREATE, timeout=0.1) is None
+    assert limiter.acquire(CANCEL, timeout=0.1) is not None
+    # Endpoints that never reported still use their group's default
+    assert limiter.acquire('/v5/order/amend', timeout=0.1) is not None
+    assert stats['groups']['order']['throttled'] == 0
+
+
+def test_throttled_response_blocks_the_endpoint():
+    limiter = RateLimiter()
+    limiter.update('/v5/market/kline', throttled=True, reset_in=5.0)
+
+    assert limiter.acquire('/v5/market/kline', lane=LANE_MARKET, timeout=0.1) is None
+    assert limiter.acquire('/v5/market/tickers', timeout=0.1) is not None
@@ -0,0 +1,62 @@
+"""
+calculate_signal_series entry flags against calculate_signals
+"""
+
+import random
+from array import array
+
+import pytest
+
+from twin_range_filter_lite import calculate_signal_series, calculate_signals, smooth_range, range_filter
+
+PARAMS = (5, 1.2, 9, 2.5)
+
+
+def random_walk(n, seed=11, start=100.0):
+    rng = random.Random(seed)
+    closes = []
+    price = start
+    for _ in range(n):
+        if rng.random() > 0.1:
+            price = round(price * (1 + rng.gauss(0, 0.01)), 4)
+        closes.append(price)
+    return closes
+
+
+def candles_of(closes):
+    return [[i * 60000, c, c, c, c, 1.0] for i, c in enumerate(closes)]
+
+
+@pytest.mark.parametrize('params', [PARAMS, (27, 1.6, 55, 2.0)])
+def test_entry_flags_match_calculate_signals_on_every_prefix(params):
+    closes = random_walk(300)
+    series = calculate_signal_series(closes, *params)
+    candles = candles_of(closes)
+    for i in range(len(closes) - 1):
+        expected = calculate_signals(candles[:i + 2], *params)
+        assert series['long_entry'][i] == expected['long_signal'], i
+        assert series['short_entry'][i] == expected['short_signal'], i
+
+
+def test_entries_fire_and_filter_matches_reference():
+    closes = random_walk(300)
+    series = calculate_signal_series(closes, *PARAMS)
+    assert any(series['long_entry']) and any(series['short_entry'])
+
+    fast = smooth_range(closes, PARAMS[0], PARAMS[1])
+    slow = smooth_range(closes, PARAMS[2], PARAMS[3])
+    assert list(series['filt']) == range_filter(closes, [(a + b) / 2 for a, b in zip(fast, slow)])
+
+
+def test_accepts_compact_columns():
+    closes = random_walk(120)
+    expected = calculate_signal_series(closes, *PARAMS)
+    column = array('d', closes)
+    for source in (column, memoryview(column)):
+        result = calculate_signal_series(source, *PARAMS)
+        assert all(result[key] == expected[key] for key in expected)
+
+
+def test_empty_input():
+    result = calculate_signal_series([], *PARAMS)
+    assert all(len(values) == 0 for values in result.values())
@@ -0,0 +1,149 @@
+"""
+MarketDataStream and PrivateStream against recorded pushes from ReplayServer
+"""
+
+import time
+
+import pytest
+
+from websocket_lite import ReplayServer
+from bybit_stream_lite import MarketDataStream, PrivateStream
+
+STEP = 60000
+
+
+def kline(symbol, start, close, confirm):
+    return {'topic': f"kline.1.{symbol}", 'type': 'snapshot', 'data': [{
+        'start': start, 'end': start + STEP - 1, 'interval': '1', 'open': str(close), 'high': str(close + 1),
+        'low': str(close - 1), 'close': str(close), 'volume': '10', 'turnover': '0', 'confirm': confirm,
+        'timestamp': start}]}
+
+
+@pytest.fixture
+def replay():
+    servers = []
+
+    def start(messages):
+        server = ReplayServer(messages, interval=0.02).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_market_stream_backfills_and_follows_pushes(client, exchange, replay):
+    now = exchange.now_ms() // STEP * STEP
+    server = replay([
+        kline('BTCUSDT', now, 100.0, False),
+        {'topic': 'tickers.BTCUSDT', 'type': 'snapshot', 'data': {'symbol': 'BTCUSDT', 'lastPrice': '100', 'bid1Price': '99'}},
+        {'topic': 'tickers.BTCUSDT', 'type': 'delta', 'data': {'symbol': 'BTCUSDT', 'bid1Price': '99.5'}},
+        kline('BTCUSDT', now, 101.0, True)
+    ])
+    feed = MarketDataStream(client, ['BTCUSDT'], '1', history=50, url=server.url, ping_interval=1).start()
+    try:
+        assert feed.wait_for_close(5) == {'BTCUSDT'}
+        assert feed.is_live('BTCUSDT')
+
+        candles = feed.candles('BTCUSDT')
+        assert len(candles) == 50
+        assert candles[-1][0] == now and candles[-1][4] == 101.0
+        # The confirmed bar is closed although no newer bar exists yet
+        assert feed.last_closed('BTCUSDT') == now
+
+        ticker = client.get_ticker('BTCUSDT')
+        assert ticker['lastPrice'] == '100' and ticker['bid1Price'] == '99.5'
+        assert sum(topics.count('kline.1.BTCUSDT') for topics in server.subscriptions) == 1
+    finally:
+        feed.stop()
+
+
+def test_market_stream_forming_bar_is_not_closed(client, exchange, replay):
+    now = exchange.now_ms() // STEP * STEP
+    server = replay([kline('BTCUSDT', now, 100.0, True), kline('BTCUSDT', now + STEP, 100.5, False)])
+    feed = MarketDataStream(client, ['BTCUSDT'], '1', history=50, url=server.url, ping_interval=1).start()
+    try:
+        assert feed.wait_for_close(5) == {'BTCUSDT'}
+        deadline = time.monotonic() + 5
+        while feed.candles('BTCUSDT')[-1][0] != now + STEP and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        assert feed.candles('BTCUSDT')[-1][0] == now + STEP
+        assert feed.last_closed('BTCUSDT') == now
+    finally:
+        feed.stop()
+
+
+def test_private_stream_tracks_orders_positions_and_wallet(client, replay):
+    server = replay([
+        {'topic': 'order', 'data': [{'orderId': 'o1', 'symbol': 'ETHUSDT', 'orderStatus': 'New'}]},
+        {'topic': 'order', 'data': [{'orderId': 'o1', 'symbol': 'ETHUSDT', 'orderStatus': 'Filled'}]},
+        {'topic': 'execution', 'data': [{'orderId': 'o1', 'execQty': '0.5'}]},
+        {'topic': 'position', 'data': [{'category': 'linear', 'symbol': 'ETHUSDT', 'side': 'Buy', 'size': '0.5',
+                                        'entryPrice': '3000', 'positionValue': '1500', 'leverage': '10'}]},
+        {'topic': 'wallet', 'data': [{'coin': [{'coin': 'USDT', 'walletBalance': '850'}]}]}
+    ])
+    stream = PrivateStream(client, url=server.url, ping_interval=1).start()
+    try:
+        assert stream.connected.wait(5)
+        # Loaded over REST on connect
+        assert stream.balance('USDT') == 1000.0
+
+        assert stream.wait_for_order('o1', timeout=5)['orderStatus'] == 'Filled'
+        assert stream.wait_for_position('ETHUSDT', 0, timeout=5)
+        position = client.positions.get('ETHUSDT')
+        assert position['size'] == '0.5' and position['avgPrice'] == '3000'
+        assert client.positions.count() == 1
+
+        deadline = time.monotonic() + 5
+        while stream.balance('USDT') != 850.0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert stream.balance('USDT') == 850.0
+        assert len(stream.executions) == 1
+    finally:
+        stream.stop()
+
+
+def test_private_stream_resubscribes_after_disconnect(client, replay):
+    server = replay([])
+    stream = PrivateStream(client, url=server.url, ping_interval=1, reconnect_delay=0.1).start()
+    try:
+        assert stream.connected.wait(5)
+        for conn in list(server.connections):
+            conn.close()
+
+        deadline = time.monotonic() + 5
+        while len(server.subscriptions) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert stream.reconnects >= 1
+        assert server.subscriptions[-1] == ['position', 'order', 'execution', 'wallet']
+    finally:
+        stream.stop()
+
+
+def test_market_stream_backfill_tail_waits_for_confirm(client, exchange, replay):
+    server = replay([])
+    feed = MarketDataStream(client, ['BTCUSDT'], '1', history=50, url=server.url, ping_interval=1,
+                            reconnect_delay=0.1).start()
+    try:
+        assert feed.connected.wait(5)
+        candles = feed.candles('BTCUSDT')
+        assert len(candles) == 50
+        # The newest REST row is the forming bar until a confirm push says otherwise
+        assert feed.last_closed('BTCUSDT') == candles[-2][0]
+
+        for conn in list(server.connections):
+            conn.close()
+        deadline = time.monotonic() + 5
+        while len(server.subscriptions) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert feed.connected.wait(5) and feed.is_live('BTCUSDT')
+
+        # Reconnect merges the missed bars into the same window
+        candles = feed.candles('BTCUSDT')
+        assert len(candles) == 50
+        assert all(b[0] - a[0] == STEP for a, b in zip(candles, candles[1:]))
+        assert feed.last_closed('BTCUSDT') == candles[-2][0]
+    finally:
+        feed.stop()
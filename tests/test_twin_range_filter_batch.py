@@ -0,0 +1,89 @@
+"""
+NumPy batch engine against the reference twin_range_filter_lite implementation
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from twin_range_filter_lite import calculate_signals, smooth_range, range_filter
+from twin_range_filter_batch import calculate_signals_batch, calculate_signals_many
+
+PARAMS = (5, 1.2, 9, 2.5)
+
+
+def random_walk(n, seed, start=100.0):
+    rng = random.Random(seed)
+    closes = []
+    price = start
+    for _ in range(n):
+        if rng.random() > 0.1:
+            price = round(price * (1 + rng.gauss(0, 0.01)), 4)
+        closes.append(price)
+    return closes
+
+
+def candles_of(closes):
+    return [[i * 60000, c, c, c, c, 1.0] for i, c in enumerate(closes)]
+
+
+def test_series_match_reference_exactly():
+    closes = [random_walk(120, seed) for seed in range(4)]
+    batch = calculate_signals_batch(np.array(closes), *PARAMS)
+    for i, series in enumerate(closes):
+        fast = smooth_range(series, PARAMS[0], PARAMS[1])
+        slow = smooth_range(series, PARAMS[2], PARAMS[3])
+        smrng = [(a + b) / 2 for a, b in zip(fast, slow)]
+        assert batch['smooth_range'][i].tolist() == smrng
+        assert batch['filt'][i].tolist() == range_filter(series, smrng)
+
+
+def test_signals_match_on_every_prefix():
+    closes = np.array([random_walk(150, seed) for seed in range(6)])
+    fired = set()
+    for n in range(1, closes.shape[1] + 1):
+        batch = calculate_signals_batch(closes[:, :n], *PARAMS)
+        for i in range(closes.shape[0]):
+            expected = calculate_signals(candles_of(closes[i, :n].tolist()), *PARAMS)
+            assert bool(batch['long_signal'][i]) == expected['long_signal'], (i, n)
+            assert bool(batch['short_signal'][i]) == expected['short_signal'], (i, n)
+            assert float(batch['filter_value'][i]) == expected['filter_value'], (i, n)
+            fired.update(k for k in ('long_signal', 'short_signal') if expected[k])
+    assert fired == {'long_signal', 'short_signal'}
+
+
+def test_many_matches_per_symbol_calls_with_mixed_lengths():
+    candles = {
+        'A': candles_of(random_walk(100, 1)),
+        'B': candles_of(random_walk(100, 2)),
+        'C': candles_of(random_walk(60, 3)),
+        'SHORT': candles_of(random_walk(10, 4))
+    }
+    results = calculate_signals_many(candles, *PARAMS)
+    for symbol, series in candles.items():
+        assert results[symbol] == calculate_signals(series, *PARAMS), symbol
+
+
+def test_flat_prices_give_no_signal_and_no_nan():
+    closes = np.full((3, 80), 42.0)
+    batch = calculate_signals_batch(closes, *PARAMS)
+    for key in ('smooth_range', 'filt', 'filter_value', 'current_price'):
+        assert not np.isnan(batch[key]).any(), key
+    assert not batch['long_signal'].any() and not batch['short_signal'].any()
+    assert batch['filt'].tolist() == closes.tolist()
+    assert calculate_signals_many({'X': candles_of([42.0] * 80)}, *PARAMS)['X'] == \
+        calculate_signals(candles_of([42.0] * 80), *PARAMS)
+
+
+def test_below_warmup_is_all_false():
+    closes = np.array([random_walk(10, 5)])
+    batch = calculate_signals_batch(closes, *PARAMS)
+    assert not batch['long_signal'].any() and not batch['short_signal'].any()
+    assert batch['filter_value'].tolist() == [0.0]
+
+
+def test_rejects_one_dimensional_input():
+    with pytest.raises(ValueError):
+        calculate_signals_batch(np.array(random_walk(50, 6)))
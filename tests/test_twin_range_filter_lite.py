@@ -0,0 +1,68 @@
+"""
+TwinRangeFilterState must give exactly what calculate_signals gives
+"""
+
+import json
+import random
+
+import pytest
+
+from twin_range_filter_lite import TwinRangeFilterState, calculate_signals
+
+PARAMS = [(27, 1.6, 55, 2.0), (5, 1.2, 9, 2.5)]
+
+
+def random_walk(n, seed=7, start=100.0):
+    """Candles with a seeded random-walk close, including flat stretches"""
+    rng = random.Random(seed)
+    candles = []
+    price = start
+    for i in range(n):
+        if rng.random() > 0.1:
+            price = round(price * (1 + rng.gauss(0, 0.01)), 4)
+        candles.append([i * 60000, price, price, price, price, 1.0])
+    return candles
+
+
+@pytest.mark.parametrize('params', PARAMS)
+def test_incremental_state_matches_calculate_signals_on_every_prefix(params):
+    candles = random_walk(260)
+    state = TwinRangeFilterState(*params)
+    for n in range(1, len(candles) + 1):
+        expected = calculate_signals(candles[:n], *params)
+        assert state.peek(candles[n - 1]) == expected, f"prefix {n}"
+        state.update(candles[n - 1])
+
+
+def test_signals_fire_on_the_walk():
+    # The parity test is only meaningful if both kinds of signal occur
+    candles = random_walk(260)
+    results = [calculate_signals(candles[:n], *PARAMS[1]) for n in range(2, len(candles) + 1)]
+    assert any(r['long_signal'] for r in results)
+    assert any(r['short_signal'] for r in results)
+
+
+def test_from_candles_matches_updates():
+    candles = random_walk(150)
+    built = TwinRangeFilterState.from_candles(candles[:-1], *PARAMS[1])
+    assert built.peek(candles[-1]) == calculate_signals(candles, *PARAMS[1])
+    assert built.last_timestamp == candles[-2][0]
+    assert built.count == len(candles) - 1
+
+
+def test_checkpoint_round_trip_continues_identically():
+    candles = random_walk(200)
+    state = TwinRangeFilterState.from_candles(candles[:120], *PARAMS[1])
+    restored = TwinRangeFilterState.from_dict(json.loads(json.dumps(state.to_dict())))
+
+    assert restored.to_dict() == state.to_dict()
+    assert restored.params() == state.params()
+    for n in range(120, len(candles)):
+        assert restored.peek(candles[n]) == calculate_signals(candles[:n + 1], *PARAMS[1])
+        restored.update(candles[n])
+
+
+def test_short_history_has_no_signal():
+    candles = random_walk(10)
+    state = TwinRangeFilterState.from_candles(candles[:-1])
+    assert state.peek(candles[-1]) == {'long_signal': False, 'short_signal': False, 'filter_value': 0}
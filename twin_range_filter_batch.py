@@ -0,0 +1,225 @@
+"""
+Vectorized Twin Range Filter - NumPy batch engine
+Computes the filter for many symbols in one call.
+twin_range_filter_lite.calculate_signals stays the reference implementation.
+"""
+
+import numpy as np
+
+
+def ema_batch(values, period):
+    """
+    EMA over axis 0 of a (bars, symbols) array
+
+    Mirrors twin_range_filter_lite.ema: seeded with the first value and
+    returned unchanged when there are fewer bars than the period.
+    """
+    if values.shape[0] < period:
+        return values.copy()
+
+    multiplier = 2 / (period + 1)
+    keep = 1 - multiplier
+    out = np.empty_like(values)
+    out[0] = values[0]
+
+    # The recursion is sequential in time but vectorized across symbols
+    for i in range(1, values.shape[0]):
+        out[i] = (values[i] * multiplier) + (out[i - 1] * keep)
+
+    return out
+
+
+def smooth_range_batch(closes, period, multiplier):
+    """Smooth average range for a (bars, symbols) array"""
+    changes = np.zeros_like(closes)
+    changes[1:] = np.abs(closes[1:] - closes[:-1])
+
+    wper = period * 2 - 1
+    avrng = ema_batch(changes, period)
+    smoothrng = ema_batch(avrng, wper)
+
+    return smoothrng * multiplier
+
+
+def range_filter_batch(closes, smooth_range_values):
+    """Range filter for a (bars, symbols) array"""
+    filt = np.empty_like(closes)
+    filt[0] = closes[0]
+
+    for i in range(1, closes.shape[0]):
+        prev_filt = filt[i - 1]
+        curr_src = closes[i]
+        curr_rng = smooth_range_values[i]
+        filt[i] = np.where(
+            curr_src > prev_filt,
+            np.maximum(prev_filt, curr_src - curr_rng),
+            np.minimum(prev_filt, curr_src + curr_rng)
+        )
+
+    return filt
+
+
+def _run_length(step, reset):
+    """
+    Count steps since the last reset along axis 0
+
+    Equivalent to the upward/downward counter loop in calculate_signals:
+    +1 on step, 0 on reset, unchanged otherwise.
+    """
+    counted = np.cumsum(step, axis=0)
+    index = np.arange(step.shape[0]).reshape(-1, 1)
+    last_reset = np.maximum.accumulate(np.where(reset, index, 0), axis=0)
+    return counted - np.take_along_axis(counted, last_reset, axis=0)
+
+
+def filter_conditions_batch(src, smrng):
+    """
+    Range filter, counters and conditions for (bars, columns) arrays
+
+    Columns can be symbols or parameter combinations sharing one price series.
+
+    Returns:
+        dict with 'filt', 'upward', 'downward', 'long_cond', 'short_cond' and
+        'cond_ini', all shaped (bars, columns)
+    """
+    bars, columns = src.shape
+    filt = range_filter_batch(src, smrng)
+
+    # Upward/downward counters
+    rising = np.zeros((bars, columns), dtype=bool)
+    falling = np.zeros((bars, columns), dtype=bool)
+    rising[1:] = filt[1:] > filt[:-1]
+    falling[1:] = filt[1:] < filt[:-1]
+    upward = _run_length(rising, falling)
+    downward = _run_length(falling, rising)
+
+    # Long/short conditions (first bar is always False)
+    long_cond = np.zeros((bars, columns), dtype=bool)
+    short_cond = np.zeros((bars, columns), dtype=bool)
+    curr, prev, curr_filt = src[1:], src[:-1], filt[1:]
+    moved = (curr > prev) | (curr < prev)
+    long_cond[1:] = (curr > curr_filt) & moved & (upward[1:] > 0)
+    short_cond[1:] = (curr < curr_filt) & moved & (downward[1:] > 0)
+
+    # Condition initialization: carry the last long (1) / short (-1) forward
+    state = np.where(long_cond, 1, np.where(short_cond, -1, 0))
+    index = np.arange(bars).reshape(-1, 1)
+    last_set = np.maximum.accumulate(np.where(state != 0, index, 0), axis=0)
+    cond_ini = np.take_along_axis(state, last_set, axis=0)
+
+    return {
+        'filt': filt,
+        'upward': upward,
+        'downward': downward,
+        'long_cond': long_cond,
+        'short_cond': short_cond,
+        'cond_ini': cond_ini
+    }
+
+
+def entry_flags_batch(long_cond, short_cond, cond_ini, first_entry):
+    """
+    Per-bar long/short entry flags, shaped like the condition arrays
+
+    Same definition as calculate_signal_series: a condition that flips
+    cond_ini on bar i, ignored before first_entry (warm-up).
+    """
+    long_entry = np.zeros_like(long_cond)
+    short_entry = np.zeros_like(short_cond)
+    long_entry[1:] = long_cond[1:] & (cond_ini[:-1] == -1)
+    short_entry[1:] = short_cond[1:] & (cond_ini[:-1] == 1)
+    long_entry[:first_entry] = False
+    short_entry[:first_entry] = False
+    return long_entry, short_entry
+
+
+def calculate_signals_batch(closes, fast_period=27, fast_range=1.6, slow_period=55, slow_range=2.0):
+    """
+    Calculate Twin Range Filter for many symbols at once
+
+    Args:
+        closes: 2-D array of close prices, shape (symbols, bars), oldest bar first
+        fast_period, fast_range, slow_period, slow_range: Strategy parameters
+
+    Returns:
+        dict of arrays. Per-bar series ('smooth_range', 'filt', 'upward',
+        'downward', 'long_cond', 'short_cond', 'cond_ini') have shape
+        (symbols, bars); 'long_signal', 'short_signal', 'filter_value' and
+        'current_price' have shape (symbols,) and match calculate_signals.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if closes.ndim != 2:
+        raise ValueError("closes must be a 2-D array of shape (symbols, bars)")
+
+    # Work in (bars, symbols) layout so each time step is a contiguous row
+    src = np.ascontiguousarray(closes.T)
+    bars, symbols = src.shape
+
+    smrng1 = smooth_range_batch(src, fast_period, fast_range)
+    smrng2 = smooth_range_batch(src, slow_period, slow_range)
+    smrng = (smrng1 + smrng2) / 2
+
+    series = filter_conditions_batch(src, smrng)
+    filt = series['filt']
+    long_cond = series['long_cond']
+    short_cond = series['short_cond']
+    cond_ini = series['cond_ini']
+
+    # Signals on the last completed candle, same rules as calculate_signals
+    if bars >= max(fast_period, slow_period) * 2 and bars >= 3:
+        long_signal = long_cond[-2] & (cond_ini[-3] == -1)
+        short_signal = short_cond[-2] & (cond_ini[-3] == 1)
+        filter_value = filt[-1].copy()
+    else:
+        long_signal = np.zeros(symbols, dtype=bool)
+        short_signal = np.zeros(symbols, dtype=bool)
+        filter_value = np.zeros(symbols)
+
+    return {
+        'smooth_range': smrng.T,
+        'filt': filt.T,
+        'upward': series['upward'].T,
+        'downward': series['downward'].T,
+        'long_cond': long_cond.T,
+        'short_cond': short_cond.T,
+        'cond_ini': cond_ini.T,
+        'long_signal': long_signal,
+        'short_signal': short_signal,
+        'filter_value': filter_value,
+        'current_price': src[-1].copy() if bars else np.zeros(symbols)
+    }
+
+
+def calculate_signals_many(candles_by_symbol, fast_period=27, fast_range=1.6, slow_period=55, slow_range=2.0):
+    """
+    Batch replacement for calling calculate_signals once per symbol
+
+    Args:
+        candles_by_symbol: {symbol: [[timestamp, open, high, low, close, volume], ...]}
+
+    Returns:
+        {symbol: dict} with the same keys and values calculate_signals returns
+    """
+    min_candles = max(fast_period, slow_period) * 2
+    results = {}
+
+    # Symbols with the same history length share one 2-D batch
+    groups = {}
+    for symbol, candles in candles_by_symbol.items():
+        if len(candles) < min_candles:
+            results[symbol] = {'long_signal': False, 'short_signal': False, 'filter_value': 0}
+        else:
+            groups.setdefault(len(candles), []).append(symbol)
+
+    for symbols in groups.values():
+        closes = np.array([[float(c[4]) for c in candles_by_symbol[s]] for s in symbols])
+        batch = calculate_signals_batch(closes, fast_period, fast_range, slow_period, slow_range)
+        for i, symbol in enumerate(symbols):
+            results[symbol] = {
+                'long_signal': bool(batch['long_signal'][i]),
+                'short_signal': bool(batch['short_signal'][i]),
+                'filter_value': float(batch['filter_value'][i]),
+                'current_price': float(batch['current_price'][i])
+            }
+
+    return results
@@ -3,6 +3,8 @@ Lightweight Twin Range Filter - No pandas required
 Uses only built-in Python and requests
 """
 
+from array import array
+
 def ema(values, period):
     """Calculate EMA using only lists"""
     if len(values) < period:
@@ -58,6 +60,7 @@ def calculate_signals(candles, fast_period=27, fast_range=1.6, slow_period=55, s
     
     Args:
         candles: List of candles [[timestamp, open, high, low, close, volume], ...]
+            or a CandleBuffer (its close column is used without copying)
         fast_period, fast_range, slow_period, slow_range: Strategy parameters
     
     Returns:
@@ -67,7 +70,10 @@ def calculate_signals(candles, fast_period=27, fast_range=1.6, slow_period=55, s
         return {'long_signal': False, 'short_signal': False, 'filter_value': 0}
     
     # Extract close prices
-    close_prices = [float(candle[4]) for candle in candles]
+    if hasattr(candles, 'closes'):
+        close_prices = candles.closes
+    else:
+        close_prices = [float(candle[4]) for candle in candles]
     
     # Calculate smooth ranges
     smrng1 = smooth_range(close_prices, fast_period, fast_range)
@@ -140,3 +146,294 @@ def calculate_signals(candles, fast_period=27, fast_range=1.6, slow_period=55, s
         'filter_value': filt[-1] if filt else 0,
         'current_price': close_prices[-1] if close_prices else 0
     }
+
+
+def calculate_signal_series(close_prices, fast_period=27, fast_range=1.6, slow_period=55, slow_range=2.0):
+    """
+    Calculate every Twin Range Filter series in a single pass
+
+    Args:
+        close_prices: Sequence of close prices, oldest first (list, array('d'),
+            memoryview or numpy array)
+        fast_period, fast_range, slow_period, slow_range: Strategy parameters
+
+    Returns:
+        dict of compact arrays, one value per bar:
+            'filt', 'smrng'              array('d')
+            'upward', 'downward'         array('i')
+            'long_cond', 'short_cond'    array('B') 0/1
+            'cond_ini'                   array('b') -1/0/1
+            'long_entry', 'short_entry'  array('B') 0/1
+
+    long_entry[i] / short_entry[i] equal calculate_signals(candles[:i + 2])
+    long_signal / short_signal, i.e. the signal the live bot sees once bar i
+    has closed. They are 0 during warm-up.
+    """
+    n = len(close_prices)
+    filt = array('d', bytes(8 * n))
+    smrng = array('d', bytes(8 * n))
+    upward = array('i', bytes(4 * n))
+    downward = array('i', bytes(4 * n))
+    long_cond = array('B', bytes(n))
+    short_cond = array('B', bytes(n))
+    cond_ini = array('b', bytes(n))
+    long_entry = array('B', bytes(n))
+    short_entry = array('B', bytes(n))
+
+    result = {
+        'filt': filt,
+        'smrng': smrng,
+        'upward': upward,
+        'downward': downward,
+        'long_cond': long_cond,
+        'short_cond': short_cond,
+        'cond_ini': cond_ini,
+        'long_entry': long_entry,
+        'short_entry': short_entry
+    }
+    if n == 0:
+        return result
+
+    fast_mult = 2 / (fast_period + 1)
+    fast_wmult = 2 / ((fast_period * 2 - 1) + 1)
+    slow_mult = 2 / (slow_period + 1)
+    slow_wmult = 2 / ((slow_period * 2 - 1) + 1)
+    first_entry = max(fast_period, slow_period) * 2 - 2
+
+    # First bar: change is 0, every EMA is seeded with 0, filter with price
+    prev_close = float(close_prices[0])
+    prev_filt = prev_close
+    filt[0] = prev_filt
+    fast_avrng = fast_smooth = slow_avrng = slow_smooth = 0.0
+    up = down = 0
+    cond = 0
+
+    for i in range(1, n):
+        close = float(close_prices[i])
+        change = abs(close - prev_close)
+
+        fast_avrng = (change * fast_mult) + (fast_avrng * (1 - fast_mult))
+        fast_smooth = (fast_avrng * fast_wmult) + (fast_smooth * (1 - fast_wmult))
+        slow_avrng = (change * slow_mult) + (slow_avrng * (1 - slow_mult))
+        slow_smooth = (slow_avrng * slow_wmult) + (slow_smooth * (1 - slow_wmult))
+        rng = (fast_smooth * fast_range + slow_smooth * slow_range) / 2
+        smrng[i] = rng
+
+        # Range filter
+        if close > prev_filt:
+            curr_filt = prev_filt if close - rng < prev_filt else close - rng
+        else:
+            curr_filt = prev_filt if close + rng > prev_filt else close + rng
+        filt[i] = curr_filt
+
+        # Upward/downward counters
+        if curr_filt > prev_filt:
+            up += 1
+            down = 0
+        elif curr_filt < prev_filt:
+            up = 0
+            down += 1
+        upward[i] = up
+        downward[i] = down
+
+        # Long/short conditions, then condition change against the previous bar
+        moved = close > prev_close or close < prev_close
+        prev_cond = cond
+        if close > curr_filt and moved and up > 0:
+            long_cond[i] = 1
+            cond = 1
+            if prev_cond == -1 and i >= first_entry:
+                long_entry[i] = 1
+        elif close < curr_filt and moved and down > 0:
+            short_cond[i] = 1
+            cond = -1
+            if prev_cond == 1 and i >= first_entry:
+                short_entry[i] = 1
+        cond_ini[i] = cond
+
+        prev_close = close
+        prev_filt = curr_filt
+
+    return result
+
+
+class TwinRangeFilterState:
+    """
+    Incremental Twin Range Filter
+
+    Keeps the EMA, filter, counter and condition state so each closed candle
+    is processed in O(1) instead of recomputing the whole history. Feeding the
+    same closed candles and peeking at the forming one gives exactly the same
+    result as calculate_signals on that history.
+
+    Usage:
+        state = TwinRangeFilterState()
+        for candle in candles[:-1]:
+            state.update(candle)          # closed candles only
+        result = state.peek(candles[-1])  # forming candle, not committed
+    """
+
+    def __init__(self, fast_period=27, fast_range=1.6, slow_period=55, slow_range=2.0):
+        self.fast_period = fast_period
+        self.fast_range = fast_range
+        self.slow_period = slow_period
+        self.slow_range = slow_range
+
+        # Same multipliers ema() uses for avrng and smoothrng
+        self._fast_mult = 2 / (fast_period + 1)
+        self._fast_wmult = 2 / ((fast_period * 2 - 1) + 1)
+        self._slow_mult = 2 / (slow_period + 1)
+        self._slow_wmult = 2 / ((slow_period * 2 - 1) + 1)
+
+        self.count = 0           # Number of committed (closed) candles
+        self.last_timestamp = None
+        self.close = 0.0
+        self.fast_avrng = 0.0
+        self.fast_smooth = 0.0
+        self.slow_avrng = 0.0
+        self.slow_smooth = 0.0
+        self.filt = 0.0
+        self.upward = 0
+        self.downward = 0
+        self.long_cond = False
+        self.short_cond = False
+        self.cond_ini = 0
+        self.prev_cond_ini = 0   # cond_ini of the candle before the last one
+
+    @property
+    def warmup(self):
+        """Number of candles calculate_signals needs before it emits signals"""
+        return max(self.fast_period, self.slow_period) * 2
+
+    def _step(self, close):
+        """Compute the next bar's state without committing it"""
+        if self.count == 0:
+            # First bar: change is 0, every EMA is seeded with 0, filter with price
+            return (close, 0.0, 0.0, 0.0, 0.0, close, 0, 0, False, False, 0)
+
+        prev_close = self.close
+        change = abs(close - prev_close)
+
+        m = self._fast_mult
+        fast_avrng = (change * m) + (self.fast_avrng * (1 - m))
+        m = self._fast_wmult
+        fast_smooth = (fast_avrng * m) + (self.fast_smooth * (1 - m))
+        m = self._slow_mult
+        slow_avrng = (change * m) + (self.slow_avrng * (1 - m))
+        m = self._slow_wmult
+        slow_smooth = (slow_avrng * m) + (self.slow_smooth * (1 - m))
+
+        smrng = (fast_smooth * self.fast_range + slow_smooth * self.slow_range) / 2
+
+        # Range filter
+        prev_filt = self.filt
+        if close > prev_filt:
+            filt = prev_filt if close - smrng < prev_filt else close - smrng
+        else:
+            filt = prev_filt if close + smrng > prev_filt else close + smrng
+
+        # Upward/downward counters
+        if filt > prev_filt:
+            upward = self.upward + 1
+            downward = 0
+        elif filt < prev_filt:
+            upward = 0
+            downward = self.downward + 1
+        else:
+            upward = self.upward
+            downward = self.downward
+
+        long_cond = (close > filt and close > prev_close and upward > 0) or \
+                    (close > filt and close < prev_close and upward > 0)
+        short_cond = (close < filt and close < prev_close and downward > 0) or \
+                     (close < filt and close > prev_close and downward > 0)
+
+        if long_cond:
+            cond_ini = 1
+        elif short_cond:
+            cond_ini = -1
+        else:
+            cond_ini = self.cond_ini
+
+        return (close, fast_avrng, fast_smooth, slow_avrng, slow_smooth,
+                filt, upward, downward, long_cond, short_cond, cond_ini)
+
+    def update(self, candle):
+        """Commit a closed candle [timestamp, open, high, low, close, volume]"""
+        (self.close, self.fast_avrng, self.fast_smooth, self.slow_avrng, self.slow_smooth,
+         self.filt, self.upward, self.downward, self.long_cond, self.short_cond,
+         cond_ini) = self._step(float(candle[4]))
+        self.prev_cond_ini = self.cond_ini
+        self.cond_ini = cond_ini
+        self.last_timestamp = int(candle[0])
+        self.count += 1
+
+    def peek(self, candle):
+        """
+        Evaluate signals with candle as the current forming bar (not committed)
+
+        Returns:
+            same dict as calculate_signals(committed candles + [candle])
+        """
+        if self.count + 1 < self.warmup:
+            return {'long_signal': False, 'short_signal': False, 'filter_value': 0}
+
+        close = float(candle[4])
+        filt = self._step(close)[5]
+
+        # Signal on the last committed candle (-2), condition change against -3
+        if self.count >= 2:
+            long_signal = self.long_cond and self.prev_cond_ini == -1
+            short_signal = self.short_cond and self.prev_cond_ini == 1
+        else:
+            long_signal = False
+            short_signal = False
+
+        return {
+            'long_signal': long_signal,
+            'short_signal': short_signal,
+            'filter_value': filt,
+            'current_price': close
+        }
+
+    def params(self):
+        """Strategy parameters as (fast_period, fast_range, slow_period, slow_range)"""
+        return (self.fast_period, self.fast_range, self.slow_period, self.slow_range)
+
+    def to_dict(self):
+        """JSON-serializable checkpoint of the full indicator state"""
+        return {
+            'params': list(self.params()),
+            'count': self.count,
+            'last_timestamp': self.last_timestamp,
+            'close': self.close,
+            'fast_avrng': self.fast_avrng,
+            'fast_smooth': self.fast_smooth,
+            'slow_avrng': self.slow_avrng,
+            'slow_smooth': self.slow_smooth,
+            'filt': self.filt,
+            'upward': self.upward,
+            'downward': self.downward,
+            'long_cond': self.long_cond,
+            'short_cond': self.short_cond,
+            'cond_ini': self.cond_ini,
+            'prev_cond_ini': self.prev_cond_ini
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a state saved with to_dict"""
+        state = cls(*data['params'])
+        for key in ('count', 'last_timestamp', 'close', 'fast_avrng', 'fast_smooth',
+                    'slow_avrng', 'slow_smooth', 'filt', 'upward', 'downward',
+                    'long_cond', 'short_cond', 'cond_ini', 'prev_cond_ini'):
+            setattr(state, key, data[key])
+        return state
+
+    @classmethod
+    def from_candles(cls, candles, fast_period=27, fast_range=1.6, slow_period=55, slow_range=2.0):
+        """Build a state from closed candles"""
+        state = cls(fast_period, fast_range, slow_period, slow_range)
+        for candle in candles:
+            state.update(candle)
+        return state
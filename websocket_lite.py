@@ -0,0 +1,375 @@
+"""
+Lightweight WebSocket client - No extra dependencies
+Minimal RFC 6455 over the standard library (ws:// and wss://), plus a
+replay server that serves recorded messages for local testing
+
+Usage:
+    python websocket_lite.py recorded.jsonl [port]
+"""
+
+import os
+import sys
+import ssl
+import json
+import time
+import base64
+import select
+import socket
+import struct
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class WebSocketClosed(ConnectionError):
+    """The peer closed the connection"""
+
+
+def _apply_mask(data: bytes, key: bytes) -> bytes:
+    n = len(data)
+    if not n:
+        return b''
+    keys = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(keys, 'big')).to_bytes(n, 'big')
+
+
+def accept_key(key: str) -> str:
+    """Sec-WebSocket-Accept value for a Sec-WebSocket-Key"""
+    return base64.b64encode(hashlib.sha1((key + GUID).encode()).digest()).decode()
+
+
+def encode_frame(opcode: int, payload: bytes, mask: bool = True) -> bytes:
+    """One final frame; clients must mask, servers must not"""
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    n = len(payload)
+    if n < 126:
+        header.append(mask_bit | n)
+    elif n < 65536:
+        header.append(mask_bit | 126)
+        header += struct.pack('!H', n)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack('!Q', n)
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = _apply_mask(payload, key)
+    return bytes(header) + payload
+
+
+def read_frame(recv_exact):
+    """
+    Read one frame
+
+    Args:
+        recv_exact: Callable returning exactly n bytes
+
+    Returns:
+        (fin, opcode, payload)
+    """
+    first, second = recv_exact(2)
+    n = second & 0x7F
+    if n == 126:
+        n = struct.unpack('!H', recv_exact(2))[0]
+    elif n == 127:
+        n = struct.unpack('!Q', recv_exact(8))[0]
+    key = recv_exact(4) if second & 0x80 else None
+    payload = recv_exact(n) if n else b''
+    if key:
+        payload = _apply_mask(payload, key)
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+class _FrameSocket:
+    """Buffered socket that reads and writes frames"""
+
+    def __init__(self, sock, mask):
+        self.sock = sock
+        self.mask = mask
+        self._buffer = bytearray()
+        self._send_lock = threading.Lock()
+        self._fragments = []
+        self._fragment_opcode = None
+
+    def _fill(self):
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            raise WebSocketClosed("connection closed")
+        self._buffer += chunk
+
+    def recv_exact(self, n):
+        while len(self._buffer) < n:
+            self._fill()
+        data = bytes(self._buffer[:n])
+        del self._buffer[:n]
+        return data
+
+    def recv_until(self, marker, limit=65536):
+        while marker not in self._buffer:
+            if len(self._buffer) > limit:
+                raise ConnectionError("header too long")
+            self._fill()
+        end = self._buffer.index(marker) + len(marker)
+        data = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        return data
+
+    def readable(self, timeout):
+        """True if a frame can be read without waiting longer than timeout"""
+        if self._buffer:
+            return True
+        if isinstance(self.sock, ssl.SSLSocket) and self.sock.pending():
+            return True
+        return bool(select.select([self.sock], [], [], timeout)[0])
+
+    def send(self, opcode, payload):
+        with self._send_lock:
+            self.sock.sendall(encode_frame(opcode, payload, self.mask))
+
+    def send_text(self, text):
+        self.send(OP_TEXT, text.encode('utf-8'))
+
+    def recv(self, timeout=None):
+        """
+        Next text/binary message, answering pings on the way
+
+        Returns:
+            str (text) or bytes (binary), or None if nothing arrived within timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self.readable(remaining):
+                return None
+
+            fin, opcode, payload = read_frame(self.recv_exact)
+            if opcode == OP_PING:
+                self.send(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                try:
+                    self.send(OP_CLOSE, payload[:2])
+                except OSError:
+                    pass
+                raise WebSocketClosed(f"closed by peer {payload[:2].hex()}")
+
+            if opcode != OP_CONTINUATION:
+                self._fragment_opcode = opcode
+                self._fragments = []
+            self._fragments.append(payload)
+            if not fin:
+                continue
+
+            message = b''.join(self._fragments)
+            self._fragments = []
+            if self._fragment_opcode == OP_TEXT:
+                return message.decode('utf-8')
+            return message
+
+    def close(self):
+        try:
+            self.send(OP_CLOSE, struct.pack('!H', 1000))
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class WebSocket(_FrameSocket):
+    """
+    Blocking WebSocket client connection
+
+    Usage:
+        ws = WebSocket.connect('wss://stream.bybit.com/v5/public/linear')
+        ws.send_text('{"op": "ping"}')
+        message = ws.recv(timeout=1.0)   # None on timeout
+    """
+
+    @classmethod
+    def connect(cls, url: str, timeout: float = 10.0, verify: bool = True, headers: dict = None):
+        parts = urlsplit(url)
+        secure = parts.scheme == 'wss'
+        host = parts.hostname
+        port = parts.port or (443 if secure else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        sock = socket.create_connection((host, port), timeout=timeout)
+        try:
+            if secure:
+                context = ssl.create_default_context()
+                if not verify:
+                    context.check_hostname = False
+                    context.verify_mode = ssl.CERT_NONE
+                sock = context.wrap_socket(sock, server_hostname=host)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            key = base64.b64encode(os.urandom(16)).decode()
+            lines = [
+                f"GET {path} HTTP/1.1",
+                f"Host: {host}:{port}",
+                "Upgrade: websocket",
+                "Connection: Upgrade",
+                f"Sec-WebSocket-Key: {key}",
+                "Sec-WebSocket-Version: 13"
+            ]
+            lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+            sock.sendall(('\r\n'.join(lines) + '\r\n\r\n').encode())
+
+            ws = cls(sock, mask=True)
+            response = ws.recv_until(b'\r\n\r\n').decode('latin-1').split('\r\n')
+            if ' 101 ' not in response[0] + ' ':
+                raise ConnectionError(f"WebSocket upgrade refused: {response[0]}")
+            received = {}
+            for line in response[1:]:
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    received[name.strip().lower()] = value.strip()
+            if received.get('sec-websocket-accept') != accept_key(key):
+                raise ConnectionError("WebSocket upgrade: bad Sec-WebSocket-Accept")
+            return ws
+        except Exception:
+            sock.close()
+            raise
+
+
+def accept_connection(sock):
+    """Server side: answer the upgrade request and return a frame socket"""
+    conn = _FrameSocket(sock, mask=False)
+    request = conn.recv_until(b'\r\n\r\n').decode('latin-1').split('\r\n')
+    key = None
+    for line in request[1:]:
+        if line.lower().startswith('sec-websocket-key:'):
+            key = line.split(':', 1)[1].strip()
+    if key is None:
+        sock.sendall(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n')
+        raise ConnectionError("not a WebSocket upgrade")
+    sock.sendall((
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n"
+    ).encode())
+    conn.path = request[0].split(' ')[1] if ' ' in request[0] else '/'
+    return conn
+
+
+class ReplayServer:
+    """
+    Local stand-in for a Bybit V5 stream that replays recorded messages
+
+    Every connection gets the recorded messages in order, `interval` seconds
+    apart, once it has sent its first subscribe. Ping and subscribe requests
+    are answered the way Bybit answers them. Record messages with the
+    streams' record_file option.
+    """
+
+    def __init__(self, messages, host='127.0.0.1', port=0, interval=0.0):
+        self.messages = [m if isinstance(m, str) else json.dumps(m) for m in messages]
+        self.interval = interval
+        self.connections = []
+        self.subscriptions = []
+        self._sock = socket.create_server((host, port))
+        self.port = self._sock.getsockname()[1]
+        self.url = f"ws://{host}:{self.port}"
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        with open(path, 'r') as f:
+            return cls([line.strip() for line in f if line.strip()], **kwargs)
+
+    def start(self):
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._sock.close()
+        for conn in self.connections:
+            conn.close()
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _serve(self, sock):
+        try:
+            conn = accept_connection(sock)
+        except (OSError, ConnectionError):
+            sock.close()
+            return
+        self.connections.append(conn)
+        replaying = False
+        try:
+            while not self._stop.is_set():
+                message = conn.recv(timeout=0.1)
+                if message is None:
+                    continue
+                request = json.loads(message)
+                op = request.get('op')
+                reply = {'success': True, 'ret_msg': '', 'conn_id': 'replay',
+                         'req_id': request.get('req_id', ''), 'op': op}
+                if op == 'ping':
+                    reply['ret_msg'] = 'pong'
+                elif op == 'subscribe':
+                    self.subscriptions.append(request.get('args', []))
+                conn.send_text(json.dumps(reply))
+                if op == 'subscribe' and not replaying:
+                    replaying = True
+                    threading.Thread(target=self._replay, args=(conn,), daemon=True).start()
+        except (OSError, ConnectionError, ValueError):
+            pass
+        finally:
+            conn.close()
+
+    def _replay(self, conn):
+        try:
+            for message in self.messages:
+                if self._stop.is_set():
+                    return
+                if self.interval:
+                    time.sleep(self.interval)
+                conn.send_text(message)
+        except OSError:
+            pass
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+    server = ReplayServer.from_file(sys.argv[1], port=port, interval=0.1).start()
+    print(f"Replaying {len(server.messages)} messages on {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()